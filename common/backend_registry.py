@@ -0,0 +1,136 @@
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional
+
+STUB = "stub"
+REAL = "real"
+AUTO = "auto"
+
+_Loader = Callable[[], Optional[dict]]
+
+
+class BackendRegistry:
+
+    def __init__(self, default: str = STUB):
+        self._lock = threading.Lock()
+        self._loaders: Dict[str, Dict[str, _Loader]] = {}
+        self._loaded: Dict[tuple, Optional[dict]] = {}
+        self._errors: Dict[tuple, str] = {}
+        self._defaults: Dict[str, str] = {}
+        self._default = default
+        self._override: ContextVar[Dict[str, str]] = ContextVar("crypto_backend_override", default={})
+
+    def register(self, primitive: str, name: str, loader: _Loader) -> None:
+        if name in (STUB, REAL, AUTO):
+            raise ValueError(f"后端名称 {name} 为保留名称")
+        with self._lock:
+            self._loaders.setdefault(primitive, {})[name] = loader
+            self._loaded.pop((primitive, name), None)
+            self._errors.pop((primitive, name), None)
+
+    def primitives(self) -> List[str]:
+        return list(self._loaders)
+
+    def _load(self, primitive: str, name: str) -> Optional[dict]:
+        key = (primitive, name)
+        if key in self._loaded:
+            return self._loaded[key]
+        with self._lock:
+            if key not in self._loaded:
+                impl = None
+                try:
+                    impl = self._loaders[primitive][name]()
+                except Exception as e:
+                    self._errors[key] = str(e)
+                    print(f"警告: 无法加载{primitive}后端 {name}: {e}")
+                self._loaded[key] = impl or None
+            return self._loaded[key]
+
+    def _is_native(self, primitive: str, name: str) -> bool:
+        impl = self._load(primitive, name)
+        return impl is not None and bool(impl.get("native", False))
+
+    def _resolve(self, primitive: str, name: str) -> Optional[str]:
+        if name == STUB:
+            return None
+        candidates = list(self._loaders.get(primitive, {}))
+        if name == REAL:
+            native = [c for c in candidates if self._is_native(primitive, c)]
+            if not native:
+                errors = {n: e for (p, n), e in self._errors.items() if p == primitive}
+                raise RuntimeError(f"真实模式下没有可用的{primitive}原生后端 (候选: {candidates}, 错误: {errors})")
+            return native[0]
+        if name == AUTO:
+            loaded = [c for c in candidates if self._load(primitive, c) is not None]
+            loaded.sort(key=lambda c: not self._is_native(primitive, c))
+            return loaded[0] if loaded else None
+        if name not in candidates:
+            raise KeyError(f"未注册的{primitive}后端: {name}")
+        return name if self._load(primitive, name) is not None else None
+
+    @property
+    def default(self) -> str:
+        return self._default
+
+    def selected(self, primitive: str) -> str:
+        return self._override.get().get(primitive) or self._defaults.get(primitive) or self._default
+
+    def active(self, primitive: str) -> Optional[str]:
+        return self._resolve(primitive, self.selected(primitive))
+
+    def get(self, primitive: str) -> Optional[dict]:
+        name = self.active(primitive)
+        return None if name is None else self._loaded[(primitive, name)]
+
+    def select(self, name: str, primitives: Optional[Iterable[str]] = None) -> None:
+        if primitives is None:
+            self._default = name
+            self._defaults.clear()
+            return
+        for primitive in primitives:
+            self._defaults[primitive] = name
+
+    @contextmanager
+    def use_backend(self, name: str, primitives: Optional[Iterable[str]] = None):
+        targets = self.primitives() if primitives is None else list(primitives)
+        override = dict(self._override.get())
+        override.update({p: name for p in targets})
+        token = self._override.set(override)
+        try:
+            yield {p: self.active(p) or STUB for p in targets}
+        finally:
+            self._override.reset(token)
+
+    def capabilities(self) -> Dict[str, Dict[str, object]]:
+        report = {}
+        for primitive, loaders in list(self._loaders.items()):
+            available = {STUB: True}
+            native = []
+            for name in loaders:
+                impl = self._load(primitive, name)
+                available[name] = impl is not None
+                if impl is not None and impl.get("native", False):
+                    native.append(name)
+            try:
+                active = self.active(primitive) or STUB
+            except RuntimeError:
+                active = None
+            report[primitive] = {
+                "selected": self.selected(primitive),
+                "active": active,
+                "available": available,
+                "native": native,
+                "errors": {n: e for (p, n), e in self._errors.items() if p == primitive}
+            }
+        return report
+
+
+REGISTRY = BackendRegistry(REAL if os.environ.get("USE_REAL_CRYPTO", "0") == "1" else STUB)
+
+use_backend = REGISTRY.use_backend
+select_backend = REGISTRY.select
+get_backend = REGISTRY.get
+active_backend = REGISTRY.active
+capabilities = REGISTRY.capabilities
@@ -1,86 +1,261 @@
+import atexit
 import ctypes
 import sys
 import os
 import hashlib
+import threading
 
-                   
-_lib = None
-try:
-                 
-    if sys.platform.startswith('win'):
-                          
-        dll_path = os.path.join(os.path.dirname(__file__), '..', 'libbulletproofs.dll')
-        dll_path = os.path.abspath(dll_path)
-        if os.path.exists(dll_path):
-            _lib = ctypes.CDLL(dll_path)
-        else:
-                       
-            dll_path = os.path.join(os.getcwd(), 'libbulletproofs.dll')
-            if os.path.exists(dll_path):
-                _lib = ctypes.CDLL(dll_path)
-            else:
-                print(f"Bulletproofs库文件未找到: {dll_path}")
-    elif sys.platform.startswith('darwin'):
-               
-        _lib = ctypes.CDLL("libbulletproofs.dylib")
-    else:
-               
-        _lib = ctypes.CDLL("libbulletproofs.so")
-except OSError as e:
-                
-    print(f"无法加载Bulletproofs库: {e}")
-    _lib = None
-except Exception as e:
-    print(f"加载Bulletproofs库时出现未知错误: {e}")
-    _lib = None
+from .native_loader import load_native_library
 
-                 
-if _lib:
-    try:
-                      
-        _lib.bp_pedersen_commit.argtypes = [
-            ctypes.c_uint64,         
-            ctypes.c_uint64,            
-            ctypes.c_char_p                          
-        ]
-        _lib.bp_pedersen_commit.restype = ctypes.c_int
 
+def _configure(lib):
                   
-        _lib.bp_range_proof_prove.argtypes = [
-            ctypes.c_uint64,         
-            ctypes.c_uint64,     
-            ctypes.c_uint64,     
-            ctypes.c_uint64,            
-            ctypes.c_char_p,                         
-            ctypes.c_char_p,             
-            ctypes.POINTER(ctypes.c_size_t)                 
+    lib.bp_pedersen_commit.argtypes = [
+        ctypes.c_uint64,         
+        ctypes.c_uint64,            
+        ctypes.c_char_p                          
+    ]
+    lib.bp_pedersen_commit.restype = ctypes.c_int
+
+              
+    lib.bp_range_proof_prove.argtypes = [
+        ctypes.c_uint64,         
+        ctypes.c_uint64,     
+        ctypes.c_uint64,     
+        ctypes.c_uint64,            
+        ctypes.c_char_p,                         
+        ctypes.c_char_p,             
+        ctypes.POINTER(ctypes.c_size_t)                 
+    ]
+    lib.bp_range_proof_prove.restype = ctypes.c_int
+
+              
+    lib.bp_range_proof_verify.argtypes = [
+        ctypes.c_uint64,     
+        ctypes.c_uint64,     
+        ctypes.c_char_p,                     
+        ctypes.c_char_p,         
+        ctypes.c_size_t              
+    ]
+    lib.bp_range_proof_verify.restype = ctypes.c_int
+
+    if hasattr(lib, "bp_range_proof_verify_batch"):
+        lib.bp_range_proof_verify_batch.argtypes = [
+            ctypes.c_size_t,
+            ctypes.POINTER(ctypes.c_uint64),
+            ctypes.POINTER(ctypes.c_uint64),
+            ctypes.c_char_p,
+            ctypes.POINTER(ctypes.c_char_p),
+            ctypes.POINTER(ctypes.c_size_t),
+            ctypes.POINTER(ctypes.c_uint8)
         ]
-        _lib.bp_range_proof_prove.restype = ctypes.c_int
+        lib.bp_range_proof_verify_batch.restype = ctypes.c_int
 
-                  
-        _lib.bp_range_proof_verify.argtypes = [
-            ctypes.c_uint64,     
-            ctypes.c_uint64,     
-            ctypes.c_char_p,                     
-            ctypes.c_char_p,         
-            ctypes.c_size_t              
+    if hasattr(lib, "bp_context_new"):
+        lib.bp_context_new.argtypes = [ctypes.c_size_t, ctypes.c_size_t]
+        lib.bp_context_new.restype = ctypes.c_void_p
+        lib.bp_context_free.argtypes = [ctypes.c_void_p]
+        lib.bp_context_free.restype = None
+
+        lib.bp_ctx_pedersen_commit.argtypes = [ctypes.c_void_p] + lib.bp_pedersen_commit.argtypes
+        lib.bp_ctx_pedersen_commit.restype = ctypes.c_int
+        lib.bp_ctx_range_proof_prove.argtypes = [ctypes.c_void_p] + lib.bp_range_proof_prove.argtypes
+        lib.bp_ctx_range_proof_prove.restype = ctypes.c_int
+        lib.bp_ctx_range_proof_verify.argtypes = [ctypes.c_void_p] + lib.bp_range_proof_verify.argtypes
+        lib.bp_ctx_range_proof_verify.restype = ctypes.c_int
+        lib.bp_ctx_range_proof_verify_batch.argtypes = [ctypes.c_void_p] + lib.bp_range_proof_verify_batch.argtypes
+        lib.bp_ctx_range_proof_verify_batch.restype = ctypes.c_int
+
+    if hasattr(lib, "bp_ctx_pedersen_commit_batch"):
+        lib.bp_ctx_pedersen_commit_batch.argtypes = [
+            ctypes.c_void_p, ctypes.c_size_t,
+            ctypes.POINTER(ctypes.c_uint64), ctypes.POINTER(ctypes.c_uint64),
+            ctypes.c_char_p
         ]
-        _lib.bp_range_proof_verify.restype = ctypes.c_int
-        
-        print("Bulletproofs库加载成功")
-    except Exception as e:
-        print(f"定义Bulletproofs库函数签名时出错: {e}")
-        _lib = None
-else:
-    print("Bulletproofs库未加载，使用占位符实现")
+        lib.bp_ctx_pedersen_commit_batch.restype = ctypes.c_int
+
+    if hasattr(lib, "bp_ctx_range_proof_prove_multiple"):
+        _u64_array = ctypes.POINTER(ctypes.c_uint64)
+        lib.bp_ctx_range_proof_prove_multiple.argtypes = [
+            ctypes.c_void_p, ctypes.c_size_t,
+            _u64_array, _u64_array, _u64_array, _u64_array,
+            ctypes.c_char_p, ctypes.c_char_p, ctypes.POINTER(ctypes.c_size_t)
+        ]
+        lib.bp_ctx_range_proof_prove_multiple.restype = ctypes.c_int
+        lib.bp_ctx_range_proof_verify_multiple.argtypes = [
+            ctypes.c_void_p, ctypes.c_size_t,
+            _u64_array, _u64_array,
+            ctypes.c_char_p, ctypes.c_char_p, ctypes.c_size_t
+        ]
+        lib.bp_ctx_range_proof_verify_multiple.restype = ctypes.c_int
+    print("Bulletproofs库加载成功")
+
+
+def load_library():
+    return load_native_library("bulletproofs", _configure)
+
+
+AGGREGATION_SIZES = (1, 2, 4, 8)
+
+
+def _aggregation_size(count: int) -> int:
+    for m in AGGREGATION_SIZES:
+        if count <= m:
+            return m
+    raise ValueError(f"聚合范围证明最多支持{AGGREGATION_SIZES[-1]}个值，实际为{count}")
+
+
+def proof_bit_width(proof: bytes) -> int:
+    if len(proof) % 32 == 0:
+        return 64
+    return proof[0]
+
+
+class BulletproofsContext:
+
+    def __init__(self, gens_capacity: int = 64, party_capacity: int = 2 * AGGREGATION_SIZES[-1]):
+        self._lib = load_library()
+        if not (self._lib and hasattr(self._lib, "bp_context_new")):
+            raise RuntimeError("Bulletproofs库不支持上下文句柄")
+        self.gens_capacity = gens_capacity
+        self.party_capacity = party_capacity
+        self._handle = self._lib.bp_context_new(gens_capacity, party_capacity)
+        if not self._handle:
+            raise RuntimeError("Bulletproofs上下文创建失败")
+
+    def close(self):
+        if self._handle:
+            self._lib.bp_context_free(self._handle)
+            self._handle = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def pedersen_commit(self, value: int, blinding: int) -> bytes:
+        commit_buf = ctypes.create_string_buffer(32)
+        rc = self._lib.bp_ctx_pedersen_commit(self._handle, value, blinding, commit_buf)
+        if rc != 0:
+            raise RuntimeError(f"Pedersen承诺失败，错误码: {rc}")
+        return commit_buf.raw
+
+    def pedersen_commit_batch(self, values: list[int], blindings: list[int]) -> bytes:
+        count = len(values)
+        if count != len(blindings):
+            raise ValueError("values与blindings长度必须一致")
+        if not hasattr(self._lib, "bp_ctx_pedersen_commit_batch"):
+            return b"".join(self.pedersen_commit(v, b) for v, b in zip(values, blindings))
+        arr = ctypes.c_uint64 * count
+        commits_buf = ctypes.create_string_buffer(32 * count)
+        rc = self._lib.bp_ctx_pedersen_commit_batch(self._handle, count, arr(*values), arr(*blindings), commits_buf)
+        if rc != 0:
+            raise RuntimeError(f"批量Pedersen承诺失败，错误码: {rc}")
+        return commits_buf.raw
+
+    def range_proof_prove(self, value: int, L: int, U: int, blinding: int) -> tuple[bytes, bytes]:
+        commit_buf = ctypes.create_string_buffer(32)
+        proof_buf = ctypes.create_string_buffer(10240)
+        proof_len = ctypes.c_size_t(0)
+        rc = self._lib.bp_ctx_range_proof_prove(
+            self._handle, value, L, U, blinding,
+            commit_buf, proof_buf, ctypes.byref(proof_len)
+        )
+        if rc != 0:
+            raise RuntimeError(f"范围证明生成失败，错误码: {rc}")
+        return commit_buf.raw, proof_buf.raw[:proof_len.value]
+
+    def range_proof_verify(self, L: int, U: int, commit: bytes, proof: bytes) -> bool:
+        if len(commit) != 32:
+            raise ValueError("承诺值必须是32字节")
+        return self._lib.bp_ctx_range_proof_verify(self._handle, L, U, commit, proof, len(proof)) == 0
+
+    def range_proof_prove_multiple(
+        self, values: list[int], bounds: list[tuple[int, int]], blindings: list[int]
+    ) -> tuple[list[bytes], bytes]:
+        count = len(values)
+        _aggregation_size(count)
+        arr = ctypes.c_uint64 * count
+        commits_buf = ctypes.create_string_buffer(32 * count)
+        proof_buf = ctypes.create_string_buffer(10240)
+        proof_len = ctypes.c_size_t(0)
+        rc = self._lib.bp_ctx_range_proof_prove_multiple(
+            self._handle, count,
+            arr(*values), arr(*(L for L, _ in bounds)), arr(*(U for _, U in bounds)), arr(*blindings),
+            commits_buf, proof_buf, ctypes.byref(proof_len)
+        )
+        if rc != 0:
+            raise RuntimeError(f"聚合范围证明生成失败，错误码: {rc}")
+        commits = [commits_buf.raw[i * 32:(i + 1) * 32] for i in range(count)]
+        return commits, proof_buf.raw[:proof_len.value]
+
+    def range_proof_verify_multiple(self, bounds: list[tuple[int, int]], commits: list[bytes], proof: bytes) -> bool:
+        count = len(commits)
+        if count != len(bounds) or any(len(c) != 32 for c in commits):
+            raise ValueError("承诺值必须是32字节，且与区间数量一致")
+        _aggregation_size(count)
+        arr = ctypes.c_uint64 * count
+        ls = arr(*(L for L, _ in bounds))
+        us = arr(*(U for _, U in bounds))
+        return self._lib.bp_ctx_range_proof_verify_multiple(
+            self._handle, count, ls, us, b"".join(commits), proof, len(proof)
+        ) == 0
+
+    def range_proof_verify_batch(self, items: list[tuple[int, int, bytes, bytes]]) -> list[bool]:
+        if not items:
+            return []
+        args = _pack_batch(items)
+        self._lib.bp_ctx_range_proof_verify_batch(self._handle, *args)
+        return [bool(r) for r in args[-1]]
+
+
+_default_ctx = None
+_default_ctx_lock = threading.Lock()
+
+
+def default_context():
+    global _default_ctx
+    lib = load_library()
+    if _default_ctx is None and lib and hasattr(lib, "bp_context_new"):
+        with _default_ctx_lock:
+            if _default_ctx is None:
+                _default_ctx = BulletproofsContext()
+                atexit.register(_default_ctx.close)
+    return _default_ctx
+
+
+def _pack_batch(items: list[tuple[int, int, bytes, bytes]]):
+    n = len(items)
+    for _, _, commit, _ in items:
+        if len(commit) != 32:
+            raise ValueError("承诺值必须是32字节")
+    ls = (ctypes.c_uint64 * n)(*(L for L, _, _, _ in items))
+    us = (ctypes.c_uint64 * n)(*(U for _, U, _, _ in items))
+    commits = b"".join(commit for _, _, commit, _ in items)
+    proofs = (ctypes.c_char_p * n)(*(proof for _, _, _, proof in items))
+    proof_lens = (ctypes.c_size_t * n)(*(len(proof) for _, _, _, proof in items))
+    results = (ctypes.c_uint8 * n)()
+    return n, ls, us, commits, proofs, proof_lens, results
+
 
 def pedersen_commit_py(value: int, blinding: int) -> bytes:
-    if _lib:
+    ctx = default_context()
+    if ctx:
+        return ctx.pedersen_commit(value, blinding)
+    lib = load_library()
+    if lib:
                  
         commit_buf = ctypes.create_string_buffer(32)
         
                
-        rc = _lib.bp_pedersen_commit(
+        rc = lib.bp_pedersen_commit(
             ctypes.c_uint64(value),
             ctypes.c_uint64(blinding),
             commit_buf
@@ -94,15 +269,27 @@ def pedersen_commit_py(value: int, blinding: int) -> bytes:
                          
         return fallback_pedersen_commit(value, blinding)
 
+def pedersen_commit_batch_py(values: list[int], blindings: list[int]) -> bytes:
+    ctx = default_context()
+    if ctx:
+        return ctx.pedersen_commit_batch(values, blindings)
+    if len(values) != len(blindings):
+        raise ValueError("values与blindings长度必须一致")
+    return b"".join(pedersen_commit_py(v, b) for v, b in zip(values, blindings))
+
 def range_proof_prove_py(value: int, L: int, U: int, blinding: int) -> tuple[bytes, bytes]:
-    if _lib:
+    ctx = default_context()
+    if ctx:
+        return ctx.range_proof_prove(value, L, U, blinding)
+    lib = load_library()
+    if lib:
                  
         commit_buf = ctypes.create_string_buffer(32)
         proof_buf = ctypes.create_string_buffer(10240)         
         proof_len = ctypes.c_size_t(0)
         
                
-        rc = _lib.bp_range_proof_prove(
+        rc = lib.bp_range_proof_prove(
             ctypes.c_uint64(value),
             ctypes.c_uint64(L),
             ctypes.c_uint64(U),
@@ -124,13 +311,17 @@ def range_proof_prove_py(value: int, L: int, U: int, blinding: int) -> tuple[byt
         return fallback_range_proof_prove(value, L, U, blinding)
 
 def range_proof_verify_py(L: int, U: int, commit: bytes, proof: bytes) -> bool:
-    if _lib:
+    ctx = default_context()
+    if ctx:
+        return ctx.range_proof_verify(L, U, commit, proof)
+    lib = load_library()
+    if lib:
                        
         if len(commit) != 32:
             raise ValueError("承诺值必须是32字节")
         
                
-        rc = _lib.bp_range_proof_verify(
+        rc = lib.bp_range_proof_verify(
             ctypes.c_uint64(L),
             ctypes.c_uint64(U),
             commit,
@@ -143,6 +334,33 @@ def range_proof_verify_py(L: int, U: int, commit: bytes, proof: bytes) -> bool:
                          
         return fallback_range_proof_verify(L, U, commit, proof)
 
+def range_proof_verify_batch_py(items: list[tuple[int, int, bytes, bytes]]) -> list[bool]:
+    if not items:
+        return []
+    ctx = default_context()
+    if ctx:
+        return ctx.range_proof_verify_batch(items)
+    lib = load_library()
+    if lib and hasattr(lib, "bp_range_proof_verify_batch"):
+        args = _pack_batch(items)
+        lib.bp_range_proof_verify_batch(*args)
+        return [bool(r) for r in args[-1]]
+    return [range_proof_verify_py(L, U, commit, proof) for L, U, commit, proof in items]
+
+def range_proof_prove_multiple_py(
+    values: list[int], bounds: list[tuple[int, int]], blindings: list[int]
+) -> tuple[list[bytes], bytes]:
+    ctx = default_context()
+    if ctx and hasattr(ctx._lib, "bp_ctx_range_proof_prove_multiple"):
+        return ctx.range_proof_prove_multiple(values, bounds, blindings)
+    return fallback_range_proof_prove_multiple(values, bounds, blindings)
+
+def range_proof_verify_multiple_py(bounds: list[tuple[int, int]], commits: list[bytes], proof: bytes) -> bool:
+    ctx = default_context()
+    if ctx and hasattr(ctx._lib, "bp_ctx_range_proof_verify_multiple"):
+        return ctx.range_proof_verify_multiple(bounds, commits, proof)
+    return False
+
                
 def fallback_pedersen_commit(value: int, blinding: int) -> bytes:
     commit = hashlib.sha256(f"{value}|{blinding}".encode()).digest()
@@ -155,4 +373,12 @@ def fallback_range_proof_prove(value: int, L: int, U: int, blinding: int) -> tup
 
 def fallback_range_proof_verify(L: int, U: int, commit: bytes, proof: bytes) -> bool:
                     
-    return True
\ No newline at end of file
+    return True
+
+def fallback_range_proof_prove_multiple(
+    values: list[int], bounds: list[tuple[int, int]], blindings: list[int]
+) -> tuple[list[bytes], bytes]:
+    _aggregation_size(len(values))
+    commits = [fallback_pedersen_commit(v, b) for v, b in zip(values, blindings)]
+    proof = hashlib.sha256(repr((list(values), list(bounds), list(blindings))).encode()).digest()
+    return commits, proof
@@ -0,0 +1,97 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Tuple
+
+_MISSING = object()
+
+
+def _prefix_of(key: Hashable) -> int:
+    if isinstance(key, (bytes, bytearray)):
+        return key[0] if key else 0
+    if isinstance(key, str):
+        tag = key.rsplit(":", 1)[-1]
+        try:
+            return int(tag[:4], 16)
+        except ValueError:
+            return hash(key)
+    return hash(key)
+
+
+class StripedRegistry:
+
+    def __init__(self, stripes: int = 64):
+        if stripes <= 0 or stripes & (stripes - 1):
+            raise ValueError("stripes必须是2的幂")
+        self._mask = stripes - 1
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._maps: List[Dict[Hashable, Any]] = [{} for _ in range(stripes)]
+
+    def _stripe(self, key: Hashable) -> int:
+        return _prefix_of(key) & self._mask
+
+    def check_and_insert(self, key: Hashable, value: Any = True) -> Tuple[bool, Any]:
+        i = self._stripe(key)
+        with self._locks[i]:
+            stripe = self._maps[i]
+            if key in stripe:
+                return False, stripe[key]
+            if callable(value):
+                value = value()
+            stripe[key] = value
+            return True, value
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        i = self._stripe(key)
+        with self._locks[i]:
+            return self._maps[i].get(key, default)
+
+    def discard(self, key: Hashable) -> bool:
+        i = self._stripe(key)
+        with self._locks[i]:
+            return self._maps[i].pop(key, _MISSING) is not _MISSING
+
+    def evict(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        evicted = 0
+        for lock, stripe in zip(self._locks, self._maps):
+            with lock:
+                stale = [k for k, v in stripe.items() if predicate(k, v)]
+                for k in stale:
+                    del stripe[k]
+                evicted += len(stale)
+        return evicted
+
+    def clear(self) -> None:
+        for lock, stripe in zip(self._locks, self._maps):
+            with lock:
+                stripe.clear()
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        out = []
+        for lock, stripe in zip(self._locks, self._maps):
+            with lock:
+                out.extend(stripe.items())
+        return out
+
+    def keys(self) -> List[Hashable]:
+        return [k for k, _ in self.items()]
+
+    def values(self) -> List[Any]:
+        return [v for _, v in self.items()]
+
+    def __contains__(self, key: Hashable) -> bool:
+        i = self._stripe(key)
+        with self._locks[i]:
+            return key in self._maps[i]
+
+    def __getitem__(self, key: Hashable) -> Any:
+        i = self._stripe(key)
+        with self._locks[i]:
+            return self._maps[i][key]
+
+    def __len__(self) -> int:
+        return sum(len(stripe) for stripe in self._maps)
+
+    def __bool__(self) -> bool:
+        return any(self._maps)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self.keys())
@@ -1,23 +1,21 @@
                            
 import os, hashlib, hmac, secrets, json, time, math
-USE_REAL = os.environ.get("USE_REAL_CRYPTO", "0") == "1"
+from functools import lru_cache
+from . import ed25519_backend
+from .lrs_backend import prepare_ring
+from .backend_registry import REGISTRY, use_backend, select_backend, capabilities
 
                                                      
-_ed25519_real = None
-SigningKey = None
-VerifyKey = None
-if USE_REAL:
-    try:
-        from nacl.signing import SigningKey, VerifyKey
-        _ed25519_real = True
-    except Exception:
-        _ed25519_real = False
-else:
-    _ed25519_real = False
+def _load_pynacl():
+    from nacl.signing import SigningKey, VerifyKey
+    return {"SigningKey": SigningKey, "VerifyKey": VerifyKey, "native": True}
+
+REGISTRY.register("ed25519", "pynacl", _load_pynacl)
 
 def ed25519_generate_keypair():
-    if _ed25519_real and SigningKey:
-        sk = SigningKey.generate()
+    impl = REGISTRY.get("ed25519")
+    if impl:
+        sk = impl["SigningKey"].generate()
         pk = sk.verify_key
         return sk, pk
     sk = secrets.token_bytes(32)
@@ -25,94 +23,143 @@ def ed25519_generate_keypair():
     return sk, pk
 
 def ed25519_sign(sk, msg: bytes) -> bytes:
-    if _ed25519_real and hasattr(sk, "sign"):
+    impl = REGISTRY.get("ed25519")
+    if impl and hasattr(sk, "sign"):
         return sk.sign(msg).signature
+    if impl and isinstance(sk, (bytes, bytearray)) and len(sk) == 32:
+        return impl["SigningKey"](bytes(sk)).sign(msg).signature
     key = sk if isinstance(sk, (bytes, bytearray)) else bytes(sk)[:32]
     return hmac.new(key, msg, hashlib.sha256).digest()
 
+@lru_cache(maxsize=1024)
+def _cached_verify_key(verify_key_cls, pk: bytes):
+    return verify_key_cls(pk)
+
+def ed25519_verify_key(pk):
+    impl = REGISTRY.get("ed25519")
+    if impl is None or hasattr(pk, "verify"):
+        return pk
+    return _cached_verify_key(impl["VerifyKey"], bytes(pk))
+
 def ed25519_verify(pk, msg: bytes, sig: bytes) -> bool:
-    if _ed25519_real and VerifyKey:
+    impl = REGISTRY.get("ed25519")
+    if impl:
         try:
-            verify_key = VerifyKey(bytes(pk))
-            verify_key.verify(msg, sig)
+            ed25519_verify_key(pk).verify(msg, sig)
             return True
         except Exception:
             return False
     return False
 
+def ed25519_verify_batch(items: list[tuple]) -> list[bool]:
+    impl = REGISTRY.get("ed25519")
+    if impl and ed25519_backend.available():
+        try:
+            return ed25519_backend.ed25519_verify_batch_py([(bytes(pk), msg, sig) for pk, msg, sig in items])
+        except Exception as e:
+            print(f"Ed25519批量验证失败，回退到逐个验证: {e}")
+    return [ed25519_verify(pk, msg, sig) for pk, msg, sig in items]
+
                                                         
-_lrs_real = None
-_lrs_backend = None
-if USE_REAL:
-    try:
-                    
-        from .lrs_backend import lsag_sign_py, lsag_verify_py
-        _lrs_backend = {"sign": lsag_sign_py, "verify": lsag_verify_py}
-        _lrs_real = True
-    except Exception as e:
-        print(f"警告: 无法加载LSAG后端: {e}")
-        _lrs_real = False
-else:
-    _lrs_real = False
-
-def lrs_sign(message: bytes, ring_pubkeys: list[bytes], signer_index: int, sk_signer, ctx: bytes) -> dict:
-                     
-    processed_ring_pubkeys = []
-    for pk in ring_pubkeys:
-        if hasattr(pk, 'encode'):
-                   
-            processed_ring_pubkeys.append(pk.encode() if isinstance(pk, str) else bytes(pk))
-        elif hasattr(pk, '__bytes__'):
-                                         
-            processed_ring_pubkeys.append(bytes(pk))
-        else:
-                             
-            processed_ring_pubkeys.append(bytes(pk))
+def _load_lsag():
+    from . import lrs_backend
+    if lrs_backend.load_library() is None:
+        return None
+    return {
+        "sign": lrs_backend.lsag_sign_py,
+        "verify": lrs_backend.lsag_verify_py,
+        "verify_many": lrs_backend.lsag_verify_many,
+        "public_key": lrs_backend.lsag_public_key_py,
+        "key_image": lambda sk, ctx: lrs_backend.lsag_key_image_py(sk),
+        "presign": lrs_backend.lsag_presign_py,
+        "native": True
+    }
+
+REGISTRY.register("lrs", "lsag", _load_lsag)
+
+def _load_groth_kohlweiss():
+    from . import gk_backend, lrs_backend
+    if not gk_backend.available():
+        return None
+    return {
+        "sign": gk_backend.gk_sign_py,
+        "verify": gk_backend.gk_verify_py,
+        "verify_many": gk_backend.gk_verify_many,
+        "public_key": lrs_backend.lsag_public_key_py,
+        "key_image": gk_backend.gk_key_image_py,
+        "label": "gk_real",
+        "native": True
+    }
+
+REGISTRY.register("lrs", "groth_kohlweiss", _load_groth_kohlweiss)
+
+def lrs_public_key(sk: bytes):
+    backend = REGISTRY.get("lrs")
+    if backend and backend.get("native") and "public_key" in backend:
+        return backend["public_key"](sk)
+    return None
+
+def _fallback_link_tag(sk_signer, ctx: bytes) -> str:
+    sk = bytes(sk_signer) if isinstance(sk_signer, (bytes, bytearray)) else bytes(str(sk_signer), 'utf-8')
+    return hashlib.sha256(ctx + hashlib.sha256(sk).digest()).hexdigest()
+
+def lrs_link_tag(sk_signer, ctx: bytes) -> str:
+    backend = REGISTRY.get("lrs")
+    if backend and backend.get("native") and "key_image" in backend:
+        image = backend["key_image"](sk_signer, ctx)
+        if image is not None:
+            return image.hex()
+    return _fallback_link_tag(sk_signer, ctx)
+
+def lrs_presign(ring_pubkeys, sk_signer):
+    backend = REGISTRY.get("lrs")
+    if backend and backend.get("native") and "presign" in backend:
+        try:
+            return backend["presign"](prepare_ring(ring_pubkeys), sk_signer)
+        except Exception as e:
+            print(f"LSAG预签名失败，改为在线签名: {e}")
+    return None
+
+def lrs_sign(message: bytes, ring_pubkeys, signer_index: int, sk_signer, ctx: bytes, presig=None) -> dict:
+    ring = prepare_ring(ring_pubkeys)
     
-    if _lrs_real and _lrs_backend:
+    backend = REGISTRY.get("lrs")
+    if backend:
         try:
-            sig, keyimage = _lrs_backend["sign"](message, processed_ring_pubkeys, sk_signer, ctx)
+            if presig is not None and "presign" in backend and presig.ring.digest == ring.digest:
+                sig, keyimage = presig.sign(message, ctx)
+            else:
+                sig, keyimage = backend["sign"](message, ring, sk_signer, ctx)
             return {
-                "ring": [pk.hex() for pk in processed_ring_pubkeys],
+                "ring": ring.hex,
                 "sig": sig.hex(),
                 "ctx": ctx.hex(),
                 "link_tag": keyimage.hex(),                         
-                "backend": "lsag_real"
+                "backend": backend.get("label", "lsag_real")
             }
         except Exception as e:
             print(f"LSAG签名失败，回退到占位符实现: {e}")
     
            
-    tag = hashlib.sha256(ctx + hashlib.sha256(bytes(sk_signer) if isinstance(sk_signer, (bytes, bytearray)) else bytes(str(sk_signer), 'utf-8')).digest()).hexdigest()
+    tag = _fallback_link_tag(sk_signer, ctx)
     sig = ed25519_sign(sk_signer if isinstance(sk_signer, (bytes, bytearray)) else bytes(str(sk_signer), 'utf-8')[:32], message + ctx)
-    return {"ring": [pk.hex() for pk in processed_ring_pubkeys],
+    return {"ring": ring.hex,
             "sig": sig.hex(),
             "ctx": ctx.hex(),
             "link_tag": tag,
             "backend": "fallback"}
 
-def lrs_verify(message: bytes, lrs_obj: dict, ring_pubkeys_bytes: list[bytes]) -> bool:
-                     
-    processed_ring_pubkeys = []
-    for pk in ring_pubkeys_bytes:
-        if hasattr(pk, 'encode'):
-                   
-            processed_ring_pubkeys.append(pk.encode() if isinstance(pk, str) else bytes(pk))
-        elif hasattr(pk, '__bytes__'):
-                                         
-            processed_ring_pubkeys.append(bytes(pk))
-        else:
-                             
-            processed_ring_pubkeys.append(bytes(pk))
-    
-    if _lrs_real and _lrs_backend:
+def lrs_verify(message: bytes, lrs_obj: dict, ring_pubkeys_bytes) -> bool:
+    backend = REGISTRY.get("lrs")
+    if backend:
         try:
             sig = bytes.fromhex(lrs_obj["sig"])
             keyimage = bytes.fromhex(lrs_obj["link_tag"])
             ctx = bytes.fromhex(lrs_obj["ctx"])
-            return _lrs_backend["verify"](message, processed_ring_pubkeys, sig, keyimage, ctx)
+            return bool(backend["verify"](message, prepare_ring(ring_pubkeys_bytes), sig, keyimage, ctx))
         except Exception as e:
-            print(f"LSAG验证失败，回退到占位符实现: {e}")
+            print(f"LSAG验证失败，拒绝该签名: {e}")
+            return False
     
            
     try:
@@ -121,47 +168,77 @@ def lrs_verify(message: bytes, lrs_obj: dict, ring_pubkeys_bytes: list[bytes]) -
     except Exception:
         return False
 
-                                                            
-_bp_real = None
-_bp_backend = None
-if USE_REAL:
-    try:
-                            
+def lrs_verify_many(items: list[tuple[bytes, dict, object]], workers: int = 4) -> list[bool]:
+    backend = REGISTRY.get("lrs")
+    if backend:
         try:
-            from .bulletproofs_backend import pedersen_commit_py, range_proof_prove_py, range_proof_verify_py
-            _bp_backend = {
-                "commit": pedersen_commit_py,
-                "prove": range_proof_prove_py,
-                "verify": range_proof_verify_py
-            }
-        except ImportError:
-                                      
-            pass
-        _bp_real = bool(_bp_backend)
-    except Exception as e:
-        print(f"警告: 无法加载Bulletproofs后端: {e}")
-        _bp_real = False
-else:
-    _bp_real = False
+            native_items = [
+                (
+                    message,
+                    prepare_ring(ring),
+                    bytes.fromhex(lrs_obj["sig"]),
+                    bytes.fromhex(lrs_obj["link_tag"]),
+                    bytes.fromhex(lrs_obj["ctx"])
+                )
+                for message, lrs_obj, ring in items
+            ]
+            return backend["verify_many"](native_items, workers=workers)
+        except Exception as e:
+            print(f"LSAG批量验证失败，回退到逐个验证: {e}")
+    return [lrs_verify(message, lrs_obj, ring) for message, lrs_obj, ring in items]
+
+                                                            
+def _load_bulletproofs():
+    from . import bulletproofs_backend as bp
+    if bp.load_library() is None:
+        return None
+    return {
+        "commit": bp.pedersen_commit_py,
+        "commit_batch": bp.pedersen_commit_batch_py,
+        "prove": bp.range_proof_prove_py,
+        "verify": bp.range_proof_verify_py,
+        "verify_batch": bp.range_proof_verify_batch_py,
+        "prove_multiple": bp.range_proof_prove_multiple_py,
+        "verify_multiple": bp.range_proof_verify_multiple_py,
+        "bit_width": bp.proof_bit_width,
+        "native": True
+    }
+
+REGISTRY.register("range_proof", "bulletproofs", _load_bulletproofs)
 
 def pedersen_commit(value: int, blinding: int) -> str:
-    if _bp_real and _bp_backend:
+    backend = REGISTRY.get("range_proof")
+    if backend:
         try:
-            C = _bp_backend["commit"](value, blinding)
+            C = backend["commit"](value, blinding)
             return C.hex()
         except Exception as e:
             print(f"Pedersen承诺失败，回退到占位符实现: {e}")
     return hashlib.sha256(f"{value}|{blinding}".encode()).hexdigest()
 
+def pedersen_commit_batch(values: list[int], blindings: list[int]) -> list[str]:
+    if len(values) != len(blindings):
+        raise ValueError("values、blindings长度必须一致")
+    backend = REGISTRY.get("range_proof")
+    if backend:
+        try:
+            packed = backend["commit_batch"](values, blindings)
+            return [packed[i:i + 32].hex() for i in range(0, len(packed), 32)]
+        except Exception as e:
+            print(f"批量Pedersen承诺失败，回退到占位符实现: {e}")
+    return [hashlib.sha256(f"{v}|{b}".encode()).hexdigest() for v, b in zip(values, blindings)]
+
 def range_proof_prove(value: int, L: int, U: int, blinding: int) -> dict:
-    if _bp_real and _bp_backend:
+    backend = REGISTRY.get("range_proof")
+    if backend:
         try:
-            C, proof = _bp_backend["prove"](value, L, U, blinding)
+            C, proof = backend["prove"](value, L, U, blinding)
             return {
                 "commitment": C.hex(),
                 "proof_hex": proof.hex(),
                 "L": L,
-                "U": U
+                "U": U,
+                "bits": backend["bit_width"](proof)
             }
         except Exception as e:
             print(f"范围证明生成失败，回退到占位符实现: {e}")
@@ -170,16 +247,73 @@ def range_proof_prove(value: int, L: int, U: int, blinding: int) -> dict:
     return {"commitment": pedersen_commit(value, blinding), "L": L, "U": U, "value_hint": value, "blinding_hint": blinding, "backend": "fallback"}
 
 def range_proof_verify(proof: dict) -> bool:
-    if _bp_real and _bp_backend:
+    backend = REGISTRY.get("range_proof")
+    if backend:
         try:
             C = bytes.fromhex(proof["commitment"])
             p = bytes.fromhex(proof["proof_hex"])
             L = proof["L"]; U = proof["U"]
-            return _bp_backend["verify"](L, U, C, p)
+            return backend["verify"](L, U, C, p)
         except Exception as e:
             print(f"范围证明验证失败，回退到占位符实现: {e}")
     
            
     v = int(proof.get("value_hint", 0)); L = int(proof["L"]); U = int(proof["U"])
     b = int(proof.get("blinding_hint", 0))
-    return (L <= v <= U) and (proof["commitment"] == pedersen_commit(v, b))
\ No newline at end of file
+    return (L <= v <= U) and (proof["commitment"] == pedersen_commit(v, b))
+
+def range_proof_verify_batch(proofs: list[dict]) -> list[bool]:
+    backend = REGISTRY.get("range_proof")
+    if backend:
+        try:
+            items = [
+                (p["L"], p["U"], bytes.fromhex(p["commitment"]), bytes.fromhex(p["proof_hex"]))
+                for p in proofs
+            ]
+            return backend["verify_batch"](items)
+        except Exception as e:
+            print(f"批量范围证明验证失败，回退到逐个验证: {e}")
+    return [range_proof_verify(p) for p in proofs]
+
+def range_proof_prove_aggregate(values: list[int], bounds: list[tuple[int, int]], blindings: list[int]) -> dict:
+    if not (len(values) == len(bounds) == len(blindings)):
+        raise ValueError("values、bounds、blindings长度必须一致")
+    backend = REGISTRY.get("range_proof")
+    if backend:
+        try:
+            commits, proof = backend["prove_multiple"](values, bounds, blindings)
+            return {
+                "commitments": [C.hex() for C in commits],
+                "proof_hex": proof.hex(),
+                "bounds": [[L, U] for L, U in bounds],
+                "bits": backend["bit_width"](proof)
+            }
+        except Exception as e:
+            print(f"聚合范围证明生成失败，回退到占位符实现: {e}")
+    
+    return {
+        "commitments": [pedersen_commit(v, b) for v, b in zip(values, blindings)],
+        "bounds": [[L, U] for L, U in bounds],
+        "value_hints": list(values),
+        "blinding_hints": list(blindings),
+        "backend": "fallback"
+    }
+
+def range_proof_verify_aggregate(proof: dict) -> bool:
+    bounds = [(int(L), int(U)) for L, U in proof["bounds"]]
+    backend = REGISTRY.get("range_proof")
+    if backend and "proof_hex" in proof:
+        try:
+            commits = [bytes.fromhex(C) for C in proof["commitments"]]
+            return backend["verify_multiple"](bounds, commits, bytes.fromhex(proof["proof_hex"]))
+        except Exception as e:
+            print(f"聚合范围证明验证失败，回退到占位符实现: {e}")
+    
+    values = proof.get("value_hints", [])
+    blindings = proof.get("blinding_hints", [])
+    if not (len(values) == len(blindings) == len(bounds) == len(proof["commitments"])):
+        return False
+    return all(
+        L <= int(v) <= U and C == pedersen_commit(int(v), int(b))
+        for (L, U), v, b, C in zip(bounds, values, blindings, proof["commitments"])
+    )
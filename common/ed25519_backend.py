@@ -0,0 +1,45 @@
+import ctypes
+
+from .native_loader import load_native_library
+
+
+def _configure(lib):
+    if not hasattr(lib, "ed25519_verify_batch"):
+        return
+    lib.ed25519_verify_batch.argtypes = [
+        ctypes.c_size_t,
+        ctypes.c_char_p,
+        ctypes.POINTER(ctypes.c_char_p), ctypes.POINTER(ctypes.c_size_t),
+        ctypes.c_char_p,
+        ctypes.POINTER(ctypes.c_uint8)
+    ]
+    lib.ed25519_verify_batch.restype = ctypes.c_int
+
+
+def load_library():
+    lib = load_native_library("bulletproofs", _configure)
+    return lib if lib is not None and hasattr(lib, "ed25519_verify_batch") else None
+
+
+def available() -> bool:
+    return load_library() is not None
+
+
+def ed25519_verify_batch_py(items: list[tuple[bytes, bytes, bytes]]) -> list[bool]:
+    results = [False] * len(items)
+    valid = [i for i, (pk, _, sig) in enumerate(items) if len(pk) == 32 and len(sig) == 64]
+    n = len(valid)
+    if n == 0:
+        return results
+    msgs = [items[i][1] for i in valid]
+    out = (ctypes.c_uint8 * n)()
+    load_library().ed25519_verify_batch(
+        n,
+        b"".join(items[i][0] for i in valid),
+        (ctypes.c_char_p * n)(*msgs), (ctypes.c_size_t * n)(*(len(m) for m in msgs)),
+        b"".join(items[i][2] for i in valid),
+        out
+    )
+    for i, ok in zip(valid, out):
+        results[i] = bool(ok)
+    return results
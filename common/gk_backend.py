@@ -0,0 +1,88 @@
+import ctypes
+
+from .lrs_backend import _sign_buffers, normalize_pubkey, prepare_ring, verify_many
+from .native_loader import load_native_library
+
+
+def _configure(lib):
+    if not hasattr(lib, "gk_sign"):
+        return
+    lib.gk_sign.argtypes = [
+        ctypes.c_char_p, ctypes.c_size_t,
+        ctypes.POINTER(ctypes.c_char_p), ctypes.c_size_t,
+        ctypes.c_char_p,
+        ctypes.c_char_p, ctypes.c_size_t,
+        ctypes.c_char_p, ctypes.POINTER(ctypes.c_size_t),
+        ctypes.c_char_p
+    ]
+    lib.gk_sign.restype = ctypes.c_int
+    lib.gk_verify.argtypes = [
+        ctypes.c_char_p, ctypes.c_size_t,
+        ctypes.POINTER(ctypes.c_char_p), ctypes.c_size_t,
+        ctypes.c_char_p,
+        ctypes.c_char_p, ctypes.c_size_t,
+        ctypes.c_char_p
+    ]
+    lib.gk_verify.restype = ctypes.c_int
+    if hasattr(lib, "gk_key_image"):
+        lib.gk_key_image.argtypes = [ctypes.c_char_p, ctypes.c_char_p, ctypes.c_size_t, ctypes.c_char_p]
+        lib.gk_key_image.restype = ctypes.c_int
+
+
+def load_library():
+    lib = load_native_library("bulletproofs", _configure)
+    return lib if lib is not None and hasattr(lib, "gk_sign") else None
+
+
+def available() -> bool:
+    return load_library() is not None
+
+
+def signature_size(ring_size: int) -> int:
+    bits = max(1, (ring_size - 1).bit_length())
+    return 32 * (8 * bits + 1)
+
+
+def gk_sign_py(msg: bytes, ring_pubkeys, sk_signer, ctx: bytes):
+    ring = prepare_ring(ring_pubkeys)
+    sig_buf, sig_len, keyimg_buf = _sign_buffers(len(ring))
+    sig_len.value = 0
+    rc = load_library().gk_sign(
+        msg, len(msg),
+        ring.c_array, len(ring),
+        normalize_pubkey(sk_signer),
+        ctx, len(ctx),
+        sig_buf, ctypes.byref(sig_len),
+        keyimg_buf
+    )
+    if rc != 0:
+        raise RuntimeError(f"GK环签名失败，错误码: {rc}")
+    return sig_buf.raw[:sig_len.value], keyimg_buf.raw[:32]
+
+
+def gk_key_image_py(sk: bytes, ctx: bytes) -> bytes:
+    lib = load_library()
+    if lib is None or not hasattr(lib, "gk_key_image"):
+        raise RuntimeError("GK库缺少gk_key_image")
+    out = ctypes.create_string_buffer(32)
+    rc = lib.gk_key_image(normalize_pubkey(sk), ctx, len(ctx), out)
+    if rc != 0:
+        raise RuntimeError(f"GK密钥镜像计算失败，错误码: {rc}")
+    return out.raw
+
+
+def gk_verify_py(msg: bytes, ring_pubkeys, sig: bytes, keyimage: bytes, ctx: bytes) -> bool:
+    ring = prepare_ring(ring_pubkeys)
+    if len(sig) != signature_size(len(ring)) or len(keyimage) != 32:
+        return False
+    return load_library().gk_verify(
+        msg, len(msg),
+        ring.c_array, len(ring),
+        sig,
+        ctx, len(ctx),
+        keyimage
+    ) == 0
+
+
+def gk_verify_many(items: list[tuple], workers: int = 4) -> list[bool]:
+    return verify_many(gk_verify_py, items, workers)
@@ -1,59 +1,121 @@
 import hashlib
+import hmac
 import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Optional
+
+from . import mlkem_backend
+
+KEM_LEVELS = {512: 2, 768: 3, 1024: 4}
+DEFAULT_LEVEL = 512
 
             
-_kyber_lib = None
-try:
-    from kyber_py.kyber import Kyber512
-    _kyber_lib = Kyber512
-except ImportError:
-    pass
+_kyber_libs: Dict[int, object] = {}
+
+
+def _kyber(level: int = DEFAULT_LEVEL):
+    if level not in _kyber_libs:
+        try:
+            from kyber_py import kyber
+            _kyber_libs[level] = getattr(kyber, f"Kyber{level}")
+        except ImportError:
+            _kyber_libs[level] = None
+    return _kyber_libs[level]
+
+
+def _check_level(level: int) -> int:
+    if level not in KEM_LEVELS:
+        raise ValueError(f"不支持的KEM参数集: {level}，可选 {sorted(KEM_LEVELS)}")
+    return level
+
+
+def _check_pool_level(pool, level: int) -> None:
+    if pool is not None and getattr(pool, "level", None) is not None and pool.level != level:
+        raise ValueError(f"预计算池的KEM参数集 {pool.level} 与当前参数集 {level} 不一致")
+
+
+def _stub_pk_span(level: int) -> slice:
+    k = KEM_LEVELS[level]
+    return slice(384 * k, 2 * 384 * k + 32)
+
 
 class KEMServer:
-    def __init__(self):
+    def __init__(self, keypair_pool: Optional["PrecomputePool"] = None, level: int = DEFAULT_LEVEL):
         self.pk = None
         self.sk = None
+        self.level = _check_level(level)
+        self.native = mlkem_backend.available()
                      
-        self.kyber = _kyber_lib
+        self.kyber = None if self.native else _kyber(level)
+        _check_pool_level(keypair_pool, self.level)
+        self.keypair_pool = keypair_pool
     
     def setup_keys(self):
+        if self.keypair_pool is not None:
+            self.pk, self.sk = self.keypair_pool.take()
+            return self.pk, self.sk
+        return self.generate_keys()
+    
+    def generate_keys(self):
+        if self.native:
+            self.pk, self.sk = mlkem_backend.mlkem_keygen_py(self.level)
+            return self.pk, self.sk
         if self.kyber:
                           
             self.pk, self.sk = self.kyber.keygen()
             return self.pk, self.sk
         else:
                    
-            self.pk = os.urandom(800)                
-            self.sk = os.urandom(1632)                
+            k = KEM_LEVELS[self.level]
+            self.pk = os.urandom(384 * k + 32)                
+            self.sk = os.urandom(384 * k) + self.pk + hashlib.sha256(self.pk).digest() + os.urandom(32)
             return self.pk, self.sk
     
     def finish_handshake(self, ct):
-        if self.kyber:
+        if self.native or self.kyber:
                           
             try:
-                ss_server = self.kyber.decaps(self.sk, ct)          
+                if self.native:
+                    ss_server = mlkem_backend.mlkem_decaps_py(self.level, self.sk, ct)
+                else:
+                    ss_server = self.kyber.decaps(self.sk, ct)          
             except Exception as e:
                                   
                 print(f"Kyber解封装失败，回退到占位符实现: {e}")
                 ss_server = hashlib.sha256(ct + self.sk).digest()
         else:
                    
-            ss_server = hashlib.sha256(ct + self.sk).digest()
+            ss_server = hashlib.sha256(ct + self.sk[_stub_pk_span(self.level)]).digest()
         
                      
         key = hashlib.sha256(ss_server).digest()
         return key
 
 class KEMClient:
-    def __init__(self):
+    def __init__(self, encaps_pool: Optional["EncapsulationPool"] = None, level: int = DEFAULT_LEVEL):
+        self.level = _check_level(level)
+        self.native = mlkem_backend.available()
                      
-        self.kyber = _kyber_lib
+        self.kyber = None if self.native else _kyber(level)
+        _check_pool_level(encaps_pool, self.level)
+        self.encaps_pool = encaps_pool
     
     def handshake(self, pk):
-        if self.kyber:
+        if self.encaps_pool is not None:
+            return self.encaps_pool.take(pk)
+        return self.encapsulate(pk)
+    
+    def encapsulate(self, pk):
+        if self.native or self.kyber:
                           
             try:
-                ss_client, ct = self.kyber.encaps(pk)           
+                if self.native:
+                    ct, ss_client = mlkem_backend.mlkem_encaps_py(self.level, bytes(pk))
+                else:
+                    ss_client, ct = self.kyber.encaps(pk)           
             except Exception as e:
                                  
                 print(f"Kyber封装失败，回退到占位符实现: {e}")
@@ -68,16 +130,16 @@ class KEMClient:
         key = hashlib.sha256(ss_client).digest()
         return ct, key
 
-def server_setup_keys():
-    server = KEMServer()
+def server_setup_keys(level: int = DEFAULT_LEVEL):
+    server = KEMServer(level=level)
     return server.setup_keys()
 
-def client_handshake(pk):
-    client = KEMClient()
+def client_handshake(pk, level: int = DEFAULT_LEVEL):
+    client = KEMClient(level=level)
     return client.handshake(pk)
 
-def server_finish(ct, sk):
-    server = KEMServer()
+def server_finish(ct, sk, level: int = DEFAULT_LEVEL):
+    server = KEMServer(level=level)
     server.sk = sk
     return server.finish_handshake(ct)
 
@@ -110,14 +172,330 @@ def example_client_handshake(conn):
     return session_key
 
                                 
-def kem_keygen():
-    return server_setup_keys()
+def kem_keygen(level: int = DEFAULT_LEVEL):
+    return server_setup_keys(level)
+
+def kem_encaps(pk, level: int = DEFAULT_LEVEL):
+    return client_handshake(pk, level)
+
+def kem_decaps(sk, ct, level: int = DEFAULT_LEVEL):
+    return server_finish(ct, sk, level)
+
+class PrecomputePool:
+
+    def __init__(
+        self,
+        produce: Callable[[], tuple],
+        capacity: int = 8,
+        name: str = "kem-precompute",
+        level: Optional[int] = None
+    ):
+        self._produce = produce
+        self.capacity = capacity
+        self.name = name
+        self.level = level
+        self.hits = 0
+        self.misses = 0
+        self._items: Deque[tuple] = deque()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+    def start(self) -> "PrecomputePool":
+        with self._cond:
+            if self._thread is None:
+                self._stopped = False
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._cond:
+            self._stopped = True
+            thread, self._thread = self._thread, None
+            self._cond.notify_all()
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._stopped and len(self._items) >= self.capacity:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+            try:
+                item = self._produce()
+            except Exception as e:
+                print(f"KEM预计算失败: {e}")
+                time.sleep(0.1)
+                continue
+            with self._cond:
+                self._items.append(item)
+
+    def take(self) -> tuple:
+        with self._cond:
+            if self._items:
+                self.hits += 1
+                item = self._items.popleft()
+                self._cond.notify()
+                return item
+            self.misses += 1
+            self._cond.notify()
+        return self._produce()
+
+    def stats(self) -> Dict[str, int]:
+        return {"ready": len(self._items), "hits": self.hits, "misses": self.misses}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+def keypair_pool(capacity: int = 8, level: int = DEFAULT_LEVEL) -> PrecomputePool:
+    return PrecomputePool(
+        lambda: KEMServer(level=level).generate_keys(), capacity, name="kem-keypairs", level=_check_level(level)
+    ).start()
+
+
+class EncapsulationPool:
+
+    def __init__(self, capacity_per_key: int = 8, max_keys: int = 16, level: int = DEFAULT_LEVEL):
+        self.level = _check_level(level)
+        self.capacity_per_key = capacity_per_key
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._pools: Dict[bytes, PrecomputePool] = {}
+
+    def _pool(self, pk) -> PrecomputePool:
+        pk = bytes(pk)
+        peer = hashlib.sha256(pk).digest()
+        with self._lock:
+            pool = self._pools.get(peer)
+            if pool is None:
+                if len(self._pools) >= self.max_keys:
+                    self._pools.pop(next(iter(self._pools))).stop(timeout=0)
+                pool = self._pools[peer] = PrecomputePool(
+                    lambda: KEMClient(level=self.level).encapsulate(pk),
+                    self.capacity_per_key,
+                    name="kem-encaps",
+                    level=self.level
+                ).start()
+            return pool
+
+    def prime(self, pk) -> None:
+        self._pool(pk)
+
+    def take(self, pk) -> tuple:
+        return self._pool(pk).take()
+
+    def stop(self) -> None:
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.stop()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            pools = list(self._pools.values())
+        return {
+            "keys": len(pools),
+            "ready": sum(len(p) for p in pools),
+            "hits": sum(p.hits for p in pools),
+            "misses": sum(p.misses for p in pools)
+        }
+
+
+def register_pool_metrics(registry, name: str, pool) -> None:
+    registry.gauge(f"pcvcs_{name}_ready", f"Precomputed {name} entries ready", lambda: pool.stats()["ready"])
+    registry.callback_counter(f"pcvcs_{name}_hits_total", f"{name} requests served from the pool", lambda: pool.stats()["hits"])
+    registry.callback_counter(f"pcvcs_{name}_misses_total", f"{name} requests computed inline", lambda: pool.stats()["misses"])
+
+
+_secretbox = None
+_secretbox_loaded = False
+
+
+def _secretbox_cls():
+    global _secretbox, _secretbox_loaded
+    if not _secretbox_loaded:
+        try:
+            from nacl.secret import SecretBox
+            _secretbox = SecretBox
+        except ImportError:
+            pass
+        _secretbox_loaded = True
+    if _secretbox is None:
+        raise RuntimeError("未安装PyNaCl，无法提供AEAD加密（pip install pynacl）")
+    return _secretbox
+
+
+def _bound_key(key: bytes, ad: bytes) -> bytes:
+    return hashlib.blake2b(len(ad).to_bytes(8, "big") + ad, key=key, digest_size=32, person=b"pcvcs-aead").digest()
+
+
+def report_ad(session_id: str, counter: int) -> bytes:
+    return session_id.encode("utf-8") + b"|" + counter.to_bytes(8, "big")
+
+
+def aead_seal(key: bytes, plaintext: bytes, ad: bytes = b"") -> bytes:
+    return bytes(_secretbox_cls()(_bound_key(key, ad)).encrypt(plaintext))
+
+
+def aead_open(key: bytes, sealed: bytes, ad: bytes = b"") -> bytes:
+    box = _secretbox_cls()(_bound_key(key, ad))
+    try:
+        return box.decrypt(sealed)
+    except Exception as e:
+        raise ValueError(f"密文认证失败: {e}")
+
+
+@dataclass
+class KEMSession:
+    session_id: str
+    key: bytes
+    created_at: float
+    kem_ct: Optional[bytes] = None
+    reports: int = 0
+    last_counter: int = -1
+
+    def exhausted(self, max_reports: int, max_age_s: float, now: float) -> bool:
+        return self.reports >= max_reports or now - self.created_at >= max_age_s
+
+
+@dataclass
+class KEMSessionStats:
+    handshakes: int = 0
+    reports: int = 0
+    rejected: int = 0
+
+    @property
+    def reports_per_session(self) -> float:
+        return self.reports / self.handshakes if self.handshakes else 0.0
+
+
+class KEMSessionManager:
+
+    def __init__(
+        self,
+        max_reports: int = 20,
+        max_age_s: float = 300.0,
+        encaps_pool: Optional[EncapsulationPool] = None,
+        level: int = DEFAULT_LEVEL,
+        max_sessions: int = 4096
+    ):
+        self.level = _check_level(level)
+        _check_pool_level(encaps_pool, self.level)
+        self.max_reports = max_reports
+        self.max_age_s = max_age_s
+        self.max_sessions = max_sessions
+        self.encaps_pool = encaps_pool
+        self.stats = KEMSessionStats()
+        self._lock = threading.Lock()
+        self._outgoing: Dict[bytes, KEMSession] = {}
+        self._incoming: Dict[str, KEMSession] = {}
+
+    def _client_session(self, server_pk: bytes, now: float) -> KEMSession:
+        peer = hashlib.sha256(bytes(server_pk)).digest()
+        session = self._outgoing.get(peer)
+        if session is None or session.exhausted(self.max_reports, self.max_age_s, now):
+            ct, key = KEMClient(self.encaps_pool, self.level).handshake(server_pk)
+            session = KEMSession(os.urandom(16).hex(), key, now, kem_ct=bytes(ct))
+            self._outgoing[peer] = session
+            self.stats.handshakes += 1
+        return session
+
+    def prepare(self, server_pk: bytes) -> None:
+        if self.encaps_pool is not None:
+            self.encaps_pool.prime(server_pk)
+        with self._lock:
+            self._client_session(server_pk, time.monotonic())
+
+    def seal_report(self, server_pk: bytes, payload: bytes) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            session = self._client_session(server_pk, now)
+            counter = session.reports
+            kem_ct = session.kem_ct if counter == 0 else None
+            session.reports += 1
+            self.stats.reports += 1
+        ad = report_ad(session.session_id, counter)
+        envelope = {
+            "session_id": session.session_id,
+            "counter": counter,
+            "ciphertext": aead_seal(session.key, payload, ad).hex()
+        }
+        if kem_ct is not None:
+            envelope["kem_ct"] = kem_ct.hex()
+        return envelope
+
+    def open_report(self, sk: bytes, envelope: dict) -> bytes:
+        now = time.monotonic()
+        session_id = envelope["session_id"]
+        counter = envelope.get("counter")
+        with self._lock:
+            if type(counter) is not int or counter < 0:
+                self.stats.rejected += 1
+                raise ValueError(f"KEM报告计数器无效: {counter!r}")
+            session = self._incoming.get(session_id)
+            if session is None and "kem_ct" not in envelope:
+                self.stats.rejected += 1
+                raise KeyError(f"未知的KEM会话: {session_id}")
+            if session is not None and session.exhausted(self.max_reports, self.max_age_s, now):
+                self.stats.rejected += 1
+                raise ValueError(f"KEM会话已达到上限: {session_id}")
+            if session is not None and counter <= session.last_counter:
+                self.stats.rejected += 1
+                raise ValueError(f"KEM报告计数器未递增，疑似重放: {session_id}#{counter}")
+        try:
+            key = session.key if session is not None else server_finish(bytes.fromhex(envelope["kem_ct"]), sk, self.level)
+            payload = aead_open(key, bytes.fromhex(envelope["ciphertext"]), report_ad(session_id, counter))
+        except Exception:
+            with self._lock:
+                self.stats.rejected += 1
+            raise
+        with self._lock:
+            if session is None:
+                session = self._incoming.get(session_id)
+                if session is None:
+                    if len(self._incoming) >= self.max_sessions:
+                        self._expire_incoming(now)
+                    if len(self._incoming) >= self.max_sessions:
+                        self.stats.rejected += 1
+                        raise OverflowError(f"KEM会话数已达上限: {self.max_sessions}")
+                    session = self._incoming[session_id] = KEMSession(session_id, key, now)
+                    self.stats.handshakes += 1
+                elif not hmac.compare_digest(session.key, key):
+                    self.stats.rejected += 1
+                    raise ValueError(f"KEM会话密钥不一致: {session_id}")
+            if session.exhausted(self.max_reports, self.max_age_s, now):
+                self.stats.rejected += 1
+                raise ValueError(f"KEM会话已达到上限: {session_id}")
+            if counter <= session.last_counter:
+                self.stats.rejected += 1
+                raise ValueError(f"KEM报告计数器未递增，疑似重放: {session_id}#{counter}")
+            session.last_counter = counter
+            session.reports += 1
+            self.stats.reports += 1
+        return payload
+
+    def _expire_incoming(self, now: float) -> int:
+        stale = [sid for sid, s in self._incoming.items() if now - s.created_at >= self.max_age_s]
+        for sid in stale:
+            del self._incoming[sid]
+        return len(stale)
+
+    def expire(self, now: Optional[float] = None) -> int:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            expired = self._expire_incoming(now)
+            stale_peers = [p for p, s in self._outgoing.items() if s.exhausted(self.max_reports, self.max_age_s, now)]
+            for p in stale_peers:
+                del self._outgoing[p]
+        return expired + len(stale_peers)
 
-def kem_encaps(pk):
-    return client_handshake(pk)
+    def __len__(self) -> int:
+        return len(self._incoming) + len(self._outgoing)
 
-def kem_decaps(sk, ct):
-    return server_finish(ct, sk)
 
                          
 """
@@ -0,0 +1,119 @@
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+TAG_SIZE = 32
+
+
+def tag_digest(link_tag) -> Optional[bytes]:
+    if isinstance(link_tag, str):
+        try:
+            raw = bytes.fromhex(link_tag)
+        except ValueError:
+            return None
+    elif isinstance(link_tag, (bytes, bytearray)):
+        raw = bytes(link_tag)
+    else:
+        return None
+    return raw if len(raw) == TAG_SIZE else None
+
+
+class LinkTagTable:
+
+    def __init__(self, capacity: int = 1024):
+        size = 8
+        while size < capacity:
+            size <<= 1
+        self._alloc(size)
+        self._count = 0
+
+    def _alloc(self, size: int) -> None:
+        self._mask = size - 1
+        self._slots = bytearray(size * TAG_SIZE)
+        self._used = bytearray(size)
+
+    def _probe(self, tag: bytes) -> Tuple[int, bool]:
+        i = int.from_bytes(tag[:8], "little") & self._mask
+        slots, used = self._slots, self._used
+        while used[i]:
+            off = i * TAG_SIZE
+            if slots[off:off + TAG_SIZE] == tag:
+                return i, True
+            i = (i + 1) & self._mask
+        return i, False
+
+    def add(self, tag: bytes) -> bool:
+        if len(tag) != TAG_SIZE:
+            raise ValueError(f"link_tag必须是{TAG_SIZE}字节")
+        i, found = self._probe(tag)
+        if found:
+            return False
+        off = i * TAG_SIZE
+        self._slots[off:off + TAG_SIZE] = tag
+        self._used[i] = 1
+        self._count += 1
+        if self._count * 10 > len(self._used) * 7:
+            self._grow()
+        return True
+
+    def _grow(self) -> None:
+        old_slots, old_used = self._slots, self._used
+        self._alloc(len(old_used) * 2)
+        for i, occupied in enumerate(old_used):
+            if occupied:
+                tag = bytes(old_slots[i * TAG_SIZE:(i + 1) * TAG_SIZE])
+                j, _ = self._probe(tag)
+                self._slots[j * TAG_SIZE:(j + 1) * TAG_SIZE] = tag
+                self._used[j] = 1
+
+    def memory_bytes(self) -> int:
+        return len(self._slots) + len(self._used)
+
+    def __contains__(self, tag: bytes) -> bool:
+        return self._probe(tag)[1]
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class LinkTagStore:
+
+    def __init__(self, stripes: int = 16, capacity: int = 1024):
+        if stripes <= 0 or stripes & (stripes - 1):
+            raise ValueError("stripes必须是2的幂")
+        self._mask = stripes - 1
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._tables = [LinkTagTable(max(8, capacity // stripes)) for _ in range(stripes)]
+        self._duplicates: List[Dict[bytes, List[Dict[str, Any]]]] = [{} for _ in range(stripes)]
+
+    def check_and_insert(
+        self,
+        tag: bytes,
+        record_factory: Callable[[], Dict[str, Any]]
+    ) -> Tuple[bool, Optional[List[Dict[str, Any]]]]:
+        i = tag[0] & self._mask
+        with self._locks[i]:
+            if self._tables[i].add(tag):
+                return True, None
+            history = self._duplicates[i].setdefault(tag, [])
+            previous = list(history)
+            history.append(record_factory())
+            return False, previous
+
+    def duplicates(self) -> Dict[bytes, List[Dict[str, Any]]]:
+        out = {}
+        for lock, stripe in zip(self._locks, self._duplicates):
+            with lock:
+                for tag, history in stripe.items():
+                    out[tag] = list(history)
+        return out
+
+    def memory_bytes(self) -> int:
+        return sum(t.memory_bytes() for t in self._tables)
+
+    def __contains__(self, tag: bytes) -> bool:
+        i = tag[0] & self._mask
+        with self._locks[i]:
+            return tag in self._tables[i]
+
+    def __len__(self) -> int:
+        return sum(len(t) for t in self._tables)
@@ -5,8 +5,17 @@ import os
 import hashlib
 import secrets
 import json
+import threading
+from collections import OrderedDict
 from typing import Dict, List, Tuple, Optional, Any
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
+
+from .backend_registry import REGISTRY
+from .concurrent_registry import StripedRegistry
+from .task_registry import TaskRegistry
+from .link_tag_table import tag_digest
+from .crypto_adapters import lrs_public_key, lrs_link_tag
+from .lrs_backend import PreparedRing, prepare_ring
 
 
 @dataclass
@@ -31,6 +40,19 @@ class PublicKeyRing:
     task_id: str                             
     registered_pubkeys: List[bytes]          
     creation_time: int                    
+    _prepared: Optional[PreparedRing] = field(default=None, init=False, repr=False, compare=False)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name == "registered_pubkeys":
+            object.__setattr__(self, "_prepared", None)
+        object.__setattr__(self, name, value)
+
+    @property
+    def prepared(self) -> PreparedRing:
+        prepared = self._prepared
+        if prepared is None:
+            prepared = self._prepared = prepare_ring(self.registered_pubkeys)
+        return prepared
 
 
 @dataclass
@@ -45,7 +67,7 @@ class AuditRecord:
 
 class LinkableRingSignature:
     
-    def __init__(self, audit_authority_sk: Optional[bytes] = None):
+    def __init__(self, audit_authority_sk: Optional[bytes] = None, max_task_keys: int = 4096):
         self.audit_authority_sk = audit_authority_sk or secrets.token_bytes(32)
         self.audit_authority_pk = hashlib.sha256(self.audit_authority_sk).digest()
         
@@ -53,7 +75,15 @@ class LinkableRingSignature:
         self.audit_db: Dict[str, AuditRecord] = {}
         
                            
-        self.link_tag_db: Dict[str, List[Dict[str, Any]]] = {}
+        self.link_tag_db: StripedRegistry = StripedRegistry()
+        
+        self.task_registry = TaskRegistry()
+        self.task_registry.add_removal_listener(self.evict_task_keys)
+        
+        self._task_keys: "OrderedDict[str, Dict[Tuple[Optional[str], bytes], TaskKey]]" = OrderedDict()
+        self.max_task_keys = max_task_keys
+        self._task_keys_lock = threading.Lock()
+        self._ring_lock = threading.Lock()
         
                                                      
     
@@ -72,6 +102,13 @@ class LinkableRingSignature:
         return identity
     
     def derive_task_key(self, vehicle_identity: VehicleIdentity, task_id: str) -> TaskKey:
+        cache_key = (REGISTRY.active("lrs"), vehicle_identity.master_pk)
+        with self._task_keys_lock:
+            task_keys = self._task_keys.get(task_id)
+            cached = task_keys.get(cache_key) if task_keys is not None else None
+            if cached is not None:
+                self._task_keys.move_to_end(task_id)
+                return cached
                       
         master_sk = vehicle_identity.master_sk
         task_id_bytes = task_id.encode('utf-8')
@@ -87,11 +124,11 @@ class LinkableRingSignature:
         derived_sk = hmac_sha256(prk, info + b"\x01")[:32]
         
                  
-        derived_pk = hashlib.sha256(b"derived_pk" + derived_sk).digest()
+        derived_pk = lrs_public_key(derived_sk) or hashlib.sha256(b"derived_pk" + derived_sk).digest()
         
                    
                                              
-        link_tag = hashlib.sha256(derived_sk + task_id_bytes).hexdigest()
+        link_tag = lrs_link_tag(derived_sk, task_id_bytes)
         
         task_key = TaskKey(
             task_id=task_id,
@@ -100,10 +137,30 @@ class LinkableRingSignature:
             link_tag=link_tag
         )
         
+        with self._task_keys_lock:
+            task_keys = self._task_keys.setdefault(task_id, {})
+            self._task_keys.move_to_end(task_id)
+            existing = task_keys.setdefault(cache_key, task_key)
+            self._trim_task_keys()
+        
                                  
-        self._register_to_audit(vehicle_identity, task_key)
+        if existing is task_key:
+            self._register_to_audit(vehicle_identity, task_key)
         
-        return task_key
+        return existing
+    
+    def _trim_task_keys(self) -> None:
+        excess = len(self._task_keys) - self.max_task_keys
+        if excess <= 0:
+            return
+        registered = set(self.task_registry.active_tasks())
+        idle = [t for t in self._task_keys if t not in registered][:excess]
+        for task_id in idle:
+            del self._task_keys[task_id]
+
+    def evict_task_keys(self, task_id: str) -> int:
+        with self._task_keys_lock:
+            return len(self._task_keys.pop(task_id, {}))
     
     def create_public_key_ring(self, task_id: str, registered_vehicles: List[VehicleIdentity]) -> PublicKeyRing:
                      
@@ -112,14 +169,47 @@ class LinkableRingSignature:
             task_key = self.derive_task_key(vehicle, task_id)
             pubkeys.append(task_key.derived_pk)
         
-        ring = PublicKeyRing(
-            ring_id=hashlib.sha256((task_id + str(len(pubkeys))).encode()).hexdigest()[:16],
+        return self._build_ring(task_id, pubkeys)
+    
+    def _build_ring(self, task_id: str, pubkeys: List[bytes]) -> PublicKeyRing:
+        return PublicKeyRing(
+            ring_id=ring_identifier(task_id, pubkeys),
             task_id=task_id,
             registered_pubkeys=pubkeys,
             creation_time=int(os.times().system)
         )
-        
-        return ring
+    
+    def add_ring_members(self, public_ring: PublicKeyRing, vehicles: List[VehicleIdentity]) -> PublicKeyRing:
+        pubkeys = list(public_ring.registered_pubkeys)
+        present = set(pubkeys)
+        for vehicle in vehicles:
+            derived_pk = self.derive_task_key(vehicle, public_ring.task_id).derived_pk
+            if derived_pk not in present:
+                present.add(derived_pk)
+                pubkeys.append(derived_pk)
+        return self._build_ring(public_ring.task_id, pubkeys)
+    
+    def remove_ring_members(self, public_ring: PublicKeyRing, vehicles: List[VehicleIdentity]) -> PublicKeyRing:
+        leaving = {self.derive_task_key(vehicle, public_ring.task_id).derived_pk for vehicle in vehicles}
+        pubkeys = [pk for pk in public_ring.registered_pubkeys if pk not in leaving]
+        return self._build_ring(public_ring.task_id, pubkeys)
+    
+    def update_task_ring(
+        self,
+        task_id: str,
+        joined: List[VehicleIdentity] = (),
+        left: List[VehicleIdentity] = ()
+    ):
+        with self._ring_lock:
+            task_ctx = self.task_registry.get(task_id)
+            if task_ctx is None:
+                raise KeyError(f"任务未注册: {task_id}")
+            ring = task_ctx.ring
+            if left:
+                ring = self.remove_ring_members(ring, left)
+            if joined:
+                ring = self.add_ring_members(ring, joined)
+            return self.task_registry.swap_ring(task_id, ring)
     
     def sign_message(
         self, 
@@ -141,7 +231,7 @@ class LinkableRingSignature:
                    
         lrs_obj = lrs_sign(
             message=message,
-            ring_pubkeys=public_ring.registered_pubkeys,
+            ring_pubkeys=public_ring.prepared,
             signer_index=signer_index,
             sk_signer=task_key.derived_sk,
             ctx=ctx
@@ -179,36 +269,69 @@ class LinkableRingSignature:
             "sig": sigma_lrs["signature"],
             "link_tag": sigma_lrs["link_tag"],
             "ctx": sigma_lrs["context"],
-            "ring": [pk.hex() for pk in public_ring.registered_pubkeys]
+            "ring": public_ring.prepared.hex
         }
         
               
-        return lrs_verify(message, lrs_obj, public_ring.registered_pubkeys)
+        return lrs_verify(message, lrs_obj, public_ring.prepared)
+    
+    def verify_signatures(
+        self,
+        items: List[Tuple[bytes, Dict[str, Any], PublicKeyRing]],
+        workers: int = 4
+    ) -> List[bool]:
+        from .crypto_adapters import lrs_verify_many
+        
+        results: List[bool] = [False] * len(items)
+        pending = []
+        for i, (message, sigma_lrs, public_ring) in enumerate(items):
+            if sigma_lrs["task_id"] != public_ring.task_id:
+                continue
+            lrs_obj = {
+                "sig": sigma_lrs["signature"],
+                "link_tag": sigma_lrs["link_tag"],
+                "ctx": sigma_lrs["context"],
+                "ring": public_ring.prepared.hex
+            }
+            pending.append((i, (message, lrs_obj, public_ring.prepared)))
+        
+        verified = lrs_verify_many([item for _, item in pending], workers=workers)
+        for (i, _), ok in zip(pending, verified):
+            results[i] = ok
+        return results
     
     def detect_duplicate_submission(
         self, 
         sigma_lrs: Dict[str, Any], 
         task_id: str
     ) -> Tuple[bool, Optional[List[Dict[str, Any]]]]:
-        link_tag = sigma_lrs["link_tag"]
+        link_tag = sigma_lrs.get("link_tag")
+        digest = tag_digest(link_tag)
+        if digest is None:
+            return True, []
         
-                              
-        task_key = f"{task_id}:{link_tag}"
-        
-        if task_key in self.link_tag_db:
-                    
-            previous = self.link_tag_db[task_key]
-            return True, previous
-        else:
-                             
-            submission_record = {
+        def submission_record():
+            return {
                 "task_id": task_id,
                 "link_tag": link_tag,
                 "timestamp": int(os.times().system),
                 "ring_id": sigma_lrs.get("ring_id", "unknown")
             }
-            self.link_tag_db[task_key] = [submission_record]
+        
+        task_ctx = self.task_registry.get(task_id)
+        if task_ctx is not None:
+            inserted, previous = task_ctx.link_tags.check_and_insert(digest, submission_record)
+            if inserted:
+                return False, None
+            return True, [{"task_id": task_id, "link_tag": link_tag}] + previous
+        if self.task_registry.is_retired(task_id):
+            return True, []
+        
+        task_key = f"{task_id}:{link_tag}"
+        inserted, previous = self.link_tag_db.check_and_insert(task_key, lambda: [submission_record()])
+        if inserted:
             return False, None
+        return True, previous
     
                                                       
     
@@ -270,6 +393,15 @@ class LinkableRingSignature:
 
                                                 
 
+def ring_identifier(task_id: str, pubkeys: List[bytes]) -> str:
+    h = hashlib.sha256()
+    task_id_bytes = task_id.encode("utf-8")
+    h.update(len(task_id_bytes).to_bytes(4, "big") + task_id_bytes)
+    for pk in pubkeys:
+        h.update(len(pk).to_bytes(4, "big") + bytes(pk))
+    return h.hexdigest()[:16]
+
+
 def hmac_sha256(key: bytes, data: bytes) -> bytes:
     import hmac
     return hmac.new(key, data, hashlib.sha256).digest()
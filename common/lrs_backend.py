@@ -1,45 +1,18 @@
 import ctypes
-import os
-import sys
 import hmac
 import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 
-           
-_lib = None
-try:
-                 
-    if sys.platform.startswith('win'):
-                 
-        lib_path = os.path.join(os.path.dirname(__file__), '..', 'liblsag.dll')
-        lib_path = os.path.abspath(lib_path)
-        if os.path.exists(lib_path):
-            _lib = ctypes.CDLL(lib_path)
-        else:
-                       
-            lib_path = os.path.join(os.getcwd(), 'liblsag.dll')
-            if os.path.exists(lib_path):
-                _lib = ctypes.CDLL(lib_path)
-    elif sys.platform.startswith('darwin'):
-               
-        lib_path = os.path.join(os.path.dirname(__file__), '..', 'liblsag.dylib')
-        lib_path = os.path.abspath(lib_path)
-        if os.path.exists(lib_path):
-            _lib = ctypes.CDLL(lib_path)
-    else:
-               
-        lib_path = os.path.join(os.path.dirname(__file__), '..', 'liblsag.so')
-        lib_path = os.path.abspath(lib_path)
-        if os.path.exists(lib_path):
-            _lib = ctypes.CDLL(lib_path)
-except OSError as e:
-                
-    _lib = None
-    print(f"Failed to load LSAG library: {e}")
+from .native_loader import load_native_library
 
-                 
-if _lib:
+
+def _configure(lib):
+    if not hasattr(lib, "lsag_sign"):
+        return
               
-    _lib.lsag_sign.argtypes = [
+    lib.lsag_sign.argtypes = [
         ctypes.c_char_p, ctypes.c_size_t,                    
         ctypes.POINTER(ctypes.c_char_p), ctypes.c_size_t,                          
         ctypes.c_char_p,             
@@ -47,58 +20,199 @@ if _lib:
         ctypes.c_char_p, ctypes.POINTER(ctypes.c_size_t),                        
         ctypes.c_char_p                
     ]
-    _lib.lsag_sign.restype = ctypes.c_int
+    lib.lsag_sign.restype = ctypes.c_int
 
               
-    _lib.lsag_verify.argtypes = [
+    lib.lsag_verify.argtypes = [
         ctypes.c_char_p, ctypes.c_size_t,                    
         ctypes.POINTER(ctypes.c_char_p), ctypes.c_size_t,                          
         ctypes.c_char_p,       
         ctypes.c_char_p, ctypes.c_size_t,                
         ctypes.c_char_p            
     ]
-    _lib.lsag_verify.restype = ctypes.c_int
+    lib.lsag_verify.restype = ctypes.c_int
 
-def lsag_sign_py(msg: bytes, ring_pubkeys: list[bytes], sk_signer, ctx: bytes):
-                         
-    if hasattr(sk_signer, 'encode'):
-               
-        sk_signer_bytes = sk_signer.encode() if isinstance(sk_signer, str) else bytes(sk_signer)
-    elif hasattr(sk_signer, 'sign'):
-                                     
-        sk_signer_bytes = bytes(sk_signer)
-    else:
-                         
-        sk_signer_bytes = bytes(sk_signer)
-    
-                     
-    processed_ring_pubkeys = []
-    for pk in ring_pubkeys:
-        if hasattr(pk, 'encode'):
-                   
-            processed_ring_pubkeys.append(pk.encode() if isinstance(pk, str) else bytes(pk))
-        elif hasattr(pk, '__bytes__'):
-                                         
-            processed_ring_pubkeys.append(bytes(pk))
-        else:
-                             
-            processed_ring_pubkeys.append(bytes(pk))
+    if hasattr(lib, "lsag_ring_prepare"):
+        lib.lsag_ring_prepare.argtypes = [ctypes.POINTER(ctypes.c_char_p), ctypes.c_size_t]
+        lib.lsag_ring_prepare.restype = ctypes.c_void_p
+        lib.lsag_ring_free.argtypes = [ctypes.c_void_p]
+        lib.lsag_ring_free.restype = None
+        lib.lsag_verify_prepared.argtypes = [
+            ctypes.c_void_p,
+            ctypes.c_char_p, ctypes.c_size_t,
+            ctypes.c_char_p,
+            ctypes.c_char_p, ctypes.c_size_t,
+            ctypes.c_char_p
+        ]
+        lib.lsag_verify_prepared.restype = ctypes.c_int
+
+    if hasattr(lib, "lsag_presign"):
+        lib.lsag_presign.argtypes = [ctypes.c_void_p, ctypes.c_char_p]
+        lib.lsag_presign.restype = ctypes.c_void_p
+        lib.lsag_presig_free.argtypes = [ctypes.c_void_p]
+        lib.lsag_presig_free.restype = None
+        lib.lsag_sign_presigned.argtypes = [
+            ctypes.c_void_p, ctypes.c_void_p,
+            ctypes.c_char_p, ctypes.c_size_t,
+            ctypes.c_char_p, ctypes.c_size_t,
+            ctypes.c_char_p, ctypes.POINTER(ctypes.c_size_t),
+            ctypes.c_char_p
+        ]
+        lib.lsag_sign_presigned.restype = ctypes.c_int
+
+    if hasattr(lib, "lsag_public_key"):
+        lib.lsag_public_key.argtypes = [ctypes.c_char_p, ctypes.c_char_p]
+        lib.lsag_public_key.restype = ctypes.c_int
+        lib.lsag_key_image.argtypes = [ctypes.c_char_p, ctypes.c_char_p]
+        lib.lsag_key_image.restype = ctypes.c_int
+
+
+@lru_cache(maxsize=None)
+def load_library():
+    for name in ("lsag", "bulletproofs"):
+        lib = load_native_library(name, _configure)
+        if lib is not None and hasattr(lib, "lsag_sign"):
+            return lib
+    return None
+
+
+def _native_key_api():
+    lib = load_library()
+    return lib if lib is not None and hasattr(lib, "lsag_public_key") else None
+
+
+def lsag_public_key_py(sk: bytes):
+    lib = _native_key_api()
+    if lib is None:
+        return None
+    out = ctypes.create_string_buffer(32)
+    rc = lib.lsag_public_key(normalize_pubkey(sk)[:32].ljust(32, b"\x00"), out)
+    if rc != 0:
+        raise RuntimeError(f"LSAG公钥计算失败，错误码: {rc}")
+    return out.raw
+
+
+def lsag_key_image_py(sk: bytes):
+    lib = _native_key_api()
+    if lib is None:
+        return None
+    out = ctypes.create_string_buffer(32)
+    rc = lib.lsag_key_image(normalize_pubkey(sk)[:32].ljust(32, b"\x00"), out)
+    if rc != 0:
+        raise RuntimeError(f"LSAG密钥镜像计算失败，错误码: {rc}")
+    return out.raw
+
+
+def normalize_pubkey(pk) -> bytes:
+    if type(pk) is bytes:
+        return pk
+    return pk.encode() if isinstance(pk, str) else bytes(pk)
+
+
+def _has_prepared_api() -> bool:
+    lib = load_library()
+    return bool(lib) and hasattr(lib, "lsag_ring_prepare")
+
+
+def ring_digest(pubkeys) -> bytes:
+    return hashlib.sha256(b"".join(pubkeys)).digest()
+
+
+class PreparedRing:
+    __slots__ = ("pubkeys", "digest", "_c_array", "_hex", "_native", "_native_lock", "__weakref__")
+
+    def __init__(self, ring_pubkeys, digest: bytes = None):
+        self.pubkeys = tuple(normalize_pubkey(pk) for pk in ring_pubkeys)
+        self.digest = digest or ring_digest(self.pubkeys)
+        self._c_array = None
+        self._hex = None
+        self._native = None
+        self._native_lock = threading.Lock()
+
+    @property
+    def c_array(self):
+        if self._c_array is None:
+            self._c_array = (ctypes.c_char_p * len(self.pubkeys))(*self.pubkeys)
+        return self._c_array
+
+    @property
+    def hex(self) -> list[str]:
+        if self._hex is None:
+            self._hex = [pk.hex() for pk in self.pubkeys]
+        return list(self._hex)
+
+    @property
+    def native(self):
+        if self._native is None and _has_prepared_api():
+            with self._native_lock:
+                if self._native is None:
+                    self._native = load_library().lsag_ring_prepare(self.c_array, len(self.pubkeys)) or 0
+        return self._native
+
+    def close(self) -> None:
+        handle, self._native = self._native, None
+        if handle:
+            load_library().lsag_ring_free(handle)
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def __len__(self):
+        return len(self.pubkeys)
+
+    def __iter__(self):
+        return iter(self.pubkeys)
+
+
+PREPARED_CACHE_SIZE = 64
+_prepared_cache: "OrderedDict[bytes, PreparedRing]" = OrderedDict()
+_prepared_lock = threading.Lock()
+
+
+def prepare_ring(ring_pubkeys) -> PreparedRing:
+    if isinstance(ring_pubkeys, PreparedRing):
+        return ring_pubkeys
+    pubkeys = tuple(normalize_pubkey(pk) for pk in ring_pubkeys)
+    digest = ring_digest(pubkeys)
+    with _prepared_lock:
+        ring = _prepared_cache.get(digest)
+        if ring is not None:
+            _prepared_cache.move_to_end(digest)
+            return ring
+        ring = _prepared_cache[digest] = PreparedRing(pubkeys, digest)
+        if len(_prepared_cache) > PREPARED_CACHE_SIZE:
+            _prepared_cache.popitem(last=False)
+        return ring
+
+
+_tls = threading.local()
+
+
+def _sign_buffers(ring_size: int):
+    need = 32 * (ring_size + 1) + 64
+    bufs = getattr(_tls, "sign", None)
+    if bufs is None or len(bufs[0]) < need:
+        bufs = (ctypes.create_string_buffer(max(8192, need)), ctypes.c_size_t(0), ctypes.create_string_buffer(64))
+        _tls.sign = bufs
+    return bufs
+
+
+def lsag_sign_py(msg: bytes, ring_pubkeys, sk_signer, ctx: bytes):
+    sk_signer_bytes = normalize_pubkey(sk_signer)
+    ring = prepare_ring(ring_pubkeys)
     
-    if _lib:
-                 
-        ring_arr = (ctypes.c_char_p * len(processed_ring_pubkeys))()
-        for i, pk in enumerate(processed_ring_pubkeys):
-            ring_arr[i] = ctypes.c_char_p(pk)
-        
-                 
-        sig_buf = ctypes.create_string_buffer(8192)           
-        sig_len = ctypes.c_size_t(0)
-        keyimg_buf = ctypes.create_string_buffer(64)           
+    lib = load_library()
+    if lib:
+        sig_buf, sig_len, keyimg_buf = _sign_buffers(len(ring))
+        sig_len.value = 0
         
                
-        rc = _lib.lsag_sign(
+        rc = lib.lsag_sign(
             msg, len(msg),
-            ring_arr, len(processed_ring_pubkeys),
+            ring.c_array, len(ring),
             sk_signer_bytes,
             ctx, len(ctx),
             sig_buf, ctypes.byref(sig_len),
@@ -114,32 +228,85 @@ def lsag_sign_py(msg: bytes, ring_pubkeys: list[bytes], sk_signer, ctx: bytes):
         return sig, keyimage
     else:
                          
-        return fallback_lsag_sign(msg, processed_ring_pubkeys, sk_signer_bytes, ctx)
-
-def lsag_verify_py(msg: bytes, ring_pubkeys: list[bytes], sig: bytes, keyimage: bytes, ctx: bytes):
-                     
-    processed_ring_pubkeys = []
-    for pk in ring_pubkeys:
-        if hasattr(pk, 'encode'):
-                   
-            processed_ring_pubkeys.append(pk.encode() if isinstance(pk, str) else bytes(pk))
-        elif hasattr(pk, '__bytes__'):
-                                         
-            processed_ring_pubkeys.append(bytes(pk))
-        else:
-                             
-            processed_ring_pubkeys.append(bytes(pk))
+        return fallback_lsag_sign(msg, list(ring.pubkeys), sk_signer_bytes, ctx)
+
+def signature_size(ring_size: int) -> int:
+    return 32 * (ring_size + 1)
+
+
+class LsagPresignature:
+    __slots__ = ("ring", "_handle", "_lock", "__weakref__")
+
+    def __init__(self, ring: PreparedRing, handle):
+        self.ring = ring
+        self._handle = handle
+        self._lock = threading.Lock()
+
+    def _take(self):
+        with self._lock:
+            handle, self._handle = self._handle, None
+        return handle
+
+    def sign(self, msg: bytes, ctx: bytes):
+        handle = self._take()
+        if not handle:
+            raise RuntimeError("LSAG预签名已被使用")
+        sig_buf, sig_len, keyimg_buf = _sign_buffers(len(self.ring))
+        sig_len.value = 0
+        rc = load_library().lsag_sign_presigned(
+            self.ring.native, handle,
+            msg, len(msg),
+            ctx, len(ctx),
+            sig_buf, ctypes.byref(sig_len),
+            keyimg_buf
+        )
+        if rc != 0:
+            raise RuntimeError(f"LSAG签名失败，错误码: {rc}")
+        return sig_buf.raw[:sig_len.value], keyimg_buf.raw[:32]
+
+    def close(self) -> None:
+        handle = self._take()
+        if handle:
+            load_library().lsag_presig_free(handle)
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+def lsag_presign_py(ring_pubkeys, sk_signer):
+    lib = load_library()
+    if not lib or not hasattr(lib, "lsag_presign"):
+        return None
+    ring = prepare_ring(ring_pubkeys)
+    handle = ring.native
+    if not handle:
+        return None
+    pre = lib.lsag_presign(handle, normalize_pubkey(sk_signer))
+    if not pre:
+        raise RuntimeError("LSAG预签名失败：签名私钥不在公钥环中")
+    return LsagPresignature(ring, pre)
+
+
+def lsag_verify_py(msg: bytes, ring_pubkeys, sig: bytes, keyimage: bytes, ctx: bytes):
+    ring = prepare_ring(ring_pubkeys)
     
-    if _lib:
-                 
-        ring_arr = (ctypes.c_char_p * len(processed_ring_pubkeys))()
-        for i, pk in enumerate(processed_ring_pubkeys):
-            ring_arr[i] = ctypes.c_char_p(pk)
+    lib = load_library()
+    if lib:
+        if len(sig) != signature_size(len(ring)) or len(keyimage) != 32:
+            return False
+        handle = ring.native
+        if handle == 0:
+            return False
+        if handle:
+            return lib.lsag_verify_prepared(handle, msg, len(msg), sig, ctx, len(ctx), keyimage) == 0
         
                
-        rc = _lib.lsag_verify(
+        rc = lib.lsag_verify(
             msg, len(msg),
-            ring_arr, len(processed_ring_pubkeys),
+            ring.c_array, len(ring),
             sig,
             ctx, len(ctx),
             keyimage
@@ -148,7 +315,31 @@ def lsag_verify_py(msg: bytes, ring_pubkeys: list[bytes], sig: bytes, keyimage:
         return rc == 0
     else:
                          
-        return fallback_lsag_verify(msg, processed_ring_pubkeys, sig, keyimage, ctx)
+        return fallback_lsag_verify(msg, list(ring.pubkeys), sig, keyimage, ctx)
+
+_pools: dict = {}
+_pools_lock = threading.Lock()
+
+
+def _verify_pool(workers: int):
+    from concurrent.futures import ThreadPoolExecutor
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = _pools[workers] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="lsag-verify")
+        return pool
+
+
+def verify_many(verify, items: list[tuple], workers: int = 4, native: bool = True) -> list[bool]:
+    if not items:
+        return []
+    if not native or workers <= 1 or len(items) == 1:
+        return [verify(*item) for item in items]
+    return list(_verify_pool(workers).map(lambda item: verify(*item), items))
+
+
+def lsag_verify_many(items: list[tuple], workers: int = 4) -> list[bool]:
+    return verify_many(lsag_verify_py, items, workers, native=load_library() is not None)
 
                
 def fallback_lsag_sign(msg: bytes, ring_pubkeys: list[bytes], sk_signer: bytes, ctx: bytes):
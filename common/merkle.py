@@ -41,7 +41,9 @@ class MerkleTree:
         if leaf not in self.leaves:
             return []
         
-        index = self.leaves.index(leaf)
+        return self.get_proof_at(self.leaves.index(leaf))
+    
+    def get_proof_at(self, index: int) -> List[str]:
         proof = []
         current_index = index
         
@@ -0,0 +1,83 @@
+import ctypes
+
+from .native_loader import load_native_library
+
+PARAMETER_SETS = {
+    512: (800, 1632, 768),
+    768: (1184, 2400, 1088),
+    1024: (1568, 3168, 1568),
+}
+SHARED_KEY_LEN = 32
+
+
+def _configure(lib):
+    if not hasattr(lib, "mlkem_keygen"):
+        return
+    lib.mlkem_sizes.argtypes = [
+        ctypes.c_uint32,
+        ctypes.POINTER(ctypes.c_size_t), ctypes.POINTER(ctypes.c_size_t), ctypes.POINTER(ctypes.c_size_t)
+    ]
+    lib.mlkem_sizes.restype = ctypes.c_int
+    lib.mlkem_keygen.argtypes = [ctypes.c_uint32, ctypes.c_char_p, ctypes.c_char_p]
+    lib.mlkem_keygen.restype = ctypes.c_int
+    lib.mlkem_encaps.argtypes = [
+        ctypes.c_uint32,
+        ctypes.c_char_p, ctypes.c_size_t,
+        ctypes.c_char_p, ctypes.c_char_p
+    ]
+    lib.mlkem_encaps.restype = ctypes.c_int
+    lib.mlkem_decaps.argtypes = [
+        ctypes.c_uint32,
+        ctypes.c_char_p, ctypes.c_size_t,
+        ctypes.c_char_p, ctypes.c_size_t,
+        ctypes.c_char_p
+    ]
+    lib.mlkem_decaps.restype = ctypes.c_int
+
+
+def load_library():
+    lib = load_native_library("bulletproofs", _configure)
+    return lib if lib is not None and hasattr(lib, "mlkem_keygen") else None
+
+
+def available() -> bool:
+    return load_library() is not None
+
+
+def _sizes(level: int) -> tuple[int, int, int]:
+    if level not in PARAMETER_SETS:
+        raise ValueError(f"不支持的ML-KEM参数集: {level}")
+    return PARAMETER_SETS[level]
+
+
+def mlkem_keygen_py(level: int = 512) -> tuple[bytes, bytes]:
+    pk_len, sk_len, _ = _sizes(level)
+    pk_buf = ctypes.create_string_buffer(pk_len)
+    sk_buf = ctypes.create_string_buffer(sk_len)
+    rc = load_library().mlkem_keygen(level, pk_buf, sk_buf)
+    if rc != 0:
+        raise RuntimeError(f"ML-KEM密钥生成失败，错误码: {rc}")
+    return pk_buf.raw, sk_buf.raw
+
+
+def mlkem_encaps_py(level: int, pk: bytes) -> tuple[bytes, bytes]:
+    pk_len, _, ct_len = _sizes(level)
+    if len(pk) != pk_len:
+        raise ValueError(f"ML-KEM-{level}公钥必须是{pk_len}字节")
+    ct_buf = ctypes.create_string_buffer(ct_len)
+    ss_buf = ctypes.create_string_buffer(SHARED_KEY_LEN)
+    rc = load_library().mlkem_encaps(level, pk, len(pk), ct_buf, ss_buf)
+    if rc != 0:
+        raise RuntimeError(f"ML-KEM封装失败，错误码: {rc}")
+    return ct_buf.raw, ss_buf.raw
+
+
+def mlkem_decaps_py(level: int, sk: bytes, ct: bytes) -> bytes:
+    _, sk_len, ct_len = _sizes(level)
+    if len(sk) != sk_len or len(ct) != ct_len:
+        raise ValueError(f"ML-KEM-{level}私钥或密文长度不正确")
+    ss_buf = ctypes.create_string_buffer(SHARED_KEY_LEN)
+    rc = load_library().mlkem_decaps(level, sk, len(sk), ct, len(ct), ss_buf)
+    if rc != 0:
+        raise RuntimeError(f"ML-KEM解封装失败，错误码: {rc}")
+    return ss_buf.raw
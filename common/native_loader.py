@@ -0,0 +1,64 @@
+import ctypes
+import logging
+import os
+import sys
+import threading
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+_libs: Dict[str, Optional[ctypes.CDLL]] = {}
+_configured: Dict[tuple, Optional[ctypes.CDLL]] = {}
+_lock = threading.Lock()
+
+
+def library_filename(name: str) -> str:
+    if sys.platform.startswith('win'):
+        return f"lib{name}.dll"
+    if sys.platform.startswith('darwin'):
+        return f"lib{name}.dylib"
+    return f"lib{name}.so"
+
+
+def _candidates(name: str) -> List[str]:
+    filename = library_filename(name)
+    paths = [os.path.join(_ROOT, filename), os.path.join(os.getcwd(), filename)]
+    return [p for p in dict.fromkeys(paths) if os.path.exists(p)] + [filename]
+
+
+def _open(name: str) -> Optional[ctypes.CDLL]:
+    for path in _candidates(name):
+        try:
+            return ctypes.CDLL(path)
+        except OSError:
+            continue
+    logger.warning("%s未加载，使用占位符实现", library_filename(name))
+    return None
+
+
+def load_native_library(
+    name: str,
+    configure: Optional[Callable[[ctypes.CDLL], None]] = None
+) -> Optional[ctypes.CDLL]:
+    key = (name, configure)
+    if key in _configured:
+        return _configured[key]
+    with _lock:
+        if key in _configured:
+            return _configured[key]
+        if name not in _libs:
+            _libs[name] = _open(name)
+        lib = _libs[name]
+        if lib is not None and configure is not None:
+            try:
+                configure(lib)
+            except Exception as e:
+                logger.warning("定义%s库函数签名时出错: %s", name, e)
+                lib = None
+        _configured[key] = lib
+        return lib
+
+
+def loaded_libraries() -> Dict[str, bool]:
+    return {name: lib is not None for name, lib in _libs.items()}
@@ -0,0 +1,215 @@
+import json
+import secrets
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from .backend_registry import REGISTRY
+from .crypto_adapters import lrs_presign, lrs_sign, range_proof_prove
+from .kem_layer import DEFAULT_LEVEL, EncapsulationPool, KEMSessionManager
+from .lrs_backend import prepare_ring
+from .merkle import MerkleTree
+
+
+@dataclass
+class OfflineBundle:
+    blinding: int
+    created_at: float
+    presig: Optional[Any] = None
+    ring_digest: bytes = b""
+
+    def discard_presig(self) -> None:
+        presig, self.presig = self.presig, None
+        if presig is not None:
+            presig.close()
+
+
+@dataclass
+class PrecomputeStats:
+    offline_ms: List[float] = field(default_factory=list)
+    online_ms: List[float] = field(default_factory=list)
+    bundle_hits: int = 0
+    bundle_misses: int = 0
+    path_hits: int = 0
+    path_misses: int = 0
+
+    def avg_offline_ms(self) -> float:
+        return sum(self.offline_ms) / len(self.offline_ms) if self.offline_ms else 0.0
+
+    def avg_online_ms(self) -> float:
+        return sum(self.online_ms) / len(self.online_ms) if self.online_ms else 0.0
+
+
+class ReportPrecomputer:
+
+    def __init__(
+        self,
+        task_id: str,
+        ring_pubkeys,
+        signer_index: int,
+        signer_sk,
+        whitelist: List[str],
+        kem_pk: bytes,
+        capacity: int = 16,
+        sessions: Optional[KEMSessionManager] = None,
+        ring_id: str = "unknown",
+        level: int = DEFAULT_LEVEL
+    ):
+        self.task_id = task_id
+        self.ctx = task_id.encode("utf-8")
+        self.ring = prepare_ring(ring_pubkeys)
+        self.ring_id = ring_id
+        self.signer_index = signer_index
+        self.signer_sk = signer_sk
+        self.kem_pk = kem_pk
+        self.capacity = capacity
+        self.sessions = sessions or KEMSessionManager(encaps_pool=EncapsulationPool(level=level), level=level)
+        self.stats = PrecomputeStats()
+        self._tree = MerkleTree(list(whitelist))
+        self.root = self._tree.get_root()
+        self._leaf_index = {leaf: i for i, leaf in enumerate(whitelist)}
+        self._paths: Dict[str, Tuple[int, List[str]]] = {}
+        self._bundles: Deque[OfflineBundle] = deque()
+        self._lock = threading.Lock()
+
+    def _new_bundle(self, offline: bool, ring=None) -> OfflineBundle:
+        ring = ring or self.ring
+        presig = lrs_presign(ring, self.signer_sk) if offline else None
+        return OfflineBundle(secrets.randbits(64), time.monotonic(), presig, ring.digest)
+
+    def update_ring(self, ring_pubkeys, signer_index: int, ring_id: Optional[str] = None) -> int:
+        ring = prepare_ring(ring_pubkeys)
+        with self._lock:
+            self.ring = ring
+            self.signer_index = signer_index
+            if ring_id is not None:
+                self.ring_id = ring_id
+            stale = [b for b in self._bundles if b.ring_digest != ring.digest]
+        for bundle in stale:
+            bundle.discard_presig()
+        return len(stale)
+
+    def precompute(self, likely_cells: Iterable[str] = ()) -> int:
+        start = time.perf_counter()
+        backend = REGISTRY.get("range_proof")
+        if backend and backend.get("native"):
+            from .bulletproofs_backend import default_context
+            default_context()
+        with self._lock:
+            ring = self.ring
+        _ = ring.c_array
+        self.sessions.prepare(self.kem_pk)
+        with self._lock:
+            cells = [cell for cell in likely_cells if cell not in self._paths]
+            need = self.capacity - len(self._bundles)
+        paths = {}
+        for cell in cells:
+            index = self._leaf_index.get(cell)
+            if index is not None:
+                paths[cell] = (index, self._tree.get_proof_at(index))
+        bundles = [self._new_bundle(True, ring) for _ in range(max(0, need))]
+        with self._lock:
+            if self.ring.digest != ring.digest:
+                for bundle in bundles:
+                    bundle.discard_presig()
+            self._paths.update(paths)
+            room = max(0, self.capacity - len(self._bundles))
+            self._bundles.extend(bundles[:room])
+            spare = bundles[room:]
+        for bundle in spare:
+            bundle.discard_presig()
+        added = len(bundles) - len(spare)
+        if added:
+            per_bundle = (time.perf_counter() - start) * 1000 / added
+            with self._lock:
+                self.stats.offline_ms.extend([per_bundle] * added)
+        return added
+
+    def _take_bundle(self, ring) -> OfflineBundle:
+        with self._lock:
+            bundle = self._bundles.popleft() if self._bundles else None
+            if bundle is None:
+                self.stats.bundle_misses += 1
+            else:
+                self.stats.bundle_hits += 1
+        if bundle is None:
+            return self._new_bundle(False, ring)
+        if bundle.ring_digest != ring.digest:
+            bundle.discard_presig()
+        return bundle
+
+    def _path(self, cell: str) -> Tuple[int, List[str]]:
+        with self._lock:
+            path = self._paths.get(cell)
+            if path is not None:
+                self.stats.path_hits += 1
+                return path
+            self.stats.path_misses += 1
+        index = self._leaf_index.get(cell)
+        if index is None:
+            raise ValueError(f"网格 {cell} 不在白名单中")
+        path = (index, self._tree.get_proof_at(index))
+        with self._lock:
+            return self._paths.setdefault(cell, path)
+
+    def build_report(
+        self,
+        timestamp: int,
+        cell: str,
+        payload: bytes,
+        window: Tuple[int, int],
+        token: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        start = time.perf_counter()
+        with self._lock:
+            ring, ring_id, signer_index = self.ring, self.ring_id, self.signer_index
+        bundle = self._take_bundle(ring)
+        index, path = self._path(cell)
+        L, U = window
+        rp = range_proof_prove(timestamp, L, U, bundle.blinding)
+        envelope = self.sessions.seal_report(self.kem_pk, payload)
+        packet = {
+            "task_id": self.task_id,
+            "payload": envelope,
+            "commitments": {"C_t": rp["commitment"], "root": self.root},
+            "proofs": {"Pi_time": rp, "Pi_geo": {"proof": path, "index": index}},
+            "geohash7": cell,
+            "timestamp": timestamp,
+            "token": token
+        }
+        message = json.dumps({
+            "tid": self.task_id,
+            "payload": packet["payload"],
+            "commitments": packet["commitments"],
+            "proofs": packet["proofs"],
+            "token": token
+        }, separators=(",", ":")).encode()
+        lrs_obj = lrs_sign(message, ring, signer_index, self.signer_sk, self.ctx, bundle.presig)
+        packet["sigma_lrs"] = {
+            "ring_id": ring_id,
+            "task_id": self.task_id,
+            "signature": lrs_obj["sig"],
+            "link_tag": lrs_obj["link_tag"],
+            "context": lrs_obj["ctx"],
+            "ring_size": len(ring),
+            "backend": lrs_obj.get("backend", "unknown")
+        }
+        packet["ring_pubkeys"] = lrs_obj["ring"]
+        elapsed = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self.stats.online_ms.append(elapsed)
+        return packet
+
+    def ready(self) -> int:
+        with self._lock:
+            return len(self._bundles)
+
+    def close(self) -> None:
+        with self._lock:
+            bundles, self._bundles = list(self._bundles), deque()
+        for bundle in bundles:
+            bundle.discard_presig()
+        if self.sessions.encaps_pool is not None:
+            self.sessions.encaps_pool.stop()
@@ -0,0 +1,178 @@
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from .concurrent_registry import StripedRegistry
+from . import crypto as stub_crypto
+from .crypto import merkle_verify
+from .crypto_adapters import ed25519_sign, ed25519_verify, ed25519_verify_batch, ed25519_verify_key
+from .merkle import MerkleTree
+
+
+def token_message(token: Dict[str, Any]) -> bytes:
+    return (
+        f"{token['version']}|{token['region_id']}|{token['window_id']}|"
+        f"{token['nonce']}|{token['expiry_ts']}|{token['rsu_id']}"
+    ).encode()
+
+
+def batch_root_message(rsu_id, window_id, root_hex: str) -> bytes:
+    return f"batch|{rsu_id}|{window_id}|{root_hex}".encode()
+
+
+def sign_token_batch(sk, tokens: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    if not tokens:
+        return []
+    rsu_id, window_id = tokens[0]["rsu_id"], tokens[0]["window_id"]
+    if any(t["rsu_id"] != rsu_id or t["window_id"] != window_id for t in tokens):
+        raise ValueError("批量签名的token必须属于同一RSU和时间窗口")
+    tree = MerkleTree([token_message(t).decode() for t in tokens])
+    root = tree.get_root()
+    sig_hex = ed25519_sign(sk, batch_root_message(rsu_id, window_id, root)).hex()
+    return [
+        dict(t, batch={"root": root, "index": i, "path": tree.get_proof_at(i), "signature_hex": sig_hex})
+        for i, t in enumerate(tokens)
+    ]
+
+
+@dataclass(frozen=True)
+class RSUKey:
+    rsu_id: str
+    public_key: bytes
+    verify_key: Any
+
+
+class RSUKeyRegistry:
+
+    def __init__(self, required: bool = False):
+        self.required = required
+        self._lock = threading.Lock()
+        self._keys: Dict[str, RSUKey] = {}
+        self._batch_roots = StripedRegistry()
+
+    @property
+    def enforced(self) -> bool:
+        return self.required or bool(self._keys)
+
+    def register(self, rsu_id, public_key) -> RSUKey:
+        pk = bytes.fromhex(public_key) if isinstance(public_key, str) else bytes(public_key)
+        entry = RSUKey(str(rsu_id), pk, ed25519_verify_key(pk))
+        with self._lock:
+            self._keys[entry.rsu_id] = entry
+        return entry
+
+    def load(self, rsus: List[Dict[str, Any]]) -> int:
+        for rsu in rsus:
+            self.register(rsu["rsu_id"], rsu["pk_hex"])
+        self.required = True
+        return len(rsus)
+
+    def _verify_signature(self, entry: RSUKey, msg: bytes, sig: bytes) -> bool:
+        return ed25519_verify(entry.verify_key, msg, sig)
+
+    def _verify_signatures(self, items: List[tuple]) -> List[bool]:
+        return ed25519_verify_batch([(entry.public_key, msg, sig) for entry, msg, sig in items])
+
+    def get(self, rsu_id) -> Optional[RSUKey]:
+        return self._keys.get(str(rsu_id))
+
+    def remove(self, rsu_id) -> bool:
+        with self._lock:
+            return self._keys.pop(str(rsu_id), None) is not None
+
+    def verify_token(self, token: Dict[str, Any]) -> tuple[bool, str]:
+        entry = self._keys.get(str(token.get("rsu_id")))
+        if entry is None:
+            return False, "ERR_TOKEN_RSU_UNKNOWN"
+        if "batch" in token:
+            return self._verify_batch_token(entry, token)
+        try:
+            sig = bytes.fromhex(token["signature_hex"])
+        except (KeyError, ValueError):
+            return False, "ERR_TOKEN_SIGNATURE"
+        if not self._verify_signature(entry, token_message(token), sig):
+            return False, "ERR_TOKEN_SIGNATURE"
+        return True, "OK"
+
+    def verify_tokens(self, tokens: List[Dict[str, Any]]) -> List[tuple[bool, str]]:
+        results: List[Optional[tuple[bool, str]]] = [None] * len(tokens)
+        pending = []
+        for i, token in enumerate(tokens):
+            entry = self._keys.get(str(token.get("rsu_id")))
+            if entry is None:
+                results[i] = (False, "ERR_TOKEN_RSU_UNKNOWN")
+                continue
+            if "batch" in token:
+                results[i] = self._verify_batch_token(entry, token)
+                continue
+            try:
+                sig = bytes.fromhex(token["signature_hex"])
+            except (KeyError, ValueError):
+                results[i] = (False, "ERR_TOKEN_SIGNATURE")
+                continue
+            pending.append((i, entry, token_message(token), sig))
+        verified = self._verify_signatures([(entry, msg, sig) for _, entry, msg, sig in pending])
+        for (i, _, _, _), ok in zip(pending, verified):
+            results[i] = (True, "OK") if ok else (False, "ERR_TOKEN_SIGNATURE")
+        return results
+
+    def _verify_batch_token(self, entry: RSUKey, token: Dict[str, Any]) -> tuple[bool, str]:
+        batch = token["batch"]
+        try:
+            root, index, path = batch["root"], int(batch["index"]), batch["path"]
+        except (KeyError, TypeError, ValueError):
+            return False, "ERR_TOKEN_BATCH_PATH"
+        if not merkle_verify(token_message(token).decode(), path, root, index):
+            return False, "ERR_TOKEN_BATCH_PATH"
+        key = f"{entry.rsu_id}|{token['window_id']}:{root}"
+        if key in self._batch_roots:
+            return True, "OK"
+        try:
+            sig = bytes.fromhex(batch["signature_hex"])
+        except (KeyError, ValueError):
+            return False, "ERR_TOKEN_SIGNATURE"
+        msg = batch_root_message(entry.rsu_id, token["window_id"], root)
+        if not self._verify_signature(entry, msg, sig):
+            return False, "ERR_TOKEN_SIGNATURE"
+        self._batch_roots.check_and_insert(key, token["expiry_ts"])
+        return True, "OK"
+
+    def evict_batch_roots(self, now: int) -> int:
+        return self._batch_roots.evict(lambda key, expiry_ts: expiry_ts < now)
+
+    def cached_batch_roots(self) -> int:
+        return len(self._batch_roots)
+
+    def __contains__(self, rsu_id) -> bool:
+        return str(rsu_id) in self._keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __bool__(self) -> bool:
+        return bool(self._keys)
+
+
+class StubRSUKeyRegistry(RSUKeyRegistry):
+
+    def __init__(self, required: bool = False):
+        super().__init__(required)
+        self._secrets: Dict[str, bytes] = {}
+
+    def register_stub(self, rsu_id, public_key, sk: bytes) -> RSUKey:
+        entry = self.register(rsu_id, public_key)
+        with self._lock:
+            self._secrets[entry.rsu_id] = bytes(sk)
+        return entry
+
+    def load(self, rsus: List[Dict[str, Any]]) -> int:
+        for rsu in rsus:
+            self.register_stub(rsu["rsu_id"], rsu["pk_hex"], bytes.fromhex(rsu["sk_hex"]))
+        self.required = True
+        return len(rsus)
+
+    def _verify_signature(self, entry: RSUKey, msg: bytes, sig: bytes) -> bool:
+        return stub_crypto.ed25519_verify(entry.public_key, msg, sig, sk_hint=self._secrets.get(entry.rsu_id))
+
+    def _verify_signatures(self, items: List[tuple]) -> List[bool]:
+        return [self._verify_signature(entry, msg, sig) for entry, msg, sig in items]
@@ -0,0 +1,171 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional
+
+from .link_tag_table import LinkTagStore
+from .merkle import MerkleTree
+
+if TYPE_CHECKING:
+    from .linkable_ring_signature import PublicKeyRing
+
+
+@dataclass(frozen=True)
+class TaskMaterial:
+    ring: "PublicKeyRing"
+    whitelist: MerkleTree
+    whitelist_root: str
+
+
+@dataclass
+class TaskContext:
+    task_id: str
+    window_start: int
+    window_len: int
+    expiry_ts: int
+    material: TaskMaterial
+    link_tags: LinkTagStore = field(default_factory=LinkTagStore)
+
+    @property
+    def ring(self) -> "PublicKeyRing":
+        return self.material.ring
+
+    @property
+    def whitelist_root(self) -> str:
+        return self.material.whitelist_root
+
+    def in_window(self, timestamp: int) -> bool:
+        return self.window_start <= timestamp < self.window_start + self.window_len
+
+    def expired(self, now: Optional[int] = None) -> bool:
+        now = int(time.time()) if now is None else now
+        return now >= self.expiry_ts
+
+
+class TaskRegistry:
+
+    def __init__(self, max_retired: int = 65536):
+        self._lock = threading.Lock()
+        self._tasks: Dict[str, TaskContext] = {}
+        self._retired: "OrderedDict[str, None]" = OrderedDict()
+        self.max_retired = max_retired
+        self._listeners: List[Callable[[str], object]] = []
+
+    def add_removal_listener(self, callback: Callable[[str], object]) -> None:
+        self._listeners.append(callback)
+
+    def _notify(self, task_ids: Iterable[str]) -> None:
+        for task_id in task_ids:
+            for callback in self._listeners:
+                callback(task_id)
+
+    def register_task(
+        self,
+        task_id: str,
+        ring: "PublicKeyRing",
+        whitelist: List[str],
+        window_start: int,
+        window_len: int = 60,
+        expiry_ts: Optional[int] = None
+    ) -> TaskContext:
+        if ring.task_id != task_id:
+            raise ValueError(f"公钥环属于任务 {ring.task_id}，与 {task_id} 不符")
+        tree = MerkleTree(whitelist)
+        material = TaskMaterial(ring=ring, whitelist=tree, whitelist_root=tree.get_root())
+        expiry_ts = expiry_ts if expiry_ts is not None else window_start + window_len
+        with self._lock:
+            ctx = self._tasks.get(task_id)
+            lapsed = ctx is not None and ctx.expired()
+            if lapsed:
+                self._retire(task_id)
+            retired = task_id in self._retired
+            if retired:
+                ctx = None
+            elif ctx is not None:
+                ctx.material = material
+                ctx.window_start = window_start
+                ctx.window_len = window_len
+                ctx.expiry_ts = expiry_ts
+            else:
+                ctx = self._tasks[task_id] = TaskContext(
+                    task_id=task_id,
+                    window_start=window_start,
+                    window_len=window_len,
+                    expiry_ts=expiry_ts,
+                    material=material
+                )
+        if lapsed:
+            self._notify([task_id])
+        if retired:
+            raise ValueError(f"任务已过期，不能重新注册: {task_id}")
+        return ctx
+
+    def get(self, task_id: str, now: Optional[int] = None) -> Optional[TaskContext]:
+        with self._lock:
+            ctx = self._tasks.get(task_id)
+            if ctx is None or not ctx.expired(now):
+                return ctx
+            self._retire(task_id)
+        self._notify([task_id])
+        return None
+
+    def is_retired(self, task_id: str) -> bool:
+        with self._lock:
+            return task_id in self._retired
+
+    def _retire(self, task_id: str) -> None:
+        del self._tasks[task_id]
+        self._retired[task_id] = None
+        self._retired.move_to_end(task_id)
+        while len(self._retired) > self.max_retired:
+            self._retired.popitem(last=False)
+
+    def swap_ring(self, task_id: str, ring: "PublicKeyRing") -> TaskContext:
+        if ring.task_id != task_id:
+            raise ValueError(f"公钥环属于任务 {ring.task_id}，与 {task_id} 不符")
+        with self._lock:
+            ctx = self._require(task_id)
+            ctx.material = replace(ctx.material, ring=ring)
+            return ctx
+
+    def swap_whitelist(self, task_id: str, whitelist: List[str]) -> TaskContext:
+        tree = MerkleTree(whitelist)
+        with self._lock:
+            ctx = self._require(task_id)
+            ctx.material = replace(ctx.material, whitelist=tree, whitelist_root=tree.get_root())
+            return ctx
+
+    def remove(self, task_id: str) -> bool:
+        with self._lock:
+            removed = task_id in self._tasks
+            if removed:
+                self._retire(task_id)
+        if removed:
+            self._notify([task_id])
+        return removed
+
+    def expire(self, now: Optional[int] = None) -> List[str]:
+        with self._lock:
+            stale = [tid for tid, ctx in self._tasks.items() if ctx.expired(now)]
+            for tid in stale:
+                self._retire(tid)
+        self._notify(stale)
+        return stale
+
+    def active_tasks(self) -> List[str]:
+        with self._lock:
+            return list(self._tasks)
+
+    def _require(self, task_id: str) -> TaskContext:
+        ctx = self._tasks.get(task_id)
+        if ctx is None:
+            raise KeyError(f"任务未注册: {task_id}")
+        return ctx
+
+    def __contains__(self, task_id: str) -> bool:
+        return self.get(task_id) is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._tasks)
@@ -45,7 +45,9 @@ from common.crypto_adapters import (
 
     range_proof_verify,
 
-    pedersen_commit
+    pedersen_commit,
+
+    pedersen_commit_batch
 
 )
 
@@ -334,6 +336,7 @@ class CryptoBenchmark:
 
             self._log(f"  证明大小: {proof_size} bytes")
 
+
         
 
         return results
@@ -447,11 +450,33 @@ class CryptoBenchmark:
 
             
 
+            start = time.perf_counter()
+
+            commitments = pedersen_commit_batch([value] * batch_size, list(range(blinding, blinding + batch_size)))
+
+            commit_time = (time.perf_counter() - start) * 1000
+
+            commit_result = BenchmarkResult.from_measurements(
+
+                operation=f"Pedersen_Commit_Batch",
+
+                times_ms=[commit_time / batch_size] * batch_size,
+
+                size_bytes=32 * len(commitments),
+
+                parameters={"batch_size": batch_size}
+
+            )
+
+            
+
             self.results.add(prove_result)
 
             self.results.add(verify_result)
 
-            results.extend([prove_result, verify_result])
+            self.results.add(commit_result)
+
+            results.extend([prove_result, verify_result, commit_result])
 
             
 
@@ -461,6 +486,8 @@ class CryptoBenchmark:
 
             self._log(f"  证明大小: {proof_size} bytes")
 
+            self._log(f"  批量承诺: {commit_result.avg_time_ms:.4f} ms/个")
+
         
 
         return results
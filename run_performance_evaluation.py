@@ -25,12 +25,15 @@ sys.path.insert(0, str(project_root))
 from experiments.logger import ExperimentLogger
 from common.crypto_adapters import (
     ed25519_generate_keypair, ed25519_sign, ed25519_verify,
-    lrs_sign, lrs_verify,
+    lrs_sign, lrs_verify, lrs_public_key,
     range_proof_prove, range_proof_verify,
-    pedersen_commit
+    pedersen_commit,
+    select_backend, capabilities as crypto_capabilities
 )
+from common.backend_registry import REGISTRY as CRYPTO_REGISTRY
 from common.crypto import merkle_root, merkle_proof, merkle_verify
-from common.kem_layer import kem_keygen, kem_encaps, kem_decaps
+from common.kem_layer import kem_keygen, KEMSessionManager
+from common.report_precompute import ReportPrecomputer
 
 
 @dataclass
@@ -92,7 +95,7 @@ class PerformanceEvaluator:
             "timestamp": datetime.now().isoformat(),
             "python_version": sys.version,
             "platform": sys.platform,
-            "use_real_crypto_env": os.environ.get("USE_REAL_CRYPTO", ""),
+            "crypto_backend": CRYPTO_REGISTRY.default,
             "seed": self.seed,
             "samples_per_attack": self.samples_per_attack,
             "pcvcs_ring_size": self.pcvcs_ring_size,
@@ -111,7 +114,7 @@ class PerformanceEvaluator:
         self.logger.info("  - CPU: AMD Ryzen 5 5500GT")
         self.logger.info("  - 瀹炵幇: Python/Rust 娣峰悎")
         self.logger.info("  - 璇勪及绫诲瀷: 浠跨湡璇勪及")
-        self.logger.info(f"  - USE_REAL_CRYPTO: {os.environ.get('USE_REAL_CRYPTO', '0')}")
+        self.logger.info(f"  - Crypto backend: {CRYPTO_REGISTRY.default}")
         self.logger.info(f"  - Seed: {self.seed}")
         self.logger.info(f"  - Samples/attack: {self.samples_per_attack}")
         self.logger.info(f"  - PCVCS eval ring size: {self.pcvcs_ring_size}")
@@ -123,16 +126,25 @@ class PerformanceEvaluator:
         self.logger.info("  - 瀹夊叏鏈夋晥鎬? Detection Rate (%), FPR (%)")
         self.logger.info("=" * 70)
 
+    def _ring_keypairs(self, ring_size: int) -> List[Tuple[bytes, bytes]]:
+        keys = []
+        for _ in range(ring_size):
+            sk = os.urandom(32)
+            pk = lrs_public_key(sk)
+            keys.append((sk, pk) if pk is not None else ed25519_generate_keypair())
+        return keys
+
     def _init_pcvcs_eval_context(self):
-        self._pcvcs_ring_keys = [ed25519_generate_keypair() for _ in range(self.pcvcs_ring_size)]
+        self._pcvcs_ring_keys = self._ring_keypairs(self.pcvcs_ring_size)
         self._pcvcs_ring_pubkeys = [pk for _, pk in self._pcvcs_ring_keys]
         self._pcvcs_signer_sk = self._pcvcs_ring_keys[0][0]
         self._pcvcs_whitelist = [f"g{i}" for i in range(16)]
         self._pcvcs_root = merkle_root(self._pcvcs_whitelist)
         self._pcvcs_proof = merkle_proof(self._pcvcs_whitelist, 0)
         self._pcvcs_kem_pk, self._pcvcs_kem_sk = kem_keygen()
-        self._pcvcs_session_counter_client = 0
-        self._pcvcs_session_counter_server = 0
+        self._pcvcs_payload = os.urandom(256)
+        self._pcvcs_client_sessions = KEMSessionManager(max_reports=self.pcvcs_reports_per_session)
+        self._pcvcs_server_sessions = KEMSessionManager(max_reports=self.pcvcs_reports_per_session)
 
                                                              
         sample_sig = lrs_sign(b"msg", self._pcvcs_ring_pubkeys, 0, self._pcvcs_signer_sk, b"ctx")
@@ -284,6 +296,19 @@ class PerformanceEvaluator:
                                
             server_times = self._measure_server_breakdown(n_R, iterations=100)
             
+            online = self._measure_online_latency(n_R, iterations=100)
+            results.setdefault("online_latency", []).append({
+                "ring_size": n_R,
+                "full_client_ms": sum(client_times.values()),
+                **online
+            })
+            
+            results.setdefault("kem_reports_per_session", []).append({
+                "ring_size": n_R,
+                "configured": self.pcvcs_reports_per_session,
+                "measured": self._pcvcs_measured_reports_per_session
+            })
+            
             results["client_breakdown"].append({
                 "ring_size": n_R,
                 **client_times
@@ -298,6 +323,7 @@ class PerformanceEvaluator:
             total_client = sum(client_times.values())
             total_server = sum(server_times.values())
             self.logger.info(f"  杞﹁締绔€昏€楁椂: {total_client:.3f} ms")
+            self.logger.info(f"  online: {online['online_ms']:.3f} ms, offline: {online['offline_ms']:.3f} ms/bundle")
             self.logger.info(f"  鏈嶅姟鍣ㄧ鎬昏€楁椂: {total_server:.3f} ms")
         
                 
@@ -317,7 +343,7 @@ class PerformanceEvaluator:
         }
         
                
-        ring_keys = [ed25519_generate_keypair() for _ in range(ring_size)]
+        ring_keys = self._ring_keypairs(ring_size)
         ring_pubkeys = [pk for _, pk in ring_keys]
         signer_sk = ring_keys[0][0]
         
@@ -326,6 +352,8 @@ class PerformanceEvaluator:
         root = merkle_root(whitelist)
         proof = merkle_proof(whitelist, 0)
         kem_pk, _ = kem_keygen()
+        sessions = KEMSessionManager(max_reports=self.pcvcs_reports_per_session)
+        payload = os.urandom(256)
         
         for _ in range(iterations):
                                            
@@ -350,16 +378,39 @@ class PerformanceEvaluator:
             
                                                       
             start = time.perf_counter()
-            ct, ss = kem_encaps(kem_pk)
-            times["ml_kem_encryption"].append(((time.perf_counter() - start) * 1000) / self.pcvcs_reports_per_session)
+            _ = sessions.seal_report(kem_pk, payload)
+            times["ml_kem_encryption"].append((time.perf_counter() - start) * 1000)
         
                   
         avg_times = {
             key: sum(vals) / len(vals) for key, vals in times.items()
         }
+        self._pcvcs_measured_reports_per_session = sessions.stats.reports_per_session
         
         return avg_times
     
+    def _measure_online_latency(self, ring_size: int, iterations: int = 100) -> Dict[str, float]:
+        ring_keys = self._ring_keypairs(ring_size)
+        whitelist = [f"geohash_{i}" for i in range(16)]
+        kem_pk, _ = kem_keygen()
+        precomputer = ReportPrecomputer(
+            "eval_task", [pk for _, pk in ring_keys], 0, ring_keys[0][0], whitelist, kem_pk,
+            capacity=iterations,
+            sessions=KEMSessionManager(max_reports=self.pcvcs_reports_per_session)
+        )
+        precomputer.precompute(whitelist[:4])
+        payload = os.urandom(256)
+        token = {"version": 1, "region_id": "NET", "window_id": 0, "nonce": 0, "expiry_ts": 0, "rsu_id": 1}
+        for i in range(iterations):
+            precomputer.build_report(1234567890, whitelist[i % 4], payload, (0, 2**32 - 1), dict(token, nonce=i))
+        stats = precomputer.stats
+        precomputer.close()
+        return {
+            "offline_ms": stats.avg_offline_ms(),
+            "online_ms": stats.avg_online_ms(),
+            "bundle_hit_rate": stats.bundle_hits / max(1, stats.bundle_hits + stats.bundle_misses)
+        }
+    
     def _measure_server_breakdown(self, ring_size: int, iterations: int = 100) -> Dict[str, float]:
         times = {
             "zk_verification": [],
@@ -368,7 +419,7 @@ class PerformanceEvaluator:
         }
         
                 
-        ring_keys = [ed25519_generate_keypair() for _ in range(ring_size)]
+        ring_keys = self._ring_keypairs(ring_size)
         ring_pubkeys = [pk for _, pk in ring_keys]
         signer_sk = ring_keys[0][0]
         message = b"test_message"
@@ -379,9 +430,11 @@ class PerformanceEvaluator:
         rp = range_proof_prove(1234567890, 0, 2**32-1, 42)
         sig = lrs_sign(message, ring_pubkeys, 0, signer_sk, b"context")
         kem_pk, kem_sk = kem_keygen()
-        ct, ss_expected = kem_encaps(kem_pk)
+        client_sessions = KEMSessionManager(max_reports=self.pcvcs_reports_per_session)
+        server_sessions = KEMSessionManager(max_reports=self.pcvcs_reports_per_session)
+        envelopes = [client_sessions.seal_report(kem_pk, os.urandom(256)) for _ in range(iterations)]
         
-        for _ in range(iterations):
+        for envelope in envelopes:
                                                         
             start = time.perf_counter()
                        
@@ -397,8 +450,8 @@ class PerformanceEvaluator:
             
                                                       
             start = time.perf_counter()
-            _ = kem_decaps(kem_sk, ct)
-            times["kem_decapsulation"].append(((time.perf_counter() - start) * 1000) / self.pcvcs_reports_per_session)
+            _ = server_sessions.open_report(kem_sk, envelope)
+            times["kem_decapsulation"].append((time.perf_counter() - start) * 1000)
         
                   
         avg_times = {
@@ -719,9 +772,7 @@ class PerformanceEvaluator:
         _ = self._pcvcs_proof
         rp = range_proof_prove(12345, 0, 100000, 42)
         sig = lrs_sign(b"msg", self._pcvcs_ring_pubkeys, 0, self._pcvcs_signer_sk, b"ctx")
-        if self._pcvcs_session_counter_client % self.pcvcs_reports_per_session == 0:
-            ct, _ = kem_encaps(self._pcvcs_kem_pk)
-        self._pcvcs_session_counter_client += 1
+        _ = self._pcvcs_client_sessions.seal_report(self._pcvcs_kem_pk, self._pcvcs_payload)
         
         return (time.perf_counter() - start) * 1000
     
@@ -1041,15 +1092,17 @@ class PerformanceEvaluator:
                                                                                                
             rp = range_proof_prove(12345, 0, 100000, 42)
             sig = lrs_sign(b"msg", self._pcvcs_ring_pubkeys, 0, self._pcvcs_signer_sk, b"ctx")
-            ct, _ = kem_encaps(self._pcvcs_kem_pk)
-            for _ in range(iterations):
+            client_sessions = KEMSessionManager(max_reports=self.pcvcs_reports_per_session)
+            envelopes = [
+                client_sessions.seal_report(self._pcvcs_kem_pk, self._pcvcs_payload)
+                for _ in range(iterations)
+            ]
+            for envelope in envelopes:
                 start = time.perf_counter()
                 _ = merkle_verify(self._pcvcs_whitelist[0], self._pcvcs_proof, self._pcvcs_root, 0)
                 _ = range_proof_verify(rp)
                 _ = lrs_verify(b"msg", sig, self._pcvcs_ring_pubkeys)
-                if self._pcvcs_session_counter_server % self.pcvcs_reports_per_session == 0:
-                    _ = kem_decaps(self._pcvcs_kem_sk, ct)
-                self._pcvcs_session_counter_server += 1
+                _ = self._pcvcs_server_sessions.open_report(self._pcvcs_kem_sk, envelope)
                 times.append((time.perf_counter() - start) * 1000)
             return sum(times) / len(times) if times else 0.0
 
@@ -1938,29 +1991,26 @@ def parse_args():
     parser.add_argument("--seed", type=int, default=42, help="Random seed for reproducibility.")
     parser.add_argument("--samples", type=int, default=500, help="Samples per attack for security experiment.")
     parser.add_argument("--output-dir", type=str, default="performance_evaluation_results", help="Base output directory.")
+    parser.add_argument(
+        "--lrs-backend",
+        type=str,
+        default=None,
+        help="Ring signature backend to use (e.g. lsag, groth_kohlweiss); defaults to the first available."
+    )
     return parser.parse_args()
 
 
-def ensure_crypto_backend(use_real_crypto: bool):
-    desired = "1" if use_real_crypto else "0"
-    current = os.environ.get("USE_REAL_CRYPTO", "")
-    if current == desired:
-        return
-
-    if os.environ.get("_PERF_EVAL_REEXEC", "") == "1":
-                                                                
-        return
-
-    env = os.environ.copy()
-    env["USE_REAL_CRYPTO"] = desired
-    env["_PERF_EVAL_REEXEC"] = "1"
-    print(f"[info] Re-executing with USE_REAL_CRYPTO={desired}")
-    os.execvpe(sys.executable, [sys.executable] + sys.argv, env)
+def ensure_crypto_backend(use_real_crypto: bool, lrs_backend: str = None):
+    select_backend("real" if use_real_crypto else "stub")
+    if use_real_crypto and lrs_backend:
+        select_backend(lrs_backend, ["lrs"])
+    for primitive, info in crypto_capabilities().items():
+        print(f"[info] {primitive}: {info['active']} (available: {', '.join(n for n, ok in info['available'].items() if ok)})")
 
 
 if __name__ == "__main__":
     args = parse_args()
-    ensure_crypto_backend(bool(args.use_real_crypto))
+    ensure_crypto_backend(bool(args.use_real_crypto), args.lrs_backend)
 
     evaluator = PerformanceEvaluator(
         output_dir=args.output_dir,
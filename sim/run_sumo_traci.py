@@ -1,6 +1,7 @@
 import os, sys, json, time, argparse, random
 from pathlib import Path
 from common.crypto_adapters import ed25519_generate_keypair, ed25519_sign
+from common.rsu_registry import token_message, sign_token_batch
 from common.crypto import geohash_encode
 
 SUMO_HOME = os.environ.get("SUMO_HOME", None)
@@ -113,6 +114,8 @@ def main():
     ap.add_argument("--steps", type=int, default=300, help="simulation steps")
     ap.add_argument("--out", type=str, default=str(Path(__file__).parent.parent / "data" / "rsu_events.json"))
     ap.add_argument("--collect-metrics", action="store_true", help="Collect vehicle metrics data")
+    ap.add_argument("--tokens-per-window", type=int, default=1, help="tokens issued by each RSU per window")
+    ap.add_argument("--batch-tokens", action="store_true", help="sign one Merkle root per RSU window instead of every token")
     args = ap.parse_args()
 
                        
@@ -178,16 +181,17 @@ def main():
                     rsu = rsus[i]
                                      
                     sk_bytes = bytes.fromhex(rsu["sk_hex"])
-                    nonce = random.getrandbits(64)
                                  
                     expiry = start_time + step + args.window + args.token_expiry
-                    msg = f"{1}|NET|{window_id}|{nonce}|{expiry}|{rsu['rsu_id']}".encode()
-                    sig = ed25519_sign(sk_bytes, msg)
-                    token = {
+                    tokens = [{
                         "version": 1, "region_id": "NET", "window_id": window_id,
-                        "nonce": nonce, "expiry_ts": expiry, "rsu_id": rsu["rsu_id"],
-                        "signature_hex": sig.hex()
-                    }
+                        "nonce": random.getrandbits(64), "expiry_ts": expiry, "rsu_id": rsu["rsu_id"]
+                    } for _ in range(args.tokens_per_window)]
+                    if args.batch_tokens:
+                        tokens = sign_token_batch(sk_bytes, tokens)
+                    else:
+                        for token in tokens:
+                            token["signature_hex"] = ed25519_sign(sk_bytes, token_message(token)).hex()
                     
                                   
                     if geo_bounds:
@@ -204,7 +208,8 @@ def main():
                                                  
                         g7 = list(whitelist_geohashes)[0]
                     
-                    events.append({"token": token, "lat": lat, "lon": lon, "geohash7": g7, "timestamp": start_time + step})
+                    for token in tokens:
+                        events.append({"token": token, "lat": lat, "lon": lon, "geohash7": g7, "timestamp": start_time + step})
                     
                                                     
     finally:
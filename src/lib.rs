@@ -1,61 +1,226 @@
 ﻿use bulletproofs::{BulletproofGens, PedersenGens, RangeProof};
-use curve25519_dalek_ng::ristretto::CompressedRistretto;
+use curve25519_dalek_ng::constants::{RISTRETTO_BASEPOINT_POINT, RISTRETTO_BASEPOINT_TABLE};
+use curve25519_dalek_ng::ristretto::{CompressedRistretto, RistrettoBasepointTable, RistrettoPoint};
 use curve25519_dalek_ng::scalar::Scalar;
+use curve25519_dalek_ng::traits::{Identity, IsIdentity, MultiscalarMul, VartimeMultiscalarMul};
+use ed25519_dalek::{Signature, Verifier, VerifyingKey};
 use merlin::Transcript;
+use ml_kem::kem::{Decapsulate, Encapsulate};
+use ml_kem::{Ciphertext, Encoded, EncodedSizeUser, KemCore, MlKem1024, MlKem512, MlKem768};
 use rand::thread_rng;
+use sha3::digest::{ExtendableOutput, Update, XofReader};
+use sha3::Shake256;
 use std::os::raw::{c_char, c_int};
+use std::sync::OnceLock;
 
-#[no_mangle]
-pub extern "C" fn bp_pedersen_commit(value: u64, blinding: u64, out_commit: *mut c_char) -> c_int {
-    let pc_gens = PedersenGens::default();
-    let value_scalar = Scalar::from(value);
-    let blinding_scalar = Scalar::from(blinding);
-    let commitment = pc_gens.commit(value_scalar, blinding_scalar);
+pub struct BpContext {
+    bp_gens: BulletproofGens,
+    pc_gens: PedersenGens,
+    commit_tables: Option<(RistrettoBasepointTable, RistrettoBasepointTable)>,
+    range_gens: OnceLock<RangeGens>,
+}
+
+struct RangeGens {
+    g: Vec<Vec<RistrettoPoint>>,
+    h: Vec<Vec<RistrettoPoint>>,
+}
+
+fn generator_chain(label: &[u8], count: usize) -> Vec<RistrettoPoint> {
+    let mut shake = Shake256::default();
+    shake.update(b"GeneratorsChain");
+    shake.update(label);
+    let mut reader = shake.finalize_xof();
+    (0..count)
+        .map(|_| {
+            let mut wide = [0u8; 64];
+            reader.read(&mut wide);
+            RistrettoPoint::from_uniform_bytes(&wide)
+        })
+        .collect()
+}
+
+impl BpContext {
+    fn new(gens_capacity: usize, party_capacity: usize) -> Self {
+        BpContext {
+            bp_gens: BulletproofGens::new(gens_capacity.max(64), party_capacity.max(2)),
+            pc_gens: PedersenGens::default(),
+            commit_tables: None,
+            range_gens: OnceLock::new(),
+        }
+    }
+
+    fn range_gens(&self) -> &RangeGens {
+        self.range_gens.get_or_init(|| {
+            let (n, m) = (self.bp_gens.gens_capacity, self.bp_gens.party_capacity);
+            let chain = |prefix: u8, j: usize| {
+                let mut label = [prefix, 0, 0, 0, 0];
+                label[1..].copy_from_slice(&(j as u32).to_le_bytes());
+                generator_chain(&label, n)
+            };
+            RangeGens {
+                g: (0..m).map(|j| chain(b'G', j)).collect(),
+                h: (0..m).map(|j| chain(b'H', j)).collect(),
+            }
+        })
+    }
+
+    fn with_commit_tables(mut self) -> Self {
+        self.commit_tables = Some((
+            RistrettoBasepointTable::create(&self.pc_gens.B),
+            RistrettoBasepointTable::create(&self.pc_gens.B_blinding),
+        ));
+        self
+    }
+
+    fn commit(&self, value: u64, blinding: u64) -> CompressedRistretto {
+        let (value, blinding) = (Scalar::from(value), Scalar::from(blinding));
+        match &self.commit_tables {
+            Some((value_table, blinding_table)) => (value_table * &value + blinding_table * &blinding).compress(),
+            None => self.pc_gens.commit(value, blinding).compress(),
+        }
+    }
+}
+
+fn default_context() -> &'static BpContext {
+    static DEFAULT_CONTEXT: OnceLock<BpContext> = OnceLock::new();
+    DEFAULT_CONTEXT.get_or_init(|| BpContext::new(64, 1))
+}
+
+fn read_commitment(commit: *const c_char) -> CompressedRistretto {
+    let commit_bytes = unsafe { std::slice::from_raw_parts(commit as *const u8, 32) };
+    let mut commitment_array = [0u8; 32];
+    commitment_array.copy_from_slice(commit_bytes);
+    CompressedRistretto(commitment_array)
+}
+
+fn pedersen_commit_with(ctx: &BpContext, value: u64, blinding: u64, out_commit: *mut c_char) -> c_int {
+    let commitment = ctx.commit(value, blinding);
 
     unsafe {
-        let commit_bytes = commitment.compress().to_bytes();
+        let commit_bytes = commitment.to_bytes();
         std::ptr::copy_nonoverlapping(commit_bytes.as_ptr() as *const c_char, out_commit, commit_bytes.len());
     }
 
     0
 }
 
-#[no_mangle]
-pub extern "C" fn bp_range_proof_prove(
-    value: u64,
-    l: u64,
-    u: u64,
-    blinding: u64,
-    out_commit: *mut c_char,
+const RANGE_BIT_WIDTHS: [usize; 4] = [8, 16, 32, 64];
+
+fn bit_width_for(l: u64, u: u64) -> Option<usize> {
+    if u < l {
+        return None;
+    }
+    let span = u - l;
+    RANGE_BIT_WIDTHS.iter().copied().find(|&n| n == 64 || span < (1u64 << n))
+}
+
+fn bounded_width(ls: &[u64], us: &[u64]) -> Option<usize> {
+    let mut n = 0;
+    for i in 0..ls.len() {
+        n = n.max(bit_width_for(ls[i], us[i])?);
+    }
+    Some(n)
+}
+
+fn bounded_proof_body(proof_bytes: &[u8], n: usize) -> Option<&[u8]> {
+    if proof_bytes.len() % 32 != 1 || proof_bytes[0] as usize != n {
+        return None;
+    }
+    Some(&proof_bytes[1..])
+}
+
+fn bounded_parts(values: &[u64], ls: &[u64], us: &[u64], blindings: &[Scalar]) -> Option<(Vec<u64>, Vec<Scalar>)> {
+    let mut parts = Vec::with_capacity(values.len() * 2);
+    let mut part_blindings = Vec::with_capacity(values.len() * 2);
+    for i in 0..values.len() {
+        if values[i] < ls[i] || values[i] > us[i] {
+            return None;
+        }
+        parts.push(values[i] - ls[i]);
+        part_blindings.push(blindings[i]);
+        parts.push(us[i] - values[i]);
+        part_blindings.push(-blindings[i]);
+    }
+    Some((parts, part_blindings))
+}
+
+fn offset_commitments(
+    ctx: &BpContext,
+    commitments: &[CompressedRistretto],
+    ls: &[u64],
+    us: &[u64],
+) -> Option<Vec<CompressedRistretto>> {
+    let base = ctx.pc_gens.B;
+    let mut offsets = Vec::with_capacity(commitments.len() * 2);
+    for i in 0..commitments.len() {
+        let c = commitments[i].decompress()?;
+        offsets.push((c - base * Scalar::from(ls[i])).compress());
+        offsets.push((base * Scalar::from(us[i]) - c).compress());
+    }
+    Some(offsets)
+}
+
+fn prove_bounded(
+    ctx: &BpContext,
+    values: &[u64],
+    ls: &[u64],
+    us: &[u64],
+    blindings: &[u64],
+    out_commits: *mut c_char,
     out_proof: *mut c_char,
     out_proof_len: *mut usize,
 ) -> c_int {
-    let _ = (l, u);
-    let bp_gens = BulletproofGens::new(64, 1);
-    let pc_gens = PedersenGens::default();
-    let value_scalar = Scalar::from(value);
-    let blinding_scalar = Scalar::from(blinding);
-    let commitment = pc_gens.commit(value_scalar, blinding_scalar);
-
-    unsafe {
-        let commit_bytes = commitment.compress().to_bytes();
-        std::ptr::copy_nonoverlapping(commit_bytes.as_ptr() as *const c_char, out_commit, commit_bytes.len());
+    let n = match bounded_width(ls, us) {
+        Some(n) => n,
+        None => return 2,
+    };
+    let blinding_scalars: Vec<Scalar> = blindings.iter().map(|b| Scalar::from(*b)).collect();
+    let (mut parts, mut part_blindings) = match bounded_parts(values, ls, us, &blinding_scalars) {
+        Some(p) => p,
+        None => return 2,
+    };
+    let m = parts.len().next_power_of_two();
+    if m > ctx.bp_gens.party_capacity {
+        return 3;
     }
+    parts.resize(m, 0);
+    part_blindings.resize(m, Scalar::zero());
 
     let mut rng = thread_rng();
-    let mut transcript = Transcript::new(b"RangeProof");
-    let proof = RangeProof::prove_single(&bp_gens, &pc_gens, &mut transcript, value, &blinding_scalar, 64);
+    let mut transcript = Transcript::new(b"BoundedRangeProof");
+    let proof = RangeProof::prove_multiple_with_rng(
+        &ctx.bp_gens,
+        &ctx.pc_gens,
+        &mut transcript,
+        &parts,
+        &part_blindings,
+        n,
+        &mut rng,
+    );
 
     match proof {
-        Ok((proof, _commitments)) => {
+        Ok((proof, _offsets)) => {
             let proof_bytes = proof.to_bytes();
             unsafe {
+                for i in 0..values.len() {
+                    let commit_bytes = ctx
+                        .pc_gens
+                        .commit(Scalar::from(values[i]), blinding_scalars[i])
+                        .compress()
+                        .to_bytes();
+                    std::ptr::copy_nonoverlapping(
+                        commit_bytes.as_ptr() as *const c_char,
+                        out_commits.add(i * 32),
+                        32,
+                    );
+                }
+                *out_proof = n as u8 as c_char;
                 std::ptr::copy_nonoverlapping(
                     proof_bytes.as_ptr() as *const c_char,
-                    out_proof,
+                    out_proof.add(1),
                     proof_bytes.len(),
                 );
-                *out_proof_len = proof_bytes.len();
+                *out_proof_len = proof_bytes.len() + 1;
             }
             0
         }
@@ -63,32 +228,1730 @@ pub extern "C" fn bp_range_proof_prove(
     }
 }
 
+fn verify_bounded(
+    ctx: &BpContext,
+    ls: &[u64],
+    us: &[u64],
+    commitments: &[CompressedRistretto],
+    proof_bytes: &[u8],
+) -> bool {
+    if commitments.is_empty() || ls.len() != commitments.len() {
+        return false;
+    }
+    let n = match bounded_width(ls, us) {
+        Some(n) => n,
+        None => return false,
+    };
+    let body = match bounded_proof_body(proof_bytes, n) {
+        Some(body) => body,
+        None => return false,
+    };
+    let mut offsets = match offset_commitments(ctx, commitments, ls, us) {
+        Some(o) => o,
+        None => return false,
+    };
+    let m = offsets.len().next_power_of_two();
+    if m > ctx.bp_gens.party_capacity {
+        return false;
+    }
+    offsets.resize(m, CompressedRistretto::identity());
+
+    let proof = match RangeProof::from_bytes(body) {
+        Ok(p) => p,
+        Err(_) => return false,
+    };
+
+    let mut transcript = Transcript::new(b"BoundedRangeProof");
+    proof
+        .verify_multiple(&ctx.bp_gens, &ctx.pc_gens, &mut transcript, &offsets, n)
+        .is_ok()
+}
+
+fn range_proof_prove_with(
+    ctx: &BpContext,
+    value: u64,
+    l: u64,
+    u: u64,
+    blinding: u64,
+    out_commit: *mut c_char,
+    out_proof: *mut c_char,
+    out_proof_len: *mut usize,
+) -> c_int {
+    prove_bounded(ctx, &[value], &[l], &[u], &[blinding], out_commit, out_proof, out_proof_len)
+}
+
+fn range_proof_verify_with(ctx: &BpContext, l: u64, u: u64, commitment: &CompressedRistretto, proof_bytes: &[u8]) -> bool {
+    verify_bounded(ctx, &[l], &[u], std::slice::from_ref(commitment), proof_bytes)
+}
+
+struct RangeProofParts {
+    a: CompressedRistretto,
+    s: CompressedRistretto,
+    t1: CompressedRistretto,
+    t2: CompressedRistretto,
+    t_x: Scalar,
+    t_x_blinding: Scalar,
+    e_blinding: Scalar,
+    l_vec: Vec<CompressedRistretto>,
+    r_vec: Vec<CompressedRistretto>,
+    ipp_a: Scalar,
+    ipp_b: Scalar,
+}
+
+fn parse_range_proof(bytes: &[u8]) -> Option<RangeProofParts> {
+    if bytes.len() % 32 != 0 {
+        return None;
+    }
+    let count = bytes.len() / 32;
+    if count < 9 || (count - 9) % 2 != 0 {
+        return None;
+    }
+    let point = |i: usize| {
+        let mut array = [0u8; 32];
+        array.copy_from_slice(&bytes[i * 32..(i + 1) * 32]);
+        CompressedRistretto(array)
+    };
+    let scalar = |i: usize| read_canonical_scalar(&bytes[i * 32..(i + 1) * 32]);
+    let lg = (count - 9) / 2;
+    Some(RangeProofParts {
+        a: point(0),
+        s: point(1),
+        t1: point(2),
+        t2: point(3),
+        t_x: scalar(4)?,
+        t_x_blinding: scalar(5)?,
+        e_blinding: scalar(6)?,
+        l_vec: (0..lg).map(|k| point(7 + 2 * k)).collect(),
+        r_vec: (0..lg).map(|k| point(8 + 2 * k)).collect(),
+        ipp_a: scalar(count - 2)?,
+        ipp_b: scalar(count - 1)?,
+    })
+}
+
+fn append_nonidentity(transcript: &mut Transcript, label: &'static [u8], point: &CompressedRistretto) -> Option<()> {
+    if point.is_identity() {
+        return None;
+    }
+    transcript.append_message(label, point.as_bytes());
+    Some(())
+}
+
+fn range_challenge(transcript: &mut Transcript, label: &'static [u8]) -> Scalar {
+    let mut wide = [0u8; 64];
+    transcript.challenge_bytes(label, &mut wide);
+    Scalar::from_bytes_mod_order_wide(&wide)
+}
+
+fn sum_of_powers(x: &Scalar, n: usize) -> Scalar {
+    let (mut sum, mut power) = (Scalar::zero(), Scalar::one());
+    for _ in 0..n {
+        sum += power;
+        power *= x;
+    }
+    sum
+}
+
+struct RangeStatement<'a> {
+    label: &'static [u8],
+    commitments: Vec<CompressedRistretto>,
+    n: usize,
+    proof_bytes: &'a [u8],
+}
+
+fn range_statement<'a>(
+    ctx: &BpContext,
+    l: u64,
+    u: u64,
+    commitment: &CompressedRistretto,
+    proof_bytes: &'a [u8],
+) -> Option<RangeStatement<'a>> {
+    let n = bit_width_for(l, u)?;
+    let body = bounded_proof_body(proof_bytes, n)?;
+    let mut offsets = offset_commitments(ctx, std::slice::from_ref(commitment), &[l], &[u])?;
+    offsets.resize(offsets.len().next_power_of_two(), CompressedRistretto::identity());
+    Some(RangeStatement { label: b"BoundedRangeProof", commitments: offsets, n, proof_bytes: body })
+}
+
+struct RangeProofTerms {
+    n: usize,
+    m: usize,
+    b: Scalar,
+    b_blinding: Scalar,
+    g: Vec<Scalar>,
+    h: Vec<Scalar>,
+    scalars: Vec<Scalar>,
+    points: Vec<RistrettoPoint>,
+}
+
+fn range_proof_terms(statement: &RangeStatement, rng: &mut rand::rngs::ThreadRng) -> Option<RangeProofTerms> {
+    let (n, m) = (statement.n, statement.commitments.len());
+    let nm = n * m;
+    let proof = parse_range_proof(statement.proof_bytes)?;
+    let lg = proof.l_vec.len();
+    if lg >= 32 || nm != 1 << lg {
+        return None;
+    }
+
+    let mut transcript = Transcript::new(statement.label);
+    transcript.append_message(b"dom-sep", b"rangeproof v1");
+    transcript.append_u64(b"n", n as u64);
+    transcript.append_u64(b"m", m as u64);
+    for v in &statement.commitments {
+        transcript.append_message(b"V", v.as_bytes());
+    }
+    append_nonidentity(&mut transcript, b"A", &proof.a)?;
+    append_nonidentity(&mut transcript, b"S", &proof.s)?;
+    let y = range_challenge(&mut transcript, b"y");
+    let z = range_challenge(&mut transcript, b"z");
+    append_nonidentity(&mut transcript, b"T_1", &proof.t1)?;
+    append_nonidentity(&mut transcript, b"T_2", &proof.t2)?;
+    let x = range_challenge(&mut transcript, b"x");
+    transcript.append_message(b"t_x", proof.t_x.as_bytes());
+    transcript.append_message(b"t_x_blinding", proof.t_x_blinding.as_bytes());
+    transcript.append_message(b"e_blinding", proof.e_blinding.as_bytes());
+    let w = range_challenge(&mut transcript, b"w");
+    let c = Scalar::random(rng);
+
+    transcript.append_message(b"dom-sep", b"ipp v1");
+    transcript.append_u64(b"n", nm as u64);
+    let mut u_sq = Vec::with_capacity(lg);
+    for (l, r) in proof.l_vec.iter().zip(proof.r_vec.iter()) {
+        append_nonidentity(&mut transcript, b"L", l)?;
+        append_nonidentity(&mut transcript, b"R", r)?;
+        u_sq.push(range_challenge(&mut transcript, b"u"));
+    }
+    let mut u_inv_sq = u_sq.clone();
+    let all_inv = Scalar::batch_invert(&mut u_inv_sq);
+    for i in 0..lg {
+        u_sq[i] = u_sq[i] * u_sq[i];
+        u_inv_sq[i] = u_inv_sq[i] * u_inv_sq[i];
+    }
+    let mut s = Vec::with_capacity(nm);
+    s.push(all_inv);
+    for i in 1..nm {
+        let lg_i = (usize::BITS - 1 - i.leading_zeros()) as usize;
+        let next = s[i - (1 << lg_i)] * u_sq[(lg - 1) - lg_i];
+        s.push(next);
+    }
+
+    let zz = z * z;
+    let two = Scalar::from(2u64);
+    let y_inv = y.invert();
+    let mut g = Vec::with_capacity(nm);
+    let mut h = Vec::with_capacity(nm);
+    let mut points = Vec::with_capacity(4 + 2 * lg + m);
+    let mut scalars = Vec::with_capacity(4 + 2 * lg + m);
+    let (mut y_inv_i, mut z_j) = (Scalar::one(), Scalar::one());
+    for j in 0..m {
+        let mut two_k = Scalar::one();
+        for k in 0..n {
+            let i = j * n + k;
+            g.push(-z - proof.ipp_a * s[i]);
+            h.push(z + y_inv_i * (zz * z_j * two_k - proof.ipp_b * s[nm - 1 - i]));
+            y_inv_i *= y_inv;
+            two_k *= two;
+        }
+        scalars.push(c * zz * z_j);
+        points.push(statement.commitments[j].decompress()?);
+        z_j *= z;
+    }
+
+    let delta = (z - zz) * sum_of_powers(&y, nm) - zz * z * sum_of_powers(&two, n) * sum_of_powers(&z, m);
+    for (scalar, point) in [(Scalar::one(), proof.a), (x, proof.s), (c * x, proof.t1), (c * x * x, proof.t2)].iter() {
+        scalars.push(*scalar);
+        points.push(point.decompress()?);
+    }
+    for i in 0..lg {
+        scalars.push(u_sq[i]);
+        points.push(proof.l_vec[i].decompress()?);
+        scalars.push(u_inv_sq[i]);
+        points.push(proof.r_vec[i].decompress()?);
+    }
+
+    Some(RangeProofTerms {
+        n,
+        m,
+        b: w * (proof.t_x - proof.ipp_a * proof.ipp_b) + c * (delta - proof.t_x),
+        b_blinding: -proof.e_blinding - c * proof.t_x_blinding,
+        g,
+        h,
+        scalars,
+        points,
+    })
+}
+
+fn range_proof_verify_batch_with(
+    ctx: &BpContext,
+    count: usize,
+    ls: *const u64,
+    us: *const u64,
+    commits: *const c_char,
+    proofs: *const *const c_char,
+    proof_lens: *const usize,
+    out_results: *mut u8,
+) -> c_int {
+    if count == 0 {
+        return 0;
+    }
+    let ls = unsafe { std::slice::from_raw_parts(ls, count) };
+    let us = unsafe { std::slice::from_raw_parts(us, count) };
+    let proof_ptrs = unsafe { std::slice::from_raw_parts(proofs, count) };
+    let proof_lens = unsafe { std::slice::from_raw_parts(proof_lens, count) };
+    let results = unsafe { std::slice::from_raw_parts_mut(out_results, count) };
+    let commitments: Vec<CompressedRistretto> = (0..count)
+        .map(|i| read_commitment(unsafe { commits.add(i * 32) }))
+        .collect();
+    let proof_slices: Vec<&[u8]> = (0..count)
+        .map(|i| unsafe { std::slice::from_raw_parts(proof_ptrs[i] as *const u8, proof_lens[i]) })
+        .collect();
+
+    let (n_cap, m_cap) = (ctx.bp_gens.gens_capacity, ctx.bp_gens.party_capacity);
+    let mut g_acc = vec![vec![Scalar::zero(); n_cap]; m_cap];
+    let mut h_acc = vec![vec![Scalar::zero(); n_cap]; m_cap];
+    let (mut b_acc, mut b_blinding_acc) = (Scalar::zero(), Scalar::zero());
+    let (mut used_n, mut used_m) = (0, 0);
+    let mut scalars = Vec::new();
+    let mut points = Vec::new();
+    let mut batched = Vec::with_capacity(count);
+    let mut rng = thread_rng();
+    for i in 0..count {
+        results[i] = 0;
+        let terms = range_statement(ctx, ls[i], us[i], &commitments[i], proof_slices[i])
+            .and_then(|statement| range_proof_terms(&statement, &mut rng));
+        let terms = match terms {
+            Some(t) if t.n <= n_cap && t.m <= m_cap => t,
+            _ => continue,
+        };
+        let weight = Scalar::random(&mut rng);
+        b_acc += weight * terms.b;
+        b_blinding_acc += weight * terms.b_blinding;
+        for j in 0..terms.m {
+            for k in 0..terms.n {
+                g_acc[j][k] += weight * terms.g[j * terms.n + k];
+                h_acc[j][k] += weight * terms.h[j * terms.n + k];
+            }
+        }
+        used_n = used_n.max(terms.n);
+        used_m = used_m.max(terms.m);
+        scalars.extend(terms.scalars.iter().map(|s| weight * s));
+        points.extend(terms.points);
+        batched.push(i);
+    }
+
+    if !batched.is_empty() {
+        let gens = ctx.range_gens();
+        scalars.push(b_acc);
+        points.push(ctx.pc_gens.B);
+        scalars.push(b_blinding_acc);
+        points.push(ctx.pc_gens.B_blinding);
+        for j in 0..used_m {
+            scalars.extend_from_slice(&g_acc[j][..used_n]);
+            points.extend_from_slice(&gens.g[j][..used_n]);
+            scalars.extend_from_slice(&h_acc[j][..used_n]);
+            points.extend_from_slice(&gens.h[j][..used_n]);
+        }
+        if RistrettoPoint::vartime_multiscalar_mul(&scalars, &points).is_identity() {
+            for &i in &batched {
+                results[i] = 1;
+            }
+        }
+    }
+
+    let mut all_ok = true;
+    for i in 0..count {
+        if results[i] == 0 {
+            results[i] = range_proof_verify_with(ctx, ls[i], us[i], &commitments[i], proof_slices[i]) as u8;
+        }
+        all_ok &= results[i] == 1;
+    }
+
+    if all_ok { 0 } else { 1 }
+}
+
+fn range_proof_prove_multiple_with(
+    ctx: &BpContext,
+    values: &[u64],
+    ls: &[u64],
+    us: &[u64],
+    blindings: &[u64],
+    out_commits: *mut c_char,
+    out_proof: *mut c_char,
+    out_proof_len: *mut usize,
+) -> c_int {
+    if values.is_empty() {
+        return 3;
+    }
+    prove_bounded(ctx, values, ls, us, blindings, out_commits, out_proof, out_proof_len)
+}
+
+fn range_proof_verify_multiple_with(
+    ctx: &BpContext,
+    ls: &[u64],
+    us: &[u64],
+    commitments: &[CompressedRistretto],
+    proof_bytes: &[u8],
+) -> bool {
+    verify_bounded(ctx, ls, us, commitments, proof_bytes)
+}
+
 #[no_mangle]
-pub extern "C" fn bp_range_proof_verify(
+pub extern "C" fn bp_context_new(gens_capacity: usize, party_capacity: usize) -> *mut BpContext {
+    Box::into_raw(Box::new(BpContext::new(gens_capacity, party_capacity).with_commit_tables()))
+}
+
+#[no_mangle]
+pub extern "C" fn bp_context_free(ctx: *mut BpContext) {
+    if !ctx.is_null() {
+        unsafe { drop(Box::from_raw(ctx)) };
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn bp_ctx_pedersen_commit(ctx: *const BpContext, value: u64, blinding: u64, out_commit: *mut c_char) -> c_int {
+    match unsafe { ctx.as_ref() } {
+        Some(ctx) => pedersen_commit_with(ctx, value, blinding, out_commit),
+        None => -1,
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn bp_ctx_pedersen_commit_batch(
+    ctx: *const BpContext,
+    n: usize,
+    values: *const u64,
+    blindings: *const u64,
+    out_commits: *mut c_char,
+) -> c_int {
+    let ctx = match unsafe { ctx.as_ref() } {
+        Some(ctx) => ctx,
+        None => return -1,
+    };
+    if n == 0 {
+        return 0;
+    }
+    let (values, blindings, out) = unsafe {
+        (
+            std::slice::from_raw_parts(values, n),
+            std::slice::from_raw_parts(blindings, n),
+            std::slice::from_raw_parts_mut(out_commits as *mut u8, 32 * n),
+        )
+    };
+    for (i, chunk) in out.chunks_exact_mut(32).enumerate() {
+        chunk.copy_from_slice(ctx.commit(values[i], blindings[i]).as_bytes());
+    }
+    0
+}
+
+#[no_mangle]
+pub extern "C" fn bp_ctx_range_proof_prove(
+    ctx: *const BpContext,
+    value: u64,
+    l: u64,
+    u: u64,
+    blinding: u64,
+    out_commit: *mut c_char,
+    out_proof: *mut c_char,
+    out_proof_len: *mut usize,
+) -> c_int {
+    match unsafe { ctx.as_ref() } {
+        Some(ctx) => range_proof_prove_with(ctx, value, l, u, blinding, out_commit, out_proof, out_proof_len),
+        None => -1,
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn bp_ctx_range_proof_verify(
+    ctx: *const BpContext,
     l: u64,
     u: u64,
     commit: *const c_char,
     proof: *const c_char,
     proof_len: usize,
 ) -> c_int {
-    let _ = (l, u);
-    let bp_gens = BulletproofGens::new(64, 1);
-    let pc_gens = PedersenGens::default();
+    let ctx = match unsafe { ctx.as_ref() } {
+        Some(ctx) => ctx,
+        None => return -1,
+    };
+    let commitment = read_commitment(commit);
+    let proof_bytes = unsafe { std::slice::from_raw_parts(proof as *const u8, proof_len) };
+    if range_proof_verify_with(ctx, l, u, &commitment, proof_bytes) { 0 } else { 1 }
+}
 
-    let commit_bytes = unsafe { std::slice::from_raw_parts(commit as *const u8, 32) };
-    let mut commitment_array = [0u8; 32];
-    commitment_array.copy_from_slice(commit_bytes);
-    let commitment = CompressedRistretto(commitment_array);
+#[no_mangle]
+pub extern "C" fn bp_ctx_range_proof_verify_batch(
+    ctx: *const BpContext,
+    count: usize,
+    ls: *const u64,
+    us: *const u64,
+    commits: *const c_char,
+    proofs: *const *const c_char,
+    proof_lens: *const usize,
+    out_results: *mut u8,
+) -> c_int {
+    match unsafe { ctx.as_ref() } {
+        Some(ctx) => range_proof_verify_batch_with(ctx, count, ls, us, commits, proofs, proof_lens, out_results),
+        None => -1,
+    }
+}
 
+#[no_mangle]
+pub extern "C" fn bp_ctx_range_proof_prove_multiple(
+    ctx: *const BpContext,
+    count: usize,
+    values: *const u64,
+    ls: *const u64,
+    us: *const u64,
+    blindings: *const u64,
+    out_commits: *mut c_char,
+    out_proof: *mut c_char,
+    out_proof_len: *mut usize,
+) -> c_int {
+    let ctx = match unsafe { ctx.as_ref() } {
+        Some(ctx) => ctx,
+        None => return -1,
+    };
+    if count == 0 {
+        return 3;
+    }
+    let (values, ls, us, blindings) = unsafe {
+        (
+            std::slice::from_raw_parts(values, count),
+            std::slice::from_raw_parts(ls, count),
+            std::slice::from_raw_parts(us, count),
+            std::slice::from_raw_parts(blindings, count),
+        )
+    };
+    range_proof_prove_multiple_with(ctx, values, ls, us, blindings, out_commits, out_proof, out_proof_len)
+}
+
+#[no_mangle]
+pub extern "C" fn bp_ctx_range_proof_verify_multiple(
+    ctx: *const BpContext,
+    count: usize,
+    ls: *const u64,
+    us: *const u64,
+    commits: *const c_char,
+    proof: *const c_char,
+    proof_len: usize,
+) -> c_int {
+    let ctx = match unsafe { ctx.as_ref() } {
+        Some(ctx) => ctx,
+        None => return -1,
+    };
+    if count == 0 {
+        return 1;
+    }
+    let (ls, us) = unsafe { (std::slice::from_raw_parts(ls, count), std::slice::from_raw_parts(us, count)) };
+    let commitments: Vec<CompressedRistretto> = (0..count)
+        .map(|i| read_commitment(unsafe { commits.add(i * 32) }))
+        .collect();
     let proof_bytes = unsafe { std::slice::from_raw_parts(proof as *const u8, proof_len) };
-    let proof = match RangeProof::from_bytes(proof_bytes) {
-        Ok(p) => p,
+    if range_proof_verify_multiple_with(ctx, ls, us, &commitments, proof_bytes) { 0 } else { 1 }
+}
+
+#[no_mangle]
+pub extern "C" fn bp_pedersen_commit(value: u64, blinding: u64, out_commit: *mut c_char) -> c_int {
+    let commitment = PedersenGens::default().commit(Scalar::from(value), Scalar::from(blinding)).compress();
+    write_bytes(out_commit, commitment.as_bytes());
+    0
+}
+
+#[no_mangle]
+pub extern "C" fn bp_range_proof_prove(
+    value: u64,
+    l: u64,
+    u: u64,
+    blinding: u64,
+    out_commit: *mut c_char,
+    out_proof: *mut c_char,
+    out_proof_len: *mut usize,
+) -> c_int {
+    range_proof_prove_with(default_context(), value, l, u, blinding, out_commit, out_proof, out_proof_len)
+}
+
+#[no_mangle]
+pub extern "C" fn bp_range_proof_verify(
+    l: u64,
+    u: u64,
+    commit: *const c_char,
+    proof: *const c_char,
+    proof_len: usize,
+) -> c_int {
+    let commitment = read_commitment(commit);
+    let proof_bytes = unsafe { std::slice::from_raw_parts(proof as *const u8, proof_len) };
+    if range_proof_verify_with(default_context(), l, u, &commitment, proof_bytes) { 0 } else { 1 }
+}
+
+#[no_mangle]
+pub extern "C" fn bp_range_proof_verify_batch(
+    count: usize,
+    ls: *const u64,
+    us: *const u64,
+    commits: *const c_char,
+    proofs: *const *const c_char,
+    proof_lens: *const usize,
+    out_results: *mut u8,
+) -> c_int {
+    range_proof_verify_batch_with(default_context(), count, ls, us, commits, proofs, proof_lens, out_results)
+}
+
+const MLKEM_SHARED_KEY_LEN: usize = 32;
+
+fn mlkem_sizes_for(level: u32) -> Option<(usize, usize, usize)> {
+    match level {
+        512 => Some((800, 1632, 768)),
+        768 => Some((1184, 2400, 1088)),
+        1024 => Some((1568, 3168, 1568)),
+        _ => None,
+    }
+}
+
+fn mlkem_keygen_with<K: KemCore>(out_pk: *mut c_char, out_sk: *mut c_char) -> c_int {
+    let (dk, ek) = K::generate(&mut thread_rng());
+    let pk = ek.as_bytes();
+    let sk = dk.as_bytes();
+    unsafe {
+        std::ptr::copy_nonoverlapping(pk.as_ptr() as *const c_char, out_pk, pk.len());
+        std::ptr::copy_nonoverlapping(sk.as_ptr() as *const c_char, out_sk, sk.len());
+    }
+    0
+}
+
+fn mlkem_encaps_with<K: KemCore>(pk: &[u8], out_ct: *mut c_char, out_ss: *mut c_char) -> c_int {
+    let encoded = match Encoded::<K::EncapsulationKey>::try_from(pk) {
+        Ok(encoded) => encoded,
+        Err(_) => return 2,
+    };
+    let ek = K::EncapsulationKey::from_bytes(&encoded);
+    let (ct, ss) = match ek.encapsulate(&mut thread_rng()) {
+        Ok(result) => result,
         Err(_) => return 1,
     };
+    unsafe {
+        std::ptr::copy_nonoverlapping(ct.as_ptr() as *const c_char, out_ct, ct.len());
+        std::ptr::copy_nonoverlapping(ss.as_ptr() as *const c_char, out_ss, MLKEM_SHARED_KEY_LEN);
+    }
+    0
+}
 
-    let mut transcript = Transcript::new(b"RangeProof");
-    match proof.verify_single(&bp_gens, &pc_gens, &mut transcript, &commitment, 64) {
-        Ok(_) => 0,
-        Err(_) => 1,
+fn mlkem_decaps_with<K: KemCore>(sk: &[u8], ct: &[u8], out_ss: *mut c_char) -> c_int {
+    let encoded = match Encoded::<K::DecapsulationKey>::try_from(sk) {
+        Ok(encoded) => encoded,
+        Err(_) => return 2,
+    };
+    let ct = match Ciphertext::<K>::try_from(ct) {
+        Ok(ct) => ct,
+        Err(_) => return 2,
+    };
+    let dk = K::DecapsulationKey::from_bytes(&encoded);
+    let ss = match dk.decapsulate(&ct) {
+        Ok(ss) => ss,
+        Err(_) => return 1,
+    };
+    unsafe {
+        std::ptr::copy_nonoverlapping(ss.as_ptr() as *const c_char, out_ss, MLKEM_SHARED_KEY_LEN);
+    }
+    0
+}
+
+#[no_mangle]
+pub extern "C" fn mlkem_sizes(level: u32, out_pk_len: *mut usize, out_sk_len: *mut usize, out_ct_len: *mut usize) -> c_int {
+    match mlkem_sizes_for(level) {
+        Some((pk_len, sk_len, ct_len)) => {
+            unsafe {
+                *out_pk_len = pk_len;
+                *out_sk_len = sk_len;
+                *out_ct_len = ct_len;
+            }
+            0
+        }
+        None => -2,
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn mlkem_keygen(level: u32, out_pk: *mut c_char, out_sk: *mut c_char) -> c_int {
+    match level {
+        512 => mlkem_keygen_with::<MlKem512>(out_pk, out_sk),
+        768 => mlkem_keygen_with::<MlKem768>(out_pk, out_sk),
+        1024 => mlkem_keygen_with::<MlKem1024>(out_pk, out_sk),
+        _ => -2,
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn mlkem_encaps(level: u32, pk: *const c_char, pk_len: usize, out_ct: *mut c_char, out_ss: *mut c_char) -> c_int {
+    let pk = unsafe { std::slice::from_raw_parts(pk as *const u8, pk_len) };
+    match level {
+        512 => mlkem_encaps_with::<MlKem512>(pk, out_ct, out_ss),
+        768 => mlkem_encaps_with::<MlKem768>(pk, out_ct, out_ss),
+        1024 => mlkem_encaps_with::<MlKem1024>(pk, out_ct, out_ss),
+        _ => -2,
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn mlkem_decaps(
+    level: u32,
+    sk: *const c_char,
+    sk_len: usize,
+    ct: *const c_char,
+    ct_len: usize,
+    out_ss: *mut c_char,
+) -> c_int {
+    let (sk, ct) = unsafe {
+        (
+            std::slice::from_raw_parts(sk as *const u8, sk_len),
+            std::slice::from_raw_parts(ct as *const u8, ct_len),
+        )
+    };
+    match level {
+        512 => mlkem_decaps_with::<MlKem512>(sk, ct, out_ss),
+        768 => mlkem_decaps_with::<MlKem768>(sk, ct, out_ss),
+        1024 => mlkem_decaps_with::<MlKem1024>(sk, ct, out_ss),
+        _ => -2,
+    }
+}
+
+pub struct LsagRing {
+    compressed: Vec<CompressedRistretto>,
+    points: Vec<RistrettoPoint>,
+    hashes: Vec<RistrettoPoint>,
+}
+
+pub struct LsagPresig {
+    pi: usize,
+    public: CompressedRistretto,
+    x: Scalar,
+    key_image: CompressedRistretto,
+    image: RistrettoPoint,
+    alpha: Scalar,
+    alpha_g: RistrettoPoint,
+    alpha_hp: RistrettoPoint,
+    decoys: Vec<Scalar>,
+}
+
+fn hash_to_point(point: &CompressedRistretto) -> RistrettoPoint {
+    let mut transcript = Transcript::new(b"PCVCS-LSAG-Hp");
+    transcript.append_message(b"P", point.as_bytes());
+    let mut wide = [0u8; 64];
+    transcript.challenge_bytes(b"point", &mut wide);
+    RistrettoPoint::from_uniform_bytes(&wide)
+}
+
+fn read_scalar32(bytes: *const c_char) -> Scalar {
+    let raw = unsafe { std::slice::from_raw_parts(bytes as *const u8, 32) };
+    let mut array = [0u8; 32];
+    array.copy_from_slice(raw);
+    Scalar::from_bytes_mod_order(array)
+}
+
+fn read_canonical_scalar(raw: &[u8]) -> Option<Scalar> {
+    let mut array = [0u8; 32];
+    array.copy_from_slice(raw);
+    Scalar::from_canonical_bytes(array)
+}
+
+fn write_bytes(out: *mut c_char, bytes: &[u8]) {
+    unsafe { std::ptr::copy_nonoverlapping(bytes.as_ptr() as *const c_char, out, bytes.len()) };
+}
+
+impl LsagRing {
+    fn from_raw(ring: *const *const c_char, n: usize) -> Option<Self> {
+        if ring.is_null() || n == 0 {
+            return None;
+        }
+        let ptrs = unsafe { std::slice::from_raw_parts(ring, n) };
+        let mut compressed = Vec::with_capacity(n);
+        let mut points = Vec::with_capacity(n);
+        let mut hashes = Vec::with_capacity(n);
+        for &ptr in ptrs {
+            let c = read_commitment(ptr);
+            points.push(c.decompress()?);
+            hashes.push(hash_to_point(&c));
+            compressed.push(c);
+        }
+        Some(LsagRing { compressed, points, hashes })
+    }
+
+    fn transcript(&self, msg: &[u8], ctx: &[u8], key_image: &CompressedRistretto) -> Transcript {
+        let mut transcript = Transcript::new(b"PCVCS-LSAG");
+        transcript.append_message(b"ctx", ctx);
+        transcript.append_message(b"msg", msg);
+        for p in &self.compressed {
+            transcript.append_message(b"P", p.as_bytes());
+        }
+        transcript.append_message(b"I", key_image.as_bytes());
+        transcript
+    }
+
+    fn presign(&self, x: &Scalar) -> Option<LsagPresig> {
+        let n = self.points.len();
+        let public = (&RISTRETTO_BASEPOINT_TABLE * x).compress();
+        let pi = self.compressed.iter().position(|p| *p == public)?;
+        let image = x * self.hashes[pi];
+
+        let mut rng = thread_rng();
+        let alpha = Scalar::random(&mut rng);
+        Some(LsagPresig {
+            pi,
+            public,
+            x: *x,
+            key_image: image.compress(),
+            image,
+            alpha,
+            alpha_g: &RISTRETTO_BASEPOINT_TABLE * &alpha,
+            alpha_hp: alpha * self.hashes[pi],
+            decoys: (0..n).map(|_| Scalar::random(&mut rng)).collect(),
+        })
+    }
+
+    fn sign_presigned(&self, msg: &[u8], ctx: &[u8], pre: &LsagPresig) -> Option<(Vec<u8>, CompressedRistretto)> {
+        let n = self.points.len();
+        let pi = pre.pi;
+        if pi >= n || self.compressed[pi] != pre.public || pre.decoys.len() != n {
+            return None;
+        }
+        let base = self.transcript(msg, ctx, &pre.key_image);
+
+        let mut c = vec![Scalar::zero(); n];
+        let mut s = pre.decoys.clone();
+        let mut next = (pi + 1) % n;
+        c[next] = lsag_challenge(&base, &pre.alpha_g, &pre.alpha_hp);
+        while next != pi {
+            let i = next;
+            let l = RistrettoPoint::vartime_double_scalar_mul_basepoint(&c[i], &self.points[i], &s[i]);
+            let r = RistrettoPoint::vartime_multiscalar_mul(&[s[i], c[i]], &[self.hashes[i], pre.image]);
+            next = (i + 1) % n;
+            c[next] = lsag_challenge(&base, &l, &r);
+        }
+        s[pi] = pre.alpha - c[pi] * pre.x;
+
+        let mut sig = Vec::with_capacity(32 * (n + 1));
+        sig.extend_from_slice(c[0].as_bytes());
+        for si in &s {
+            sig.extend_from_slice(si.as_bytes());
+        }
+        Some((sig, pre.key_image))
+    }
+
+    fn sign(&self, msg: &[u8], ctx: &[u8], x: &Scalar) -> Option<(Vec<u8>, CompressedRistretto)> {
+        self.sign_presigned(msg, ctx, &self.presign(x)?)
+    }
+
+    fn verify(&self, msg: &[u8], ctx: &[u8], sig: &[u8], key_image: &CompressedRistretto) -> bool {
+        let n = self.points.len();
+        if sig.len() != 32 * (n + 1) {
+            return false;
+        }
+        let image = match key_image.decompress() {
+            Some(point) if point != RistrettoPoint::identity() => point,
+            _ => return false,
+        };
+        let c0 = match read_canonical_scalar(&sig[..32]) {
+            Some(c0) => c0,
+            None => return false,
+        };
+        let base = self.transcript(msg, ctx, key_image);
+        let mut c = c0;
+        for i in 0..n {
+            let s_i = match read_canonical_scalar(&sig[32 * (i + 1)..32 * (i + 2)]) {
+                Some(s_i) => s_i,
+                None => return false,
+            };
+            let l = RistrettoPoint::vartime_double_scalar_mul_basepoint(&c, &self.points[i], &s_i);
+            let r = RistrettoPoint::vartime_multiscalar_mul(&[s_i, c], &[self.hashes[i], image]);
+            c = lsag_challenge(&base, &l, &r);
+        }
+        c == c0
+    }
+}
+
+fn lsag_challenge(base: &Transcript, l: &RistrettoPoint, r: &RistrettoPoint) -> Scalar {
+    let mut transcript = base.clone();
+    transcript.append_message(b"L", l.compress().as_bytes());
+    transcript.append_message(b"R", r.compress().as_bytes());
+    let mut wide = [0u8; 64];
+    transcript.challenge_bytes(b"c", &mut wide);
+    Scalar::from_bytes_mod_order_wide(&wide)
+}
+
+fn lsag_verify_with(
+    ring: &LsagRing,
+    msg: *const c_char,
+    msg_len: usize,
+    sig: *const c_char,
+    ctx: *const c_char,
+    ctx_len: usize,
+    keyimage: *const c_char,
+) -> c_int {
+    let (msg, ctx, sig) = unsafe {
+        (
+            std::slice::from_raw_parts(msg as *const u8, msg_len),
+            std::slice::from_raw_parts(ctx as *const u8, ctx_len),
+            std::slice::from_raw_parts(sig as *const u8, 32 * (ring.points.len() + 1)),
+        )
+    };
+    if ring.verify(msg, ctx, sig, &read_commitment(keyimage)) { 0 } else { 1 }
+}
+
+#[no_mangle]
+pub extern "C" fn lsag_public_key(sk: *const c_char, out_pk: *mut c_char) -> c_int {
+    let x = read_scalar32(sk);
+    write_bytes(out_pk, (&RISTRETTO_BASEPOINT_TABLE * &x).compress().as_bytes());
+    0
+}
+
+#[no_mangle]
+pub extern "C" fn lsag_key_image(sk: *const c_char, out_keyimage: *mut c_char) -> c_int {
+    let x = read_scalar32(sk);
+    let public = (&RISTRETTO_BASEPOINT_TABLE * &x).compress();
+    write_bytes(out_keyimage, (x * hash_to_point(&public)).compress().as_bytes());
+    0
+}
+
+#[no_mangle]
+pub extern "C" fn lsag_sign(
+    msg: *const c_char,
+    msg_len: usize,
+    ring: *const *const c_char,
+    n: usize,
+    sk: *const c_char,
+    ctx: *const c_char,
+    ctx_len: usize,
+    out_sig: *mut c_char,
+    out_sig_len: *mut usize,
+    out_keyimage: *mut c_char,
+) -> c_int {
+    let ring = match LsagRing::from_raw(ring, n) {
+        Some(ring) => ring,
+        None => return 2,
+    };
+    let (msg, ctx) = unsafe {
+        (
+            std::slice::from_raw_parts(msg as *const u8, msg_len),
+            std::slice::from_raw_parts(ctx as *const u8, ctx_len),
+        )
+    };
+    match ring.sign(msg, ctx, &read_scalar32(sk)) {
+        Some((sig, key_image)) => {
+            write_bytes(out_sig, &sig);
+            write_bytes(out_keyimage, key_image.as_bytes());
+            unsafe { *out_sig_len = sig.len() };
+            0
+        }
+        None => 3,
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn lsag_verify(
+    msg: *const c_char,
+    msg_len: usize,
+    ring: *const *const c_char,
+    n: usize,
+    sig: *const c_char,
+    ctx: *const c_char,
+    ctx_len: usize,
+    keyimage: *const c_char,
+) -> c_int {
+    match LsagRing::from_raw(ring, n) {
+        Some(ring) => lsag_verify_with(&ring, msg, msg_len, sig, ctx, ctx_len, keyimage),
+        None => 2,
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn lsag_ring_prepare(ring: *const *const c_char, n: usize) -> *mut LsagRing {
+    match LsagRing::from_raw(ring, n) {
+        Some(ring) => Box::into_raw(Box::new(ring)),
+        None => std::ptr::null_mut(),
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn lsag_ring_free(ring: *mut LsagRing) {
+    if !ring.is_null() {
+        unsafe { drop(Box::from_raw(ring)) };
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn lsag_verify_prepared(
+    ring: *const LsagRing,
+    msg: *const c_char,
+    msg_len: usize,
+    sig: *const c_char,
+    ctx: *const c_char,
+    ctx_len: usize,
+    keyimage: *const c_char,
+) -> c_int {
+    match unsafe { ring.as_ref() } {
+        Some(ring) => lsag_verify_with(ring, msg, msg_len, sig, ctx, ctx_len, keyimage),
+        None => -1,
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn lsag_presign(ring: *const LsagRing, sk: *const c_char) -> *mut LsagPresig {
+    let ring = match unsafe { ring.as_ref() } {
+        Some(ring) => ring,
+        None => return std::ptr::null_mut(),
+    };
+    match ring.presign(&read_scalar32(sk)) {
+        Some(pre) => Box::into_raw(Box::new(pre)),
+        None => std::ptr::null_mut(),
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn lsag_presig_free(pre: *mut LsagPresig) {
+    if !pre.is_null() {
+        unsafe { drop(Box::from_raw(pre)) };
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn lsag_sign_presigned(
+    ring: *const LsagRing,
+    pre: *mut LsagPresig,
+    msg: *const c_char,
+    msg_len: usize,
+    ctx: *const c_char,
+    ctx_len: usize,
+    out_sig: *mut c_char,
+    out_sig_len: *mut usize,
+    out_keyimage: *mut c_char,
+) -> c_int {
+    if pre.is_null() {
+        return -1;
+    }
+    let pre = unsafe { Box::from_raw(pre) };
+    let ring = match unsafe { ring.as_ref() } {
+        Some(ring) => ring,
+        None => return -1,
+    };
+    let (msg, ctx) = unsafe {
+        (
+            std::slice::from_raw_parts(msg as *const u8, msg_len),
+            std::slice::from_raw_parts(ctx as *const u8, ctx_len),
+        )
+    };
+    match ring.sign_presigned(msg, ctx, &pre) {
+        Some((sig, key_image)) => {
+            write_bytes(out_sig, &sig);
+            write_bytes(out_keyimage, key_image.as_bytes());
+            unsafe { *out_sig_len = sig.len() };
+            0
+        }
+        None => 3,
+    }
+}
+
+const GK_LABELS: [&[u8]; 5] = [b"cl", b"ca", b"cb", b"cd", b"ce"];
+
+pub struct GkRing {
+    compressed: Vec<CompressedRistretto>,
+    points: Vec<RistrettoPoint>,
+    bits: usize,
+}
+
+fn gk_generator(label: &'static [u8], data: &[u8]) -> RistrettoPoint {
+    let mut transcript = Transcript::new(b"PCVCS-GK-Generator");
+    transcript.append_message(label, data);
+    let mut wide = [0u8; 64];
+    transcript.challenge_bytes(b"point", &mut wide);
+    RistrettoPoint::from_uniform_bytes(&wide)
+}
+
+fn gk_bits(n: usize) -> usize {
+    let mut bits = 1;
+    while (1usize << bits) < n {
+        bits += 1;
+    }
+    bits
+}
+
+fn gk_sig_len(n: usize) -> usize {
+    32 * (8 * gk_bits(n) + 1)
+}
+
+fn gk_commit(h: &RistrettoPoint, value: &Scalar, blinding: &Scalar) -> RistrettoPoint {
+    value * h + &RISTRETTO_BASEPOINT_TABLE * blinding
+}
+
+fn gk_challenge(transcript: &mut Transcript) -> Scalar {
+    let mut wide = [0u8; 64];
+    transcript.challenge_bytes(b"x", &mut wide);
+    Scalar::from_bytes_mod_order_wide(&wide)
+}
+
+fn gk_ring_polynomials(factors: &[[(Scalar, Scalar); 2]]) -> Vec<Vec<Scalar>> {
+    let mut polys = vec![vec![Scalar::one()]];
+    for factor in factors.iter().rev() {
+        let mut next = Vec::with_capacity(polys.len() * 2);
+        for poly in &polys {
+            for &(c0, c1) in factor.iter() {
+                let mut out = vec![Scalar::zero(); poly.len() + 1];
+                for (k, coef) in poly.iter().enumerate() {
+                    out[k] += coef * c0;
+                    out[k + 1] += coef * c1;
+                }
+                next.push(out);
+            }
+        }
+        polys = next;
+    }
+    polys
+}
+
+fn gk_ring_weights(x: &Scalar, f: &[Scalar]) -> Vec<Scalar> {
+    let mut weights = vec![Scalar::one()];
+    for fj in f.iter().rev() {
+        let f0 = x - fj;
+        let mut next = Vec::with_capacity(weights.len() * 2);
+        for w in &weights {
+            next.push(w * f0);
+            next.push(w * fj);
+        }
+        weights = next;
+    }
+    weights
+}
+
+fn gk_powers(x: &Scalar, m: usize) -> Vec<Scalar> {
+    let mut powers = Vec::with_capacity(m + 1);
+    let mut acc = Scalar::one();
+    for _ in 0..=m {
+        powers.push(acc);
+        acc *= x;
+    }
+    powers
+}
+
+impl GkRing {
+    fn from_raw(ring: *const *const c_char, n: usize) -> Option<Self> {
+        if ring.is_null() || n == 0 {
+            return None;
+        }
+        let ptrs = unsafe { std::slice::from_raw_parts(ring, n) };
+        let mut compressed = Vec::with_capacity(n);
+        let mut points = Vec::with_capacity(n.next_power_of_two());
+        for &ptr in ptrs {
+            let c = read_commitment(ptr);
+            points.push(c.decompress()?);
+            compressed.push(c);
+        }
+        let bits = gk_bits(n);
+        let last = points[n - 1];
+        points.resize(1usize << bits, last);
+        Some(GkRing { compressed, points, bits })
+    }
+
+    fn transcript(&self, msg: &[u8], ctx: &[u8], key_image: &CompressedRistretto) -> Transcript {
+        let mut transcript = Transcript::new(b"PCVCS-GK");
+        transcript.append_message(b"ctx", ctx);
+        transcript.append_message(b"msg", msg);
+        for p in &self.compressed {
+            transcript.append_message(b"P", p.as_bytes());
+        }
+        transcript.append_message(b"I", key_image.as_bytes());
+        transcript
+    }
+
+    fn sign(&self, msg: &[u8], ctx: &[u8], sk: &Scalar) -> Option<(Vec<u8>, CompressedRistretto)> {
+        let m = self.bits;
+        let public = (&RISTRETTO_BASEPOINT_TABLE * sk).compress();
+        let l = self.compressed.iter().position(|p| *p == public)?;
+        let h = gk_generator(b"H", b"");
+        let u = gk_generator(b"U", ctx);
+        let key_image = (sk * u).compress();
+
+        let mut rng = thread_rng();
+        let mut random = || (0..m).map(|_| Scalar::random(&mut rng)).collect::<Vec<Scalar>>();
+        let (r, a, s, t, rho) = (random(), random(), random(), random(), random());
+        let bits: Vec<Scalar> = (0..m).map(|j| Scalar::from(((l >> j) & 1) as u64)).collect();
+        let factors: Vec<[(Scalar, Scalar); 2]> = (0..m)
+            .map(|j| [(-a[j], Scalar::one() - bits[j]), (a[j], bits[j])])
+            .collect();
+        let polys = gk_ring_polynomials(&factors);
+
+        let mut transcript = self.transcript(msg, ctx, &key_image);
+        let mut commitments = Vec::with_capacity(5 * m);
+        for j in 0..m {
+            let cd = RistrettoPoint::multiscalar_mul(polys.iter().map(|p| p[j]), &self.points)
+                + &RISTRETTO_BASEPOINT_TABLE * &rho[j];
+            let row = [
+                gk_commit(&h, &bits[j], &r[j]).compress(),
+                gk_commit(&h, &a[j], &s[j]).compress(),
+                gk_commit(&h, &(bits[j] * a[j]), &t[j]).compress(),
+                cd.compress(),
+                (rho[j] * u).compress(),
+            ];
+            for (&label, c) in GK_LABELS.iter().zip(row.iter()) {
+                transcript.append_message(label, c.as_bytes());
+            }
+            commitments.push(row);
+        }
+        let x = gk_challenge(&mut transcript);
+        let powers = gk_powers(&x, m);
+
+        let mut sig = Vec::with_capacity(gk_sig_len(self.compressed.len()));
+        let mut zd = sk * powers[m];
+        for j in 0..m {
+            let f = bits[j] * x + a[j];
+            let za = r[j] * x + s[j];
+            let zb = r[j] * (x - f) + t[j];
+            zd -= rho[j] * powers[j];
+            for c in &commitments[j] {
+                sig.extend_from_slice(c.as_bytes());
+            }
+            sig.extend_from_slice(f.as_bytes());
+            sig.extend_from_slice(za.as_bytes());
+            sig.extend_from_slice(zb.as_bytes());
+        }
+        sig.extend_from_slice(zd.as_bytes());
+        Some((sig, key_image))
+    }
+
+    fn verify(&self, msg: &[u8], ctx: &[u8], sig: &[u8], key_image: &CompressedRistretto) -> bool {
+        if sig.len() != gk_sig_len(self.compressed.len()) {
+            return false;
+        }
+        self.check(msg, ctx, sig, key_image).unwrap_or(false)
+    }
+
+    fn check(&self, msg: &[u8], ctx: &[u8], sig: &[u8], key_image: &CompressedRistretto) -> Option<bool> {
+        let m = self.bits;
+        let image = key_image.decompress()?;
+        if image.is_identity() {
+            return Some(false);
+        }
+        let mut transcript = self.transcript(msg, ctx, key_image);
+        let mut commitments = Vec::with_capacity(5 * m);
+        let mut responses = Vec::with_capacity(3 * m);
+        for j in 0..m {
+            let row = &sig[256 * j..256 * (j + 1)];
+            for (q, &label) in GK_LABELS.iter().enumerate() {
+                let c = CompressedRistretto::from_slice(&row[32 * q..32 * (q + 1)]);
+                transcript.append_message(label, c.as_bytes());
+                commitments.push(c.decompress()?);
+            }
+            for q in 5..8 {
+                responses.push(read_canonical_scalar(&row[32 * q..32 * (q + 1)])?);
+            }
+        }
+        let zd = read_canonical_scalar(&sig[256 * m..])?;
+        let x = gk_challenge(&mut transcript);
+        let powers = gk_powers(&x, m);
+        let f: Vec<Scalar> = (0..m).map(|j| responses[3 * j]).collect();
+        let weights = gk_ring_weights(&x, &f);
+
+        let mut rng = thread_rng();
+        let wd = Scalar::random(&mut rng);
+        let mut g_coef = -zd;
+        let mut h_coef = Scalar::zero();
+        let mut scalars = Vec::with_capacity(self.points.len() + 5 * m + 4);
+        for j in 0..m {
+            let (fj, za, zb) = (responses[3 * j], responses[3 * j + 1], responses[3 * j + 2]);
+            let wa = Scalar::random(&mut rng);
+            let wb = Scalar::random(&mut rng);
+            scalars.push(wa * x + wb * (x - fj));
+            scalars.push(wa);
+            scalars.push(wb);
+            scalars.push(-powers[j]);
+            scalars.push(-(wd * powers[j]));
+            h_coef -= wa * fj;
+            g_coef -= wa * za + wb * zb;
+        }
+        scalars.extend(weights);
+        scalars.push(wd * powers[m]);
+        scalars.push(-(wd * zd));
+        scalars.push(g_coef);
+        scalars.push(h_coef);
+
+        let mut points = commitments;
+        points.extend_from_slice(&self.points);
+        points.push(image);
+        points.push(gk_generator(b"U", ctx));
+        points.push(RISTRETTO_BASEPOINT_POINT);
+        points.push(gk_generator(b"H", b""));
+        Some(RistrettoPoint::vartime_multiscalar_mul(&scalars, &points).is_identity())
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn gk_key_image(sk: *const c_char, ctx: *const c_char, ctx_len: usize, out_keyimage: *mut c_char) -> c_int {
+    let ctx = unsafe { std::slice::from_raw_parts(ctx as *const u8, ctx_len) };
+    let x = read_scalar32(sk);
+    write_bytes(out_keyimage, (x * gk_generator(b"U", ctx)).compress().as_bytes());
+    0
+}
+
+#[no_mangle]
+pub extern "C" fn gk_sign(
+    msg: *const c_char,
+    msg_len: usize,
+    ring: *const *const c_char,
+    n: usize,
+    sk: *const c_char,
+    ctx: *const c_char,
+    ctx_len: usize,
+    out_sig: *mut c_char,
+    out_sig_len: *mut usize,
+    out_keyimage: *mut c_char,
+) -> c_int {
+    let ring = match GkRing::from_raw(ring, n) {
+        Some(ring) => ring,
+        None => return 2,
+    };
+    let (msg, ctx) = unsafe {
+        (
+            std::slice::from_raw_parts(msg as *const u8, msg_len),
+            std::slice::from_raw_parts(ctx as *const u8, ctx_len),
+        )
+    };
+    match ring.sign(msg, ctx, &read_scalar32(sk)) {
+        Some((sig, key_image)) => {
+            write_bytes(out_sig, &sig);
+            write_bytes(out_keyimage, key_image.as_bytes());
+            unsafe { *out_sig_len = sig.len() };
+            0
+        }
+        None => 3,
+    }
+}
+
+#[no_mangle]
+pub extern "C" fn gk_verify(
+    msg: *const c_char,
+    msg_len: usize,
+    ring: *const *const c_char,
+    n: usize,
+    sig: *const c_char,
+    ctx: *const c_char,
+    ctx_len: usize,
+    keyimage: *const c_char,
+) -> c_int {
+    let ring = match GkRing::from_raw(ring, n) {
+        Some(ring) => ring,
+        None => return 2,
+    };
+    let (msg, ctx, sig) = unsafe {
+        (
+            std::slice::from_raw_parts(msg as *const u8, msg_len),
+            std::slice::from_raw_parts(ctx as *const u8, ctx_len),
+            std::slice::from_raw_parts(sig as *const u8, gk_sig_len(n)),
+        )
+    };
+    if ring.verify(msg, ctx, sig, &read_commitment(keyimage)) { 0 } else { 1 }
+}
+
+#[no_mangle]
+pub extern "C" fn ed25519_verify_batch(
+    n: usize,
+    pks: *const c_char,
+    msgs: *const *const c_char,
+    msg_lens: *const usize,
+    sigs: *const c_char,
+    out_results: *mut u8,
+) -> c_int {
+    if n == 0 {
+        return 0;
+    }
+    let (pks, msg_ptrs, msg_lens, sigs, results) = unsafe {
+        (
+            std::slice::from_raw_parts(pks as *const u8, 32 * n),
+            std::slice::from_raw_parts(msgs, n),
+            std::slice::from_raw_parts(msg_lens, n),
+            std::slice::from_raw_parts(sigs as *const u8, 64 * n),
+            std::slice::from_raw_parts_mut(out_results, n),
+        )
+    };
+    let mut indices = Vec::with_capacity(n);
+    let mut messages: Vec<&[u8]> = Vec::with_capacity(n);
+    let mut signatures = Vec::with_capacity(n);
+    let mut keys = Vec::with_capacity(n);
+    for i in 0..n {
+        results[i] = 0;
+        let mut pk = [0u8; 32];
+        pk.copy_from_slice(&pks[32 * i..32 * (i + 1)]);
+        let mut sig = [0u8; 64];
+        sig.copy_from_slice(&sigs[64 * i..64 * (i + 1)]);
+        if let Ok(key) = VerifyingKey::from_bytes(&pk) {
+            indices.push(i);
+            messages.push(unsafe { std::slice::from_raw_parts(msg_ptrs[i] as *const u8, msg_lens[i]) });
+            signatures.push(Signature::from_bytes(&sig));
+            keys.push(key);
+        }
+    }
+    if indices.len() == n && ed25519_dalek::verify_batch(&messages, &signatures, &keys).is_ok() {
+        results.iter_mut().for_each(|r| *r = 1);
+        return 0;
+    }
+    for (j, &i) in indices.iter().enumerate() {
+        results[i] = keys[j].verify(messages[j], &signatures[j]).is_ok() as u8;
+    }
+    if results.iter().all(|&r| r == 1) { 0 } else { 1 }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    fn prove(value: u64, l: u64, u: u64, blinding: u64) -> (CompressedRistretto, Vec<u8>) {
+        let mut commit = [0u8; 32];
+        let mut proof = vec![0u8; 1024];
+        let mut len = 0usize;
+        let rc = range_proof_prove_with(
+            default_context(),
+            value,
+            l,
+            u,
+            blinding,
+            commit.as_mut_ptr() as *mut c_char,
+            proof.as_mut_ptr() as *mut c_char,
+            &mut len,
+        );
+        assert_eq!(rc, 0);
+        proof.truncate(len);
+        (CompressedRistretto(commit), proof)
+    }
+
+    fn verify_batch(items: &[(u64, u64, CompressedRistretto, Vec<u8>)]) -> Vec<u8> {
+        let ls: Vec<u64> = items.iter().map(|i| i.0).collect();
+        let us: Vec<u64> = items.iter().map(|i| i.1).collect();
+        let commits: Vec<u8> = items.iter().flat_map(|i| i.2.to_bytes()).collect();
+        let ptrs: Vec<*const c_char> = items.iter().map(|i| i.3.as_ptr() as *const c_char).collect();
+        let lens: Vec<usize> = items.iter().map(|i| i.3.len()).collect();
+        let mut results = vec![0u8; items.len()];
+        range_proof_verify_batch_with(
+            default_context(),
+            items.len(),
+            ls.as_ptr(),
+            us.as_ptr(),
+            commits.as_ptr() as *const c_char,
+            ptrs.as_ptr(),
+            lens.as_ptr(),
+            results.as_mut_ptr(),
+        );
+        results
+    }
+
+    #[test]
+    fn bit_width_covers_span() {
+        assert_eq!(bit_width_for(0, 255), Some(8));
+        assert_eq!(bit_width_for(10, 266), Some(16));
+        assert_eq!(bit_width_for(0, u64::MAX), Some(64));
+        assert_eq!(bit_width_for(5, 4), None);
+    }
+
+    #[test]
+    fn in_range_proof_verifies() {
+        let (commit, proof) = prove(42, 10, 100, 7);
+        assert_eq!(proof[0] as usize, 8);
+        assert!(range_proof_verify_with(default_context(), 10, 100, &commit, &proof));
+        assert_eq!(verify_batch(&[(10, 100, commit, proof)]), vec![1]);
+    }
+
+    #[test]
+    fn out_of_range_is_rejected() {
+        let ctx = default_context();
+        let mut commit = [0u8; 32];
+        let mut proof = vec![0u8; 1024];
+        let mut len = 0usize;
+        let rc = range_proof_prove_with(
+            ctx,
+            5,
+            10,
+            100,
+            7,
+            commit.as_mut_ptr() as *mut c_char,
+            proof.as_mut_ptr() as *mut c_char,
+            &mut len,
+        );
+        assert_eq!(rc, 2);
+
+        let (commit, proof) = prove(42, 10, 100, 7);
+        assert!(!range_proof_verify_with(ctx, 50, 100, &commit, &proof));
+        assert!(!range_proof_verify_with(ctx, 10, 40, &commit, &proof));
+        assert_eq!(verify_batch(&[(50, 100, commit, proof.clone()), (10, 40, commit, proof)]), vec![0, 0]);
+    }
+
+    #[test]
+    fn width_byte_must_match_bounds() {
+        let ctx = default_context();
+        let (commit, proof) = prove(42, 0, 100, 7);
+        assert!(!range_proof_verify_with(ctx, 0, 1000, &commit, &proof));
+        let mut forged = proof.clone();
+        forged[0] = 16;
+        assert!(!range_proof_verify_with(ctx, 0, 100, &commit, &forged));
+        assert_eq!(verify_batch(&[(0, 100, commit, forged)]), vec![0]);
+    }
+
+    #[test]
+    fn legacy_unbounded_proof_is_rejected() {
+        let ctx = default_context();
+        let mut transcript = Transcript::new(b"RangeProof");
+        let (proof, commit) = RangeProof::prove_single(
+            &ctx.bp_gens,
+            &ctx.pc_gens,
+            &mut transcript,
+            1_000_000,
+            &Scalar::from(7u64),
+            64,
+        )
+        .unwrap();
+        let legacy = proof.to_bytes();
+        assert_eq!(legacy.len() % 32, 0);
+        assert!(!range_proof_verify_with(ctx, 0, 100, &commit, &legacy));
+        assert!(!range_proof_verify_with(ctx, 0, u64::MAX, &commit, &legacy));
+        assert_eq!(verify_batch(&[(0, u64::MAX, commit, legacy)]), vec![0]);
+    }
+
+    #[test]
+    fn aggregate_rejects_mismatched_width() {
+        let ctx = &BpContext::new(64, 4);
+        let (ls, us) = ([0u64, 0], [100u64, 60_000]);
+        let mut commits = [0u8; 64];
+        let mut proof = vec![0u8; 1024];
+        let mut len = 0usize;
+        let rc = range_proof_prove_multiple_with(
+            ctx,
+            &[42, 50_000],
+            &ls,
+            &us,
+            &[1, 2],
+            commits.as_mut_ptr() as *mut c_char,
+            proof.as_mut_ptr() as *mut c_char,
+            &mut len,
+        );
+        assert_eq!(rc, 0);
+        proof.truncate(len);
+        assert_eq!(proof[0] as usize, 16);
+        let commitments: Vec<CompressedRistretto> =
+            (0..2).map(|i| read_commitment(commits[i * 32..].as_ptr() as *const c_char)).collect();
+        assert!(range_proof_verify_multiple_with(ctx, &ls, &us, &commitments, &proof));
+        assert!(!range_proof_verify_multiple_with(ctx, &ls, &[100, 100], &commitments, &proof));
+        assert!(!range_proof_verify_multiple_with(ctx, &ls[..1], &us[..1], &commitments, &proof));
+    }
+
+    fn ring_keys(n: usize) -> (Vec<Scalar>, Vec<CompressedRistretto>) {
+        let mut rng = thread_rng();
+        let sks: Vec<Scalar> = (0..n).map(|_| Scalar::random(&mut rng)).collect();
+        let pks = sks.iter().map(|x| (&RISTRETTO_BASEPOINT_TABLE * x).compress()).collect();
+        (sks, pks)
+    }
+
+    fn ring_ptrs(pks: &[CompressedRistretto]) -> Vec<*const c_char> {
+        pks.iter().map(|p| p.as_bytes().as_ptr() as *const c_char).collect()
+    }
+
+    #[test]
+    fn lsag_sign_verify_round_trip() {
+        let (sks, pks) = ring_keys(5);
+        let ring = LsagRing::from_raw(ring_ptrs(&pks).as_ptr(), pks.len()).unwrap();
+        let (sig, image) = ring.sign(b"report", b"task-1", &sks[2]).unwrap();
+        assert_eq!(sig.len(), 32 * 6);
+        assert!(ring.verify(b"report", b"task-1", &sig, &image));
+
+        assert!(!ring.verify(b"other", b"task-1", &sig, &image));
+        assert!(!ring.verify(b"report", b"task-2", &sig, &image));
+        let mut tampered = sig.clone();
+        tampered[40] ^= 1;
+        assert!(!ring.verify(b"report", b"task-1", &tampered, &image));
+        assert!(!ring.verify(b"report", b"task-1", &sig[..32 * 5], &image));
+        let (_, other_image) = ring.sign(b"report", b"task-1", &sks[3]).unwrap();
+        assert!(!ring.verify(b"report", b"task-1", &sig, &other_image));
+        assert!(!ring.verify(b"report", b"task-1", &sig, &CompressedRistretto::identity()));
+    }
+
+    #[test]
+    fn lsag_key_image_links_signer() {
+        let (sks, pks) = ring_keys(4);
+        let ring = LsagRing::from_raw(ring_ptrs(&pks).as_ptr(), pks.len()).unwrap();
+        let (_, first) = ring.sign(b"a", b"ctx", &sks[1]).unwrap();
+        let (_, second) = ring.sign(b"b", b"ctx", &sks[1]).unwrap();
+        let (_, other) = ring.sign(b"a", b"ctx", &sks[0]).unwrap();
+        assert_eq!(first, second);
+        assert_ne!(first, other);
+
+        let mut image = [0u8; 32];
+        lsag_key_image(sks[1].as_bytes().as_ptr() as *const c_char, image.as_mut_ptr() as *mut c_char);
+        assert_eq!(image, first.to_bytes());
+    }
+
+    #[test]
+    fn lsag_presigned_matches_online() {
+        let (sks, pks) = ring_keys(4);
+        let ring = LsagRing::from_raw(ring_ptrs(&pks).as_ptr(), pks.len()).unwrap();
+        let pre = ring.presign(&sks[3]).unwrap();
+        let (sig, image) = ring.sign_presigned(b"msg", b"ctx", &pre).unwrap();
+        assert!(ring.verify(b"msg", b"ctx", &sig, &image));
+        assert_eq!(image, ring.sign(b"msg", b"ctx", &sks[3]).unwrap().1);
+
+        let (outsider, _) = ring_keys(1);
+        assert!(ring.presign(&outsider[0]).is_none());
+        assert!(ring.sign(b"msg", b"ctx", &outsider[0]).is_none());
+        let (_, other_pks) = ring_keys(4);
+        let other = LsagRing::from_raw(ring_ptrs(&other_pks).as_ptr(), other_pks.len()).unwrap();
+        assert!(other.sign_presigned(b"msg", b"ctx", &pre).is_none());
+    }
+
+    #[test]
+    fn gk_sign_verify_round_trip() {
+        for n in [1usize, 3, 4, 7] {
+            let (sks, pks) = ring_keys(n);
+            let ring = GkRing::from_raw(ring_ptrs(&pks).as_ptr(), n).unwrap();
+            let signer = n / 2;
+            let (sig, image) = ring.sign(b"report", b"task-1", &sks[signer]).unwrap();
+            assert_eq!(sig.len(), gk_sig_len(n));
+            assert!(ring.verify(b"report", b"task-1", &sig, &image));
+            assert!(!ring.verify(b"other", b"task-1", &sig, &image));
+            assert!(!ring.verify(b"report", b"task-2", &sig, &image));
+            let mut tampered = sig.clone();
+            let last = tampered.len() - 1;
+            tampered[last - 5] ^= 1;
+            assert!(!ring.verify(b"report", b"task-1", &tampered, &image));
+            assert!(!ring.verify(b"report", b"task-1", &sig[..sig.len() - 32], &image));
+        }
+    }
+
+    #[test]
+    fn gk_key_image_is_per_context() {
+        let (sks, pks) = ring_keys(4);
+        let ring = GkRing::from_raw(ring_ptrs(&pks).as_ptr(), 4).unwrap();
+        let (_, a) = ring.sign(b"m1", b"task-1", &sks[0]).unwrap();
+        let (_, b) = ring.sign(b"m2", b"task-1", &sks[0]).unwrap();
+        let (_, c) = ring.sign(b"m1", b"task-2", &sks[0]).unwrap();
+        let (sig, d) = ring.sign(b"m1", b"task-1", &sks[1]).unwrap();
+        assert_eq!(a, b);
+        assert_ne!(a, c);
+        assert_ne!(a, d);
+        assert!(!ring.verify(b"m1", b"task-1", &sig, &a));
+        let (outsider, _) = ring_keys(1);
+        assert!(ring.sign(b"m1", b"task-1", &outsider[0]).is_none());
+
+        let mut image = [0u8; 32];
+        let ctx = b"task-1";
+        gk_key_image(
+            sks[0].as_bytes().as_ptr() as *const c_char,
+            ctx.as_ptr() as *const c_char,
+            ctx.len(),
+            image.as_mut_ptr() as *mut c_char,
+        );
+        assert_eq!(image, a.to_bytes());
+    }
+
+    #[test]
+    fn mlkem_round_trip_each_level() {
+        for level in [512u32, 768, 1024] {
+            let (mut pk_len, mut sk_len, mut ct_len) = (0usize, 0usize, 0usize);
+            assert_eq!(mlkem_sizes(level, &mut pk_len, &mut sk_len, &mut ct_len), 0);
+            let mut pk = vec![0u8; pk_len];
+            let mut sk = vec![0u8; sk_len];
+            let mut ct = vec![0u8; ct_len];
+            let (mut ss_enc, mut ss_dec) = ([0u8; 32], [0u8; 32]);
+            assert_eq!(mlkem_keygen(level, pk.as_mut_ptr() as *mut c_char, sk.as_mut_ptr() as *mut c_char), 0);
+            assert_eq!(
+                mlkem_encaps(
+                    level,
+                    pk.as_ptr() as *const c_char,
+                    pk_len,
+                    ct.as_mut_ptr() as *mut c_char,
+                    ss_enc.as_mut_ptr() as *mut c_char,
+                ),
+                0
+            );
+            assert_eq!(
+                mlkem_decaps(
+                    level,
+                    sk.as_ptr() as *const c_char,
+                    sk_len,
+                    ct.as_ptr() as *const c_char,
+                    ct_len,
+                    ss_dec.as_mut_ptr() as *mut c_char,
+                ),
+                0
+            );
+            assert_eq!(ss_enc, ss_dec);
+
+            ct[0] ^= 1;
+            let mut ss_bad = [0u8; 32];
+            mlkem_decaps(
+                level,
+                sk.as_ptr() as *const c_char,
+                sk_len,
+                ct.as_ptr() as *const c_char,
+                ct_len,
+                ss_bad.as_mut_ptr() as *mut c_char,
+            );
+            assert_ne!(ss_bad, ss_enc);
+
+            let rc = mlkem_encaps(
+                level,
+                pk.as_ptr() as *const c_char,
+                pk_len - 1,
+                ct.as_mut_ptr() as *mut c_char,
+                ss_enc.as_mut_ptr() as *mut c_char,
+            );
+            assert_eq!(rc, 2);
+            let rc = mlkem_decaps(
+                level,
+                sk.as_ptr() as *const c_char,
+                sk_len,
+                ct.as_ptr() as *const c_char,
+                ct_len - 1,
+                ss_dec.as_mut_ptr() as *mut c_char,
+            );
+            assert_eq!(rc, 2);
+        }
+        let (mut pk_len, mut sk_len, mut ct_len) = (0usize, 0usize, 0usize);
+        assert_eq!(mlkem_sizes(256, &mut pk_len, &mut sk_len, &mut ct_len), -2);
+    }
+
+    fn ed25519_batch(items: &[([u8; 32], Vec<u8>, [u8; 64])]) -> (c_int, Vec<u8>) {
+        let pks: Vec<u8> = items.iter().flat_map(|i| i.0).collect();
+        let msgs: Vec<*const c_char> = items.iter().map(|i| i.1.as_ptr() as *const c_char).collect();
+        let lens: Vec<usize> = items.iter().map(|i| i.1.len()).collect();
+        let sigs: Vec<u8> = items.iter().flat_map(|i| i.2).collect();
+        let mut results = vec![0u8; items.len()];
+        let rc = ed25519_verify_batch(
+            items.len(),
+            pks.as_ptr() as *const c_char,
+            msgs.as_ptr(),
+            lens.as_ptr(),
+            sigs.as_ptr() as *const c_char,
+            results.as_mut_ptr(),
+        );
+        (rc, results)
+    }
+
+    #[test]
+    fn ed25519_batch_matches_single() {
+        use ed25519_dalek::{Signer, SigningKey};
+        let items: Vec<([u8; 32], Vec<u8>, [u8; 64])> = (0..5u8)
+            .map(|i| {
+                let key = SigningKey::from_bytes(&[i + 1; 32]);
+                let msg = vec![i; 10 + i as usize];
+                (key.verifying_key().to_bytes(), msg.clone(), key.sign(&msg).to_bytes())
+            })
+            .collect();
+        assert_eq!(ed25519_batch(&items), (0, vec![1; 5]));
+
+        let mut bad = items.clone();
+        bad[2].2[0] ^= 1;
+        bad[4].1.push(0);
+        let (rc, results) = ed25519_batch(&bad);
+        assert_eq!(rc, 1);
+        let single: Vec<u8> = bad
+            .iter()
+            .map(|(pk, msg, sig)| {
+                VerifyingKey::from_bytes(pk).unwrap().verify(msg, &Signature::from_bytes(sig)).is_ok() as u8
+            })
+            .collect();
+        assert_eq!(results, single);
+        assert_eq!(results, vec![1, 1, 0, 1, 0]);
+        assert_eq!(ed25519_batch(&[]), (0, vec![]));
     }
 }
@@ -0,0 +1,133 @@
+import os
+import threading
+import time
+
+from verifier.admission import AdmissionController, VerificationService
+
+
+def _packet(rsu, region="r0", n=0):
+    return {"token": {"region_id": region, "rsu_id": rsu}, "n": n}
+
+
+def test_fair_share_push_out_admits_new_source():
+    ac = AdmissionController(max_queue_depth=4, max_wait_s=10.0)
+    dropped = []
+    for i in range(4):
+        assert ac.submit(_packet("a", n=i), on_result=lambda p, r: dropped.append((p["n"], r))).accepted
+    decision = ac.submit(_packet("b"))
+    assert decision.accepted
+    assert dropped == [(3, (False, "ERR_FAIR_SHARE"))]
+    assert ac.queue_depths() == {("r0", "a"): 3, ("r0", "b"): 1}
+    assert ac.depth == 4
+
+
+def test_source_over_share_is_shed_before_global_check():
+    ac = AdmissionController(max_queue_depth=4, max_wait_s=10.0)
+    ac.submit(_packet("a"))
+    ac.submit(_packet("a"))
+    ac.submit(_packet("b"))
+    decision = ac.submit(_packet("a"))
+    assert not decision.accepted and decision.reason == "ERR_FAIR_SHARE"
+    assert ac.depth == 3
+
+
+def test_overloaded_when_all_sources_at_share():
+    ac = AdmissionController(max_queue_depth=2, max_wait_s=10.0)
+    assert ac.submit(_packet("a")).accepted
+    assert ac.submit(_packet("b")).accepted
+    decision = ac.submit(_packet("c"))
+    assert not decision.accepted and decision.reason == "ERR_OVERLOADED"
+    assert ac.stats.shed["ERR_OVERLOADED"] == 1
+
+
+def test_deadline_unreachable_is_shed():
+    ac = AdmissionController(max_queue_depth=100, max_wait_s=10.0, initial_cost_s=1.0)
+    assert ac.submit(_packet("a"), deadline_s=5.0).accepted
+    decision = ac.submit(_packet("b"), deadline_s=1.5)
+    assert not decision.accepted and decision.reason == "ERR_DEADLINE_UNREACHABLE"
+    assert decision.retry_after_s >= 0.5
+
+
+def test_round_robin_between_sources():
+    ac = AdmissionController(max_queue_depth=10, max_wait_s=10.0)
+    for i in range(3):
+        ac.submit(_packet("a", n=i))
+    ac.submit(_packet("b", n=9))
+    order = [ac.next(timeout=0).packet["n"] for _ in range(4)]
+    assert order == [0, 9, 1, 2]
+    assert ac.next(timeout=0) is None
+
+
+def test_expired_callback_runs_outside_lock():
+    ac = AdmissionController(max_queue_depth=10, max_wait_s=0.01, initial_cost_s=0.0)
+    seen = []
+
+    def on_result(packet, result):
+        seen.append((result, ac.depth))
+
+    ac.submit(_packet("a"), on_result=on_result)
+    time.sleep(0.02)
+    assert ac.next(timeout=0) is None
+    assert seen == [((False, "ERR_DEADLINE_EXPIRED"), 0)]
+
+
+def test_service_verifies_admitted_packets():
+    calls = []
+
+    def verify(packet, ctx, **kw):
+        calls.append((packet["n"], ctx, kw))
+        return True, "OK"
+
+    service = VerificationService(verify, "ctx", workers=2, flag=1)
+    results = {}
+    done = threading.Event()
+
+    def on_result(packet, result):
+        results[packet["n"]] = result
+        if len(results) == 5:
+            done.set()
+
+    service.start()
+    try:
+        for i in range(5):
+            assert service.submit(_packet(f"s{i % 2}", n=i), on_result=on_result).accepted
+        assert done.wait(5)
+    finally:
+        service.stop()
+    assert results == {i: (True, "OK") for i in range(5)}
+    assert all(ctx == "ctx" and kw == {"flag": 1} for _, ctx, kw in calls)
+    assert service.controller.stats.completed == 5
+
+
+def test_service_reports_verify_errors():
+    def verify(packet, ctx):
+        raise RuntimeError("boom")
+
+    service = VerificationService(verify, "ctx", workers=1)
+    out = []
+    done = threading.Event()
+    service.start()
+    try:
+        service.submit(_packet("a"), on_result=lambda p, r: (out.append(r), done.set()))
+        assert done.wait(5)
+    finally:
+        service.stop()
+    assert out[0][0] is False and out[0][1].startswith("ERR_INTERNAL")
+
+
+def test_verify_packets_admitted_entry_point():
+    import json
+    from pathlib import Path
+    from verifier import verify_packet_real as vpr
+
+    raw = (Path(__file__).parent.parent / "data" / "packet.json").read_text()
+
+    def fresh():
+        packet = json.loads(raw)["packet"]
+        packet["token"]["nonce"] = os.urandom(8).hex()
+        return packet
+
+    expected = vpr.verify_packets_parallel([fresh()], "window-ctx-001", workers=1, skip_expiry=True)
+    results = vpr.verify_packets_admitted([fresh(), fresh()], "window-ctx-001", workers=2, skip_expiry=True)
+    assert [r[1] for r in results] == [expected[0][1]] * 2
+    assert vpr.verify_packets_admitted([], "window-ctx-001") == []
@@ -0,0 +1,71 @@
+import pytest
+
+from common.backend_registry import AUTO, REAL, STUB, BackendRegistry
+
+
+def _registry(default=STUB):
+    reg = BackendRegistry(default)
+    reg.register("lrs", "pure", lambda: {"name": "pure", "native": False})
+    reg.register("lrs", "fast", lambda: {"name": "fast", "native": True})
+    reg.register("lrs", "broken", lambda: 1 / 0)
+    reg.register("kem", "pure", lambda: {"name": "pure"})
+    return reg
+
+
+def test_stub_resolves_to_nothing():
+    reg = _registry()
+    assert reg.active("lrs") is None and reg.get("lrs") is None
+
+
+def test_real_resolves_only_native():
+    reg = _registry(REAL)
+    assert reg.active("lrs") == "fast"
+    assert reg.get("lrs")["native"] is True
+
+
+def test_real_without_native_fails_loudly():
+    reg = _registry(REAL)
+    with pytest.raises(RuntimeError):
+        reg.get("kem")
+    assert reg.capabilities()["kem"]["active"] is None
+
+
+def test_auto_prefers_native_but_accepts_pure():
+    reg = _registry(AUTO)
+    assert reg.active("lrs") == "fast"
+    assert reg.active("kem") == "pure"
+
+
+def test_explicit_selection_and_override():
+    reg = _registry()
+    reg.select("pure", ["lrs"])
+    assert reg.active("lrs") == "pure"
+    with reg.use_backend("fast", ["lrs"]) as active:
+        assert active == {"lrs": "fast"}
+        assert reg.active("lrs") == "fast"
+    assert reg.active("lrs") == "pure"
+    assert reg.active("kem") is None
+    with pytest.raises(KeyError):
+        reg.select("missing", ["lrs"]) or reg.active("lrs")
+
+
+def test_failed_loader_is_reported():
+    reg = _registry()
+    caps = reg.capabilities()["lrs"]
+    assert caps["available"] == {STUB: True, "pure": True, "fast": True, "broken": False}
+    assert caps["native"] == ["fast"]
+    assert "broken" in caps["errors"]
+    assert reg.default == STUB
+
+
+def test_reserved_names_rejected():
+    with pytest.raises(ValueError):
+        BackendRegistry().register("lrs", REAL, dict)
+
+
+def test_adapter_loaders_require_native(monkeypatch):
+    from common import bulletproofs_backend, crypto_adapters, lrs_backend
+    monkeypatch.setattr(lrs_backend, "load_library", lambda: None)
+    monkeypatch.setattr(bulletproofs_backend, "load_library", lambda: None)
+    assert crypto_adapters._load_lsag() is None
+    assert crypto_adapters._load_bulletproofs() is None
@@ -0,0 +1,19 @@
+from common import bulletproofs_backend as bp
+from common import crypto_adapters
+
+
+def test_verify_multiple_without_native_fails_closed(monkeypatch):
+    monkeypatch.setattr(bp, "default_context", lambda: None)
+    bounds = [(0, 100), (10, 20)]
+    commits, proof = bp.fallback_range_proof_prove_multiple([5, 15], bounds, [1, 2])
+    assert bp.range_proof_verify_multiple_py(bounds, commits, proof) is False
+    assert bp.range_proof_verify_multiple_py(bounds, commits, b"") is False
+
+
+def test_aggregate_hints_are_checked():
+    proof = crypto_adapters.range_proof_prove_aggregate([5, 15], [(0, 100), (10, 20)], [1, 2])
+    if "proof_hex" in proof:
+        return
+    assert crypto_adapters.range_proof_verify_aggregate(proof)
+    proof["value_hints"][1] = 25
+    assert not crypto_adapters.range_proof_verify_aggregate(proof)
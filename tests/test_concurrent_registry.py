@@ -0,0 +1,66 @@
+import threading
+
+import pytest
+
+from common.concurrent_registry import StripedRegistry
+
+
+def test_check_and_insert_reports_first_writer():
+    reg = StripedRegistry(stripes=4)
+    assert reg.check_and_insert("t:ab12", "first") == (True, "first")
+    assert reg.check_and_insert("t:ab12", "second") == (False, "first")
+    assert reg["t:ab12"] == "first"
+    assert len(reg) == 1
+
+
+def test_callable_value_is_built_once():
+    reg = StripedRegistry()
+    calls = []
+    reg.check_and_insert(b"k", lambda: calls.append(1) or "v")
+    reg.check_and_insert(b"k", lambda: calls.append(1) or "w")
+    assert calls == [1]
+
+
+def test_discard_handles_none_values():
+    reg = StripedRegistry()
+    reg.check_and_insert("k", None)
+    assert "k" in reg
+    assert reg.discard("k") is True
+    assert reg.discard("k") is False
+    assert "k" not in reg
+
+
+def test_evict_and_clear():
+    reg = StripedRegistry(stripes=8)
+    for i in range(20):
+        reg.check_and_insert(f"t:{i:04x}", i)
+    assert reg.evict(lambda k, v: v % 2 == 0) == 10
+    assert sorted(reg.values()) == list(range(1, 20, 2))
+    reg.clear()
+    assert not reg
+
+
+def test_stripes_must_be_power_of_two():
+    with pytest.raises(ValueError):
+        StripedRegistry(stripes=6)
+
+
+def test_concurrent_inserts_have_single_winner():
+    reg = StripedRegistry(stripes=16)
+    wins = []
+    barrier = threading.Barrier(8)
+
+    def worker(n):
+        barrier.wait()
+        for i in range(200):
+            inserted, _ = reg.check_and_insert(f"t:{i:04x}", n)
+            if inserted:
+                wins.append(i)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(wins) == list(range(200))
+    assert len(reg) == 200
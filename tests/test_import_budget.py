@@ -0,0 +1,79 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+IMPORT_BUDGET_S = 1.0
+DEFERRED_MODULES = ("nacl", "kyber_py", "http.server", "concurrent.futures")
+NATIVE_LIBRARIES = ("libbulletproofs", "liblsag")
+
+ENTRY_POINTS = sorted(
+    f"{path.parent.name}.{path.stem}"
+    for package in ("verifier", "sim")
+    for path in (ROOT / package).glob("*.py")
+    if path.stem != "__init__"
+)
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+try:
+    import %s
+except (ImportError, RuntimeError) as e:
+    print(json.dumps({"skip": str(e)}))
+    raise SystemExit(0)
+elapsed = time.perf_counter() - start
+from common import native_loader
+maps = ""
+try:
+    with open("/proc/self/maps") as f:
+        maps = f.read()
+except OSError:
+    pass
+print(json.dumps({
+    "elapsed": elapsed,
+    "modules": sorted(name for name in sys.modules if any(name == m or name.startswith(m + ".") for m in %r)),
+    "libs": sorted(native_loader._libs),
+    "mapped": [lib for lib in %r if lib in maps],
+}))
+"""
+
+
+def _probe(module, **env):
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE % (module, DEFERRED_MODULES, NATIVE_LIBRARIES)],
+        cwd=ROOT,
+        env={**os.environ, **env},
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    if "skip" in report:
+        pytest.skip(f"{module} 依赖外部环境: {report['skip']}")
+    return report
+
+
+def test_entry_points_discovered():
+    assert "verifier.verify_packet_real" in ENTRY_POINTS
+    assert any(name.startswith("sim.") for name in ENTRY_POINTS)
+
+
+@pytest.mark.parametrize("use_real", ["0", "1"])
+@pytest.mark.parametrize("module", ENTRY_POINTS)
+def test_import_defers_optional_modules(module, use_real):
+    report = _probe(module, USE_REAL_CRYPTO=use_real)
+    assert report["modules"] == [], report["modules"]
+    assert report["libs"] == [], report["libs"]
+    assert report["mapped"] == [], report["mapped"]
+
+
+@pytest.mark.parametrize("module", ENTRY_POINTS)
+def test_import_within_budget(module):
+    report = _probe(module)
+    assert report["elapsed"] < IMPORT_BUDGET_S, report["elapsed"]
@@ -0,0 +1,79 @@
+import itertools
+import time
+
+import pytest
+
+from common.kem_layer import (
+    EncapsulationPool,
+    KEMClient,
+    KEMServer,
+    KEMSessionManager,
+    PrecomputePool,
+    kem_decaps,
+    kem_keygen,
+    keypair_pool,
+)
+
+
+def _wait_full(pool, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while len(pool) < pool.capacity and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert len(pool) == pool.capacity
+
+
+def test_precompute_pool_counts_misses_inline():
+    counter = itertools.count()
+    pool = PrecomputePool(lambda: (next(counter),), capacity=2)
+    assert [pool.take(), pool.take()] == [(0,), (1,)]
+    assert pool.stats() == {"ready": 0, "hits": 0, "misses": 2}
+
+
+def test_precompute_pool_serves_ready_items():
+    counter = itertools.count()
+    pool = PrecomputePool(lambda: (next(counter),), capacity=3).start()
+    try:
+        _wait_full(pool)
+        assert [pool.take() for _ in range(3)] == [(0,), (1,), (2,)]
+        assert pool.hits == 3 and pool.misses == 0
+    finally:
+        pool.stop()
+
+
+def test_encapsulation_pool_evicts_oldest_key():
+    pool = EncapsulationPool(capacity_per_key=1, max_keys=2)
+    try:
+        keys = [kem_keygen() for _ in range(3)]
+        for pk, _ in keys:
+            pool.prime(pk)
+        assert pool.stats()["keys"] == 2
+        pk, sk = keys[2]
+        ct, ss = pool.take(pk)
+        assert kem_decaps(sk, ct) == ss
+    finally:
+        pool.stop()
+    assert pool.stats()["keys"] == 0
+
+
+def test_pool_keys_are_usable():
+    pool = keypair_pool(capacity=1, level=768)
+    try:
+        server = KEMServer(pool, level=768)
+        pk, sk = server.setup_keys()
+        ct, ss = KEMClient(level=768).encapsulate(pk)
+        assert kem_decaps(sk, ct, level=768) == ss
+    finally:
+        pool.stop()
+
+
+def test_pool_level_mismatch_rejected():
+    keypairs = PrecomputePool(lambda: KEMServer(level=768).generate_keys(), level=768)
+    with pytest.raises(ValueError):
+        KEMServer(keypairs, level=512)
+    encaps = EncapsulationPool(level=1024)
+    with pytest.raises(ValueError):
+        KEMClient(encaps, level=512)
+    with pytest.raises(ValueError):
+        KEMSessionManager(encaps_pool=encaps, level=768)
+    assert KEMSessionManager(encaps_pool=encaps, level=1024).level == 1024
+    assert KEMServer(PrecomputePool(lambda: None), level=768).keypair_pool is not None
@@ -0,0 +1,85 @@
+import pytest
+
+from common import kem_layer
+from common.kem_layer import KEMSessionManager, kem_keygen
+
+
+def test_aead_fails_closed_without_pynacl(monkeypatch):
+    monkeypatch.setattr(kem_layer, "_secretbox", None)
+    monkeypatch.setattr(kem_layer, "_secretbox_loaded", True)
+    with pytest.raises(RuntimeError):
+        kem_layer.aead_seal(b"\x00" * 32, b"payload")
+    with pytest.raises(RuntimeError):
+        kem_layer.aead_open(b"\x00" * 32, b"\x00" * 64)
+
+
+def test_report_ad_distinguishes_session_and_counter():
+    assert kem_layer.report_ad("s1", 0) != kem_layer.report_ad("s1", 1)
+    assert kem_layer.report_ad("s1", 0) != kem_layer.report_ad("s2", 0)
+
+
+@pytest.mark.parametrize("counter", [None, -1, "1", 1.0, True])
+def test_invalid_counter_rejected_before_decrypt(counter):
+    server = KEMSessionManager()
+    envelope = {"session_id": "s", "kem_ct": "00", "ciphertext": "00"}
+    if counter is not None:
+        envelope["counter"] = counter
+    with pytest.raises(ValueError):
+        server.open_report(b"", envelope)
+    assert server.stats.rejected == 1
+
+
+@pytest.fixture
+def sessions():
+    pytest.importorskip("nacl.secret")
+    pk, sk = kem_keygen()
+    return pk, sk, KEMSessionManager(max_reports=4), KEMSessionManager(max_reports=4)
+
+
+def test_aead_binds_associated_data():
+    pytest.importorskip("nacl.secret")
+    key = b"\x01" * 32
+    sealed = kem_layer.aead_seal(key, b"payload", b"ad-1")
+    assert kem_layer.aead_open(key, sealed, b"ad-1") == b"payload"
+    with pytest.raises(ValueError):
+        kem_layer.aead_open(key, sealed, b"ad-2")
+
+
+def test_session_round_trip_and_counters(sessions):
+    pk, sk, client, server = sessions
+    envelopes = [client.seal_report(pk, f"r{i}".encode()) for i in range(3)]
+    assert [e["counter"] for e in envelopes] == [0, 1, 2]
+    assert "kem_ct" in envelopes[0] and "kem_ct" not in envelopes[1]
+    assert [server.open_report(sk, e) for e in envelopes] == [b"r0", b"r1", b"r2"]
+    assert client.stats.handshakes == server.stats.handshakes == 1
+
+
+def test_replayed_or_reordered_report_rejected(sessions):
+    pk, sk, client, server = sessions
+    first, second, third = (client.seal_report(pk, b"x") for _ in range(3))
+    server.open_report(sk, first)
+    server.open_report(sk, third)
+    for envelope in (third, second, first):
+        with pytest.raises(ValueError):
+            server.open_report(sk, envelope)
+    assert server.stats.rejected == 3
+
+
+def test_counter_is_authenticated(sessions):
+    pk, sk, client, server = sessions
+    first, second = client.seal_report(pk, b"a"), client.seal_report(pk, b"b")
+    server.open_report(sk, first)
+    forged = dict(second, counter=5)
+    with pytest.raises(ValueError):
+        server.open_report(sk, forged)
+    assert server.open_report(sk, second) == b"b"
+
+
+def test_session_rotates_after_max_reports(sessions):
+    pk, sk, client, server = sessions
+    envelopes = [client.seal_report(pk, b"p") for _ in range(5)]
+    assert envelopes[4]["session_id"] != envelopes[0]["session_id"]
+    assert envelopes[4]["counter"] == 0 and "kem_ct" in envelopes[4]
+    for envelope in envelopes:
+        server.open_report(sk, envelope)
+    assert server.stats.handshakes == 2
@@ -0,0 +1,84 @@
+import os
+import threading
+
+import pytest
+
+from common.link_tag_table import TAG_SIZE, LinkTagStore, LinkTagTable, tag_digest
+from common.linkable_ring_signature import LinkableRingSignature
+
+
+def _colliding(n):
+    prefix = b"\x07" * 8
+    return [prefix + i.to_bytes(TAG_SIZE - 8, "big") for i in range(n)]
+
+
+def test_add_is_idempotent():
+    table = LinkTagTable(capacity=8)
+    tag = os.urandom(TAG_SIZE)
+    assert table.add(tag) is True
+    assert table.add(tag) is False
+    assert tag in table and len(table) == 1
+
+
+def test_probe_collisions_stay_distinct():
+    table = LinkTagTable(capacity=16)
+    tags = _colliding(10)
+    assert all(table.add(tag) for tag in tags)
+    assert all(tag in table for tag in tags)
+    assert not any(table.add(tag) for tag in tags)
+    assert _colliding(11)[10] not in table
+
+
+def test_growth_keeps_members_and_load_factor():
+    table = LinkTagTable(capacity=8)
+    start = table.memory_bytes()
+    tags = [os.urandom(TAG_SIZE) for _ in range(500)] + _colliding(20)
+    for tag in tags:
+        table.add(tag)
+    assert len(table) == len(tags)
+    assert all(tag in table for tag in tags)
+    assert table.memory_bytes() > start
+    assert len(table) * 10 <= len(table._used) * 7
+
+
+def test_wrong_size_tag_is_refused():
+    with pytest.raises(ValueError):
+        LinkTagTable().add(b"short")
+
+
+@pytest.mark.parametrize("raw", ["zz" * 32, "ab" * 31, "ab" * 33, "", None, 5, b"\x00" * 31])
+def test_malformed_tags_have_no_digest(raw):
+    assert tag_digest(raw) is None
+
+
+def test_digest_accepts_hex_and_bytes():
+    tag = os.urandom(TAG_SIZE)
+    assert tag_digest(tag.hex()) == tag == tag_digest(bytearray(tag))
+
+
+def test_malformed_tag_is_rejected_as_submission():
+    lrs = LinkableRingSignature()
+    assert lrs.detect_duplicate_submission({"link_tag": "ab" * 16}, "t") == (True, [])
+    assert lrs.detect_duplicate_submission({"link_tag": "ab" * 32}, "t") == (False, None)
+    assert lrs.detect_duplicate_submission({"link_tag": "ab" * 32}, "t")[0] is True
+
+
+def test_store_records_duplicate_history_concurrently():
+    store = LinkTagStore(stripes=4)
+    tags = [os.urandom(TAG_SIZE) for _ in range(50)]
+    barrier = threading.Barrier(4)
+
+    def worker(n):
+        barrier.wait()
+        for tag in tags:
+            store.check_and_insert(tag, lambda: {"worker": n})
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(store) == 50
+    history = store.duplicates()
+    assert set(history) == set(tags)
+    assert all(len(records) == 3 for records in history.values())
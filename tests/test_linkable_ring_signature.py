@@ -0,0 +1,57 @@
+import time
+
+from common.linkable_ring_signature import LinkableRingSignature, ring_identifier
+
+
+def _register(lrs, task_id, vehicles):
+    ring = lrs.create_public_key_ring(task_id, vehicles)
+    lrs.task_registry.register_task(task_id, ring, ["cell"], int(time.time()), window_len=3600)
+    return ring
+
+
+def test_task_key_cache_is_bounded():
+    lrs = LinkableRingSignature(max_task_keys=3)
+    vehicle = lrs.register_vehicle("veh")
+    keys = {f"t{i}": lrs.derive_task_key(vehicle, f"t{i}") for i in range(10)}
+    assert list(lrs._task_keys) == ["t7", "t8", "t9"]
+    again = lrs.derive_task_key(vehicle, "t0")
+    assert again == keys["t0"] and again is not keys["t0"]
+
+
+def test_recently_used_and_registered_tasks_survive_eviction():
+    lrs = LinkableRingSignature(max_task_keys=2)
+    vehicle = lrs.register_vehicle("veh")
+    _register(lrs, "live", [vehicle])
+    first = lrs.derive_task_key(vehicle, "live")
+    for i in range(5):
+        lrs.derive_task_key(vehicle, f"probe{i}")
+    assert "live" in lrs._task_keys
+    assert lrs.derive_task_key(vehicle, "live") is first
+    assert len(lrs._task_keys) == 2
+
+
+def test_evicted_with_task_removal():
+    lrs = LinkableRingSignature()
+    vehicle = lrs.register_vehicle("veh")
+    _register(lrs, "task", [vehicle])
+    assert lrs.task_registry.remove("task")
+    assert "task" not in lrs._task_keys
+
+
+def test_ring_id_binds_members_and_order():
+    lrs = LinkableRingSignature()
+    a, b, c = (lrs.register_vehicle(f"veh-{i}") for i in range(3))
+    ring_ab = lrs.create_public_key_ring("task", [a, b])
+    assert len(ring_ab.ring_id) == 16
+    assert lrs.create_public_key_ring("task", [a, b]).ring_id == ring_ab.ring_id
+    assert lrs.create_public_key_ring("task", [a, c]).ring_id != ring_ab.ring_id
+    assert lrs.create_public_key_ring("task", [b, a]).ring_id != ring_ab.ring_id
+    assert lrs.create_public_key_ring("other", [a, b]).ring_id != ring_ab.ring_id
+    grown = lrs.add_ring_members(ring_ab, [c])
+    assert grown.ring_id == ring_identifier("task", grown.registered_pubkeys)
+    assert lrs.remove_ring_members(grown, [c]).ring_id == ring_ab.ring_id
+
+
+def test_ring_id_is_unambiguous():
+    assert ring_identifier("ab", [b"c"]) != ring_identifier("a", [b"bc"])
+    assert ring_identifier("t", [b"ab", b"c"]) != ring_identifier("t", [b"a", b"bc"])
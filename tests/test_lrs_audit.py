@@ -0,0 +1,92 @@
+import hashlib
+
+import pytest
+
+from common import crypto_adapters, gk_backend, lrs_backend
+from common.backend_registry import REGISTRY
+from common.linkable_ring_signature import LinkableRingSignature
+
+
+def _key_image(sk, ctx=b""):
+    return hashlib.sha256(b"ki" + bytes(sk)).digest()
+
+
+def _fake_lrs():
+    def sign(message, ring, sk, ctx):
+        return hashlib.sha256(message + ctx + bytes(sk)).digest(), _key_image(sk)
+
+    return {
+        "sign": sign,
+        "verify": lambda message, ring, sig, keyimage, ctx: True,
+        "public_key": lambda sk: hashlib.sha256(b"pk" + bytes(sk)).digest(),
+        "key_image": _key_image,
+        "label": "fake_native",
+        "native": True,
+    }
+
+
+@pytest.fixture
+def fake_backend(monkeypatch):
+    monkeypatch.setitem(REGISTRY._loaders["lrs"], "fake", _fake_lrs)
+    monkeypatch.setattr(REGISTRY, "_loaded", dict(REGISTRY._loaded))
+    with REGISTRY.use_backend("fake", ["lrs"]):
+        yield
+
+
+def _sign_and_trace(lrs):
+    vehicles = [lrs.register_vehicle(f"veh-{i}") for i in range(3)]
+    ring = lrs.create_public_key_ring("task-a", vehicles)
+    task_key = lrs.derive_task_key(vehicles[1], "task-a")
+    sigma = lrs.sign_message(b"report", task_key, ring)
+    record = lrs.controlled_deanonymization(sigma["link_tag"], "task-a", lrs.audit_authority_sk)
+    return task_key, sigma, record
+
+
+def test_stub_audit_record_matches_signature_tag():
+    lrs = LinkableRingSignature()
+    task_key, sigma, record = _sign_and_trace(lrs)
+    assert sigma["backend"] == "fallback"
+    assert sigma["link_tag"] == task_key.link_tag
+    assert record is not None and record.vehicle_id == "veh-1"
+
+
+def test_native_audit_record_uses_key_image(fake_backend):
+    lrs = LinkableRingSignature()
+    task_key, sigma, record = _sign_and_trace(lrs)
+    assert sigma["backend"] == "fake_native"
+    assert task_key.link_tag == _key_image(task_key.derived_sk).hex()
+    assert sigma["link_tag"] == task_key.link_tag
+    assert record is not None and record.vehicle_id == "veh-1"
+
+
+def test_deanonymization_requires_authority_key():
+    lrs = LinkableRingSignature()
+    _, sigma, _ = _sign_and_trace(lrs)
+    with pytest.raises(PermissionError):
+        lrs.controlled_deanonymization(sigma["link_tag"], "task-a", b"\x00" * 32)
+    assert lrs.controlled_deanonymization(sigma["link_tag"], "task-b", lrs.audit_authority_sk) is None
+
+
+def test_fallback_link_tag_is_per_context():
+    sk = b"\x07" * 32
+    assert crypto_adapters.lrs_link_tag(sk, b"t1") == crypto_adapters.lrs_link_tag(sk, b"t1")
+    assert crypto_adapters.lrs_link_tag(sk, b"t1") != crypto_adapters.lrs_link_tag(sk, b"t2")
+
+
+def test_native_wrappers_degrade_without_library(monkeypatch):
+    monkeypatch.setattr(lrs_backend, "load_library", lambda: None)
+    monkeypatch.setattr(gk_backend, "load_library", lambda: None)
+    assert lrs_backend.lsag_public_key_py(b"\x01" * 32) is None
+    assert lrs_backend.lsag_key_image_py(b"\x01" * 32) is None
+    assert not gk_backend.available()
+    with pytest.raises(RuntimeError):
+        gk_backend.gk_key_image_py(b"\x01" * 32, b"ctx")
+    assert crypto_adapters._load_groth_kohlweiss() is None
+
+
+def test_gk_verify_rejects_malformed_lengths():
+    ring = [hashlib.sha256(bytes([i])).digest() for i in range(3)]
+    assert gk_backend.signature_size(3) == 32 * (8 * 2 + 1)
+    assert gk_backend.signature_size(1) == 32 * (8 * 1 + 1)
+    assert not gk_backend.gk_verify_py(b"m", ring, b"\x00" * 10, b"\x00" * 32, b"ctx")
+    assert not gk_backend.gk_verify_py(b"m", ring, b"\x00" * gk_backend.signature_size(3), b"\x00" * 31, b"ctx")
@@ -0,0 +1,68 @@
+import gc
+import threading
+
+from verifier.metrics import Counter, Histogram, MetricsRegistry
+
+
+def _run_threads(fn, n):
+    threads = [threading.Thread(target=fn) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    del threads
+    gc.collect()
+
+
+def test_dead_thread_cells_fold_into_totals():
+    c = Counter("c", "help")
+    _run_threads(lambda: [c.inc(code="OK") for _ in range(100)], 32)
+    assert c.live_cells() == 0
+    assert c.value(code="OK") == 3200
+    c.inc(code="OK")
+    assert c.value(code="OK") == 3201
+    assert c.live_cells() == 1
+
+
+def test_histogram_folds_rows():
+    h = Histogram("h", "help", buckets=(0.1, 1.0))
+    _run_threads(lambda: (h.observe(0.05, stage="zk"), h.observe(5.0, stage="zk")), 8)
+    h.observe(0.5, stage="zk")
+    assert h.live_cells() == 1
+    lines = h.samples()
+    assert 'h_bucket{stage="zk",le="0.1"} 8' in lines
+    assert 'h_bucket{stage="zk",le="1.0"} 9' in lines
+    assert 'h_bucket{stage="zk",le="+Inf"} 17' in lines
+    assert 'h_count{stage="zk"} 17' in lines
+
+
+def test_label_values_are_escaped():
+    c = Counter("c", "help")
+    c.inc(code='a"b\\c\nd')
+    assert c.samples() == ['c{code="a\\"b\\\\c\\nd"} 1.0']
+
+
+def test_callback_counter_renders_as_counter():
+    reg = MetricsRegistry()
+    reg.callback_counter("shed_total", "shed", lambda: {"ERR_X": 2}, labelnames=("reason",))
+    reg.gauge("depth", "depth", lambda: 3)
+    text = reg.render()
+    assert "# TYPE shed_total counter" in text
+    assert 'shed_total{reason="ERR_X"} 2.0' in text
+    assert "# TYPE depth gauge" in text and "depth 3.0" in text
+
+
+def test_failing_gauge_does_not_break_render():
+    reg = MetricsRegistry()
+    reg.gauge("bad", "bad", lambda: 1 / 0)
+    reg.counter("ok", "ok").inc()
+    text = reg.render()
+    assert "# bad" in text and "ok 1.0" in text
+
+
+def test_parallel_verify_reuses_pool():
+    from verifier import verify_packet_real as vpr
+    vpr.verify_packets_parallel([], "ctx", workers=3)
+    pool = vpr._verify_pool(3)
+    vpr.verify_packets_parallel([], "ctx", workers=3)
+    assert vpr._verify_pool(3) is pool
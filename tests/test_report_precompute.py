@@ -0,0 +1,123 @@
+import hashlib
+
+import pytest
+
+from common.backend_registry import REGISTRY
+from common.crypto_adapters import lrs_sign
+from common.kem_layer import KEMSessionManager, kem_keygen
+from common.report_precompute import ReportPrecomputer
+
+WHITELIST = [f"cell{i}" for i in range(8)]
+SK = b"\x05" * 32
+
+
+def _ring(tag):
+    return [hashlib.sha256(tag + bytes([i])).digest() for i in range(4)]
+
+
+def _fake_sign(message, ring, sk, ctx):
+    return hashlib.sha256(ring.digest + message + ctx + bytes(sk)).digest(), hashlib.sha256(b"ki" + sk + ctx).digest()
+
+
+class _Presig:
+    used = []
+    closed = []
+
+    def __init__(self, ring, sk):
+        self.ring = ring
+        self.sk = sk
+
+    def sign(self, message, ctx):
+        _Presig.used.append(self.ring.digest)
+        return _fake_sign(message, self.ring, self.sk, ctx)
+
+    def close(self):
+        _Presig.closed.append(self.ring.digest)
+
+
+def _fake_lrs():
+    return {
+        "sign": _fake_sign,
+        "presign": _Presig,
+        "verify": lambda message, ring, sig, keyimage, ctx: True,
+        "label": "fake_native",
+        "native": True,
+    }
+
+
+@pytest.fixture
+def fake_backend(monkeypatch):
+    _Presig.used, _Presig.closed = [], []
+    monkeypatch.setitem(REGISTRY._loaders["lrs"], "fake", _fake_lrs)
+    monkeypatch.setattr(REGISTRY, "_loaded", dict(REGISTRY._loaded))
+    with REGISTRY.use_backend("fake", ["lrs"]):
+        yield
+
+
+def _precomputer(capacity=2):
+    kem_pk, _ = kem_keygen()
+    return ReportPrecomputer("task", _ring(b"a"), 0, SK, WHITELIST, kem_pk, capacity=capacity, sessions=KEMSessionManager())
+
+
+def test_offline_signature_matches_online(fake_backend):
+    pre = _precomputer()
+    assert pre.precompute(WHITELIST[:2]) == 2
+    bundle = pre._take_bundle(pre.ring)
+    assert bundle.presig is not None and bundle.ring_digest == pre.ring.digest
+    offline = lrs_sign(b"msg", pre.ring, 0, SK, pre.ctx, bundle.presig)
+    online = lrs_sign(b"msg", pre.ring, 0, SK, pre.ctx)
+    assert offline == online
+    assert _Presig.used == [pre.ring.digest]
+    pre.close()
+
+
+def test_ring_update_discards_stale_presigs(fake_backend):
+    pre = _precomputer()
+    pre.precompute()
+    old = pre.ring.digest
+    assert pre.update_ring(_ring(b"b"), 1, ring_id="r2") == 2
+    assert _Presig.closed == [old, old]
+    assert pre.ring_id == "r2" and pre.signer_index == 1
+    bundle = pre._take_bundle(pre.ring)
+    assert bundle.presig is None
+    assert lrs_sign(b"msg", pre.ring, 1, SK, pre.ctx, bundle.presig)["sig"] == _fake_sign(b"msg", pre.ring, SK, pre.ctx)[0].hex()
+    assert _Presig.used == []
+    pre.close()
+
+
+def test_bundle_taken_for_other_ring_drops_presig(fake_backend):
+    pre = _precomputer(capacity=1)
+    pre.precompute()
+    other = _precomputer(capacity=1)
+    other.update_ring(_ring(b"c"), 0)
+    bundle = pre._take_bundle(other.ring)
+    assert bundle.presig is None and _Presig.closed == [pre.ring.digest]
+    assert pre.stats.bundle_hits == 1
+
+
+def test_paths_and_bundle_stats(fake_backend):
+    pre = _precomputer(capacity=1)
+    pre.precompute(WHITELIST[:1])
+    assert pre._path(WHITELIST[0])[0] == 0
+    assert pre._path(WHITELIST[3])[0] == 3
+    assert (pre.stats.path_hits, pre.stats.path_misses) == (1, 1)
+    with pytest.raises(ValueError):
+        pre._path("elsewhere")
+    pre._take_bundle(pre.ring)
+    assert pre._take_bundle(pre.ring).presig is None
+    assert (pre.stats.bundle_hits, pre.stats.bundle_misses) == (1, 1)
+
+
+def test_build_report_offline_and_online_agree(fake_backend):
+    pytest.importorskip("nacl.secret")
+    pre = _precomputer(capacity=1)
+    pre.precompute(WHITELIST[:1])
+    token = {"version": 1, "region_id": "NET", "window_id": 0, "nonce": 0, "expiry_ts": 0, "rsu_id": 1}
+    offline = pre.build_report(100, WHITELIST[0], b"p", (0, 1000), token)
+    online = pre.build_report(100, WHITELIST[0], b"p", (0, 1000), token)
+    assert pre.stats.bundle_hits == pre.stats.bundle_misses == 1
+    assert offline["sigma_lrs"]["backend"] == online["sigma_lrs"]["backend"] == "fake_native"
+    assert offline["sigma_lrs"]["link_tag"] == online["sigma_lrs"]["link_tag"]
+    assert offline["ring_pubkeys"] == online["ring_pubkeys"]
+    assert _Presig.used == [pre.ring.digest]
+    pre.close()
@@ -0,0 +1,109 @@
+import dataclasses
+import os
+
+from common.crypto_adapters import ed25519_sign
+from common.rsu_registry import RSUKey, RSUKeyRegistry, StubRSUKeyRegistry, sign_token_batch, token_message
+
+SK = b"\x11" * 32
+PK = b"\x22" * 32
+
+
+def _token(rsu_id=1, window_id=7, nonce=None, expiry_ts=2_000_000_000):
+    return {
+        "version": 1, "region_id": "NET", "window_id": window_id,
+        "nonce": nonce if nonce is not None else int.from_bytes(os.urandom(8), "big"),
+        "expiry_ts": expiry_ts, "rsu_id": rsu_id,
+    }
+
+
+def _signed(token, sk=SK):
+    return dict(token, signature_hex=ed25519_sign(sk, token_message(token)).hex())
+
+
+def _stub_registry():
+    reg = StubRSUKeyRegistry()
+    reg.load([{"rsu_id": 1, "pk_hex": PK.hex(), "sk_hex": SK.hex()}])
+    return reg
+
+
+def test_verifier_registry_loads_public_keys_only():
+    reg = RSUKeyRegistry()
+    assert reg.load([{"rsu_id": 1, "pk_hex": PK.hex(), "sk_hex": SK.hex()}]) == 1
+    assert [f.name for f in dataclasses.fields(RSUKey)] == ["rsu_id", "public_key", "verify_key"]
+    assert reg.get(1).public_key == PK
+    assert reg.required and reg.enforced
+    assert reg.verify_token(_signed(_token())) == (False, "ERR_TOKEN_SIGNATURE")
+
+
+def test_enforcement_default_and_fail_closed():
+    reg = RSUKeyRegistry()
+    assert not reg.enforced
+    assert RSUKeyRegistry(required=True).enforced
+    assert reg.verify_token(_signed(_token())) == (False, "ERR_TOKEN_RSU_UNKNOWN")
+    reg.register(1, PK)
+    assert reg.enforced
+
+
+def test_stub_single_token():
+    reg = _stub_registry()
+    token = _signed(_token())
+    assert reg.verify_token(token) == (True, "OK")
+    assert reg.verify_token(dict(token, nonce=token["nonce"] + 1)) == (False, "ERR_TOKEN_SIGNATURE")
+    assert reg.verify_token(dict(token, signature_hex="zz")) == (False, "ERR_TOKEN_SIGNATURE")
+    assert reg.verify_token(_signed(_token(rsu_id=2))) == (False, "ERR_TOKEN_RSU_UNKNOWN")
+
+
+def test_stub_path_is_separate_from_verifier_path():
+    token = _signed(_token())
+    verifier = RSUKeyRegistry()
+    verifier.register(1, PK)
+    assert verifier.verify_token(token) == (False, "ERR_TOKEN_SIGNATURE")
+    assert _stub_registry().verify_token(token) == (True, "OK")
+
+
+def test_batch_tokens_share_one_root_signature():
+    reg = _stub_registry()
+    tokens = sign_token_batch(SK, [_token(nonce=i) for i in range(5)])
+    assert len({t["batch"]["signature_hex"] for t in tokens}) == 1
+    assert [reg.verify_token(t) for t in tokens] == [(True, "OK")] * 5
+    assert reg.cached_batch_roots() == 1
+    assert reg.evict_batch_roots(now=2_000_000_001) == 1
+    assert reg.cached_batch_roots() == 0
+
+
+def test_batch_token_rejections():
+    reg = _stub_registry()
+    tokens = sign_token_batch(SK, [_token(nonce=i) for i in range(4)])
+    moved = dict(tokens[0], nonce=99)
+    assert reg.verify_token(moved) == (False, "ERR_TOKEN_BATCH_PATH")
+    bad_index = dict(tokens[1], batch=dict(tokens[1]["batch"], index="x"))
+    assert reg.verify_token(bad_index) == (False, "ERR_TOKEN_BATCH_PATH")
+    forged = sign_token_batch(b"\x33" * 32, [_token(nonce=i) for i in range(4)])
+    assert reg.verify_token(forged[0]) == (False, "ERR_TOKEN_SIGNATURE")
+    assert reg.cached_batch_roots() == 0
+
+
+def test_sign_token_batch_requires_one_window():
+    import pytest
+    with pytest.raises(ValueError):
+        sign_token_batch(SK, [_token(window_id=1), _token(window_id=2)])
+    assert sign_token_batch(SK, []) == []
+
+
+def test_verify_tokens_mixed():
+    reg = _stub_registry()
+    batch = sign_token_batch(SK, [_token(nonce=i) for i in range(2)])
+    tokens = [_signed(_token()), batch[0], _signed(_token(rsu_id=9)), dict(_signed(_token()), signature_hex="00"), batch[1]]
+    assert reg.verify_tokens(tokens) == [
+        (True, "OK"), (True, "OK"), (False, "ERR_TOKEN_RSU_UNKNOWN"), (False, "ERR_TOKEN_SIGNATURE"), (True, "OK")
+    ]
+
+
+def test_verifier_fails_closed_when_signatures_required(monkeypatch):
+    from verifier import verify_packet_real as vpr
+    monkeypatch.setattr(vpr, "RSU_KEYS", RSUKeyRegistry(required=True))
+    assert vpr.verify_token(_signed(_token()), skip_expiry=True) == (False, "ERR_TOKEN_RSU_UNKNOWN")
+    monkeypatch.setattr(vpr, "RSU_KEYS", _stub_registry())
+    assert vpr.verify_token(_signed(_token()), skip_expiry=True) == (True, "OK")
+    monkeypatch.setattr(vpr, "RSU_KEYS", RSUKeyRegistry())
+    assert vpr.verify_token(_signed(_token()), skip_expiry=True) == (True, "OK")
@@ -0,0 +1,87 @@
+import os
+
+import pytest
+
+from common.linkable_ring_signature import LinkableRingSignature, PublicKeyRing
+from common.task_registry import TaskRegistry
+
+
+def _ring(task_id, size=3):
+    return PublicKeyRing(f"ring-{task_id}", task_id, [os.urandom(32) for _ in range(size)], 0)
+
+
+def test_register_and_window():
+    reg = TaskRegistry()
+    ctx = reg.register_task("t1", _ring("t1"), ["a", "b"], window_start=100, window_len=60)
+    assert reg.get("t1", now=120) is ctx
+    assert ctx.in_window(100) and not ctx.in_window(160)
+    assert ctx.expiry_ts == 160
+
+
+def test_ring_must_belong_to_task():
+    with pytest.raises(ValueError):
+        TaskRegistry().register_task("t1", _ring("t2"), ["a"], window_start=0)
+
+
+def test_reregistration_keeps_link_tag_history():
+    reg = TaskRegistry()
+    now = 10 ** 10
+    ctx = reg.register_task("t1", _ring("t1"), ["a"], window_start=now, window_len=60)
+    ctx.link_tags.check_and_insert(b"\x01" * 32, dict)
+    again = reg.register_task("t1", _ring("t1", 4), ["a", "b"], window_start=now, window_len=120)
+    assert again is ctx
+    assert b"\x01" * 32 in again.link_tags
+    assert len(again.ring.registered_pubkeys) == 4
+    assert again.expiry_ts == now + 120
+
+
+def test_expiry_retires_task_and_notifies():
+    reg = TaskRegistry()
+    removed = []
+    reg.add_removal_listener(removed.append)
+    reg.register_task("t1", _ring("t1"), ["a"], window_start=0, window_len=10)
+    reg.register_task("t2", _ring("t2"), ["a"], window_start=0, window_len=100)
+    assert reg.expire(now=50) == ["t1"]
+    assert removed == ["t1"]
+    assert reg.is_retired("t1") and not reg.is_retired("t2")
+    assert reg.get("t2", now=200) is None
+    assert removed == ["t1", "t2"]
+    with pytest.raises(ValueError):
+        reg.register_task("t1", _ring("t1"), ["a"], window_start=0, window_len=10 ** 10)
+
+
+def test_retired_set_is_bounded():
+    reg = TaskRegistry(max_retired=2)
+    for i in range(4):
+        reg.register_task(f"t{i}", _ring(f"t{i}"), ["a"], window_start=0, window_len=1)
+    reg.expire(now=10)
+    assert [reg.is_retired(f"t{i}") for i in range(4)] == [False, False, True, True]
+
+
+def test_duplicates_for_expired_task_are_rejected():
+    lrs = LinkableRingSignature()
+    vehicles = [lrs.register_vehicle(f"v{i}") for i in range(3)]
+    ring = lrs.create_public_key_ring("t1", vehicles)
+    lrs.task_registry.register_task("t1", ring, ["a"], window_start=0, window_len=10)
+    sigma = {"link_tag": "ab" * 32}
+    assert lrs.task_registry.get("t1", now=5) is not None
+    lrs.task_registry.expire(now=50)
+    assert lrs.detect_duplicate_submission(sigma, "t1") == (True, [])
+    assert "t1" not in lrs._task_keys
+
+
+def test_verifier_rejects_packets_for_expired_task():
+    import copy
+    import json
+    from pathlib import Path
+
+    from verifier import verify_packet_real as vpr
+
+    packet = json.loads((Path(__file__).resolve().parent.parent / "data" / "packet.json").read_text())["packet"]
+    packet = copy.deepcopy(packet)
+    packet["task_id"] = "expired-task"
+    packet["token"]["nonce"] = int.from_bytes(os.urandom(8), "big")
+    registry = vpr.LRS_VERIFIER.task_registry
+    registry.register_task("expired-task", _ring("expired-task"), ["a"], window_start=0, window_len=1)
+    registry.expire()
+    assert vpr.verify_packet(packet, "window-ctx-001", skip_expiry=True) == (False, "ERR_TASK_EXPIRED")
@@ -0,0 +1,224 @@
+import threading
+import time
+from collections import deque, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional, Tuple
+
+
+@dataclass
+class AdmissionDecision:
+    accepted: bool
+    reason: str = "OK"
+    retry_after_s: float = 0.0
+
+
+@dataclass
+class _Pending:
+    packet: Dict[str, Any]
+    source: Hashable
+    deadline: float
+    enqueued_at: float
+    on_result: Optional[Callable[[Dict[str, Any], Tuple[bool, str]], None]] = None
+
+
+@dataclass
+class AdmissionStats:
+    accepted: int = 0
+    completed: int = 0
+    shed: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    shed_by_source: Dict[Hashable, int] = field(default_factory=lambda: defaultdict(int))
+
+
+def packet_source(packet: Dict[str, Any]) -> Hashable:
+    token = packet.get("token", {})
+    return (token.get("region_id", "unknown"), token.get("rsu_id", "unknown"))
+
+
+class AdmissionController:
+
+    def __init__(
+        self,
+        max_queue_depth: int = 1024,
+        max_wait_s: float = 2.0,
+        workers: int = 1,
+        initial_cost_s: float = 0.005,
+        cost_alpha: float = 0.2
+    ):
+        self.max_queue_depth = max_queue_depth
+        self.max_wait_s = max_wait_s
+        self.workers = max(1, workers)
+        self.cost_alpha = cost_alpha
+        self.est_cost_s = initial_cost_s
+        self.stats = AdmissionStats()
+        self._queues: Dict[Hashable, Deque[_Pending]] = {}
+        self._rr: Deque[Hashable] = deque()
+        self._depth = 0
+        self._cond = threading.Condition()
+
+    @property
+    def depth(self) -> int:
+        with self._cond:
+            return self._depth
+
+    def estimated_wait_s(self, depth: Optional[int] = None) -> float:
+        depth = self._depth if depth is None else depth
+        return depth * self.est_cost_s / self.workers
+
+    def record_completion(self, seconds: float) -> None:
+        with self._cond:
+            self.est_cost_s += self.cost_alpha * (seconds - self.est_cost_s)
+            self.stats.completed += 1
+
+    def submit(
+        self,
+        packet: Dict[str, Any],
+        deadline_s: Optional[float] = None,
+        on_result: Optional[Callable[[Dict[str, Any], Tuple[bool, str]], None]] = None
+    ) -> AdmissionDecision:
+        now = time.monotonic()
+        source = packet_source(packet)
+        budget = self.max_wait_s if deadline_s is None else min(deadline_s, self.max_wait_s)
+        evicted = None
+        with self._cond:
+            queue = self._queues.get(source)
+            active = len(self._queues) + (0 if queue else 1)
+            fair_share = max(1, self.max_queue_depth // active)
+            if queue and len(queue) >= fair_share:
+                return self._shed("ERR_FAIR_SHARE", source, len(queue) * self.est_cost_s)
+            wait = self.estimated_wait_s(min(self._depth + 1, self.max_queue_depth))
+            if wait > budget:
+                return self._shed("ERR_DEADLINE_UNREACHABLE", source, wait - budget)
+            if self._depth >= self.max_queue_depth:
+                evicted = self._push_out(fair_share)
+                if evicted is None:
+                    return self._shed("ERR_OVERLOADED", source, self.estimated_wait_s())
+            if queue is None:
+                queue = self._queues[source] = deque()
+                self._rr.append(source)
+            queue.append(_Pending(packet, source, now + budget, now, on_result))
+            self._depth += 1
+            self.stats.accepted += 1
+            self._cond.notify()
+        if evicted is not None and evicted.on_result:
+            evicted.on_result(evicted.packet, (False, "ERR_FAIR_SHARE"))
+        return AdmissionDecision(True)
+
+    def _push_out(self, fair_share: int) -> Optional[_Pending]:
+        source, queue = max(self._queues.items(), key=lambda kv: len(kv[1]), default=(None, None))
+        if queue is None or len(queue) <= fair_share:
+            return None
+        item = queue.pop()
+        self._depth -= 1
+        self.stats.shed["ERR_FAIR_SHARE"] += 1
+        self.stats.shed_by_source[source] += 1
+        return item
+
+    def _shed(self, reason: str, source: Hashable, retry_after_s: float) -> AdmissionDecision:
+        self.stats.shed[reason] += 1
+        self.stats.shed_by_source[source] += 1
+        return AdmissionDecision(False, reason, max(self.est_cost_s, retry_after_s))
+
+    def next(self, timeout: Optional[float] = None) -> Optional[_Pending]:
+        end = None if timeout is None else time.monotonic() + timeout
+        while True:
+            expired: List[_Pending] = []
+            with self._cond:
+                while True:
+                    item = self._pop_fair(expired)
+                    if item is not None or expired:
+                        break
+                    remaining = None if end is None else end - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            for stale in expired:
+                if stale.on_result:
+                    stale.on_result(stale.packet, (False, "ERR_DEADLINE_EXPIRED"))
+            if item is not None:
+                return item
+            if not expired:
+                return None
+
+    def _pop_fair(self, expired: List[_Pending]) -> Optional[_Pending]:
+        now = time.monotonic()
+        while self._rr:
+            source = self._rr.popleft()
+            queue = self._queues[source]
+            item = queue.popleft()
+            self._depth -= 1
+            if queue:
+                self._rr.append(source)
+            else:
+                del self._queues[source]
+            if item.deadline < now:
+                self.stats.shed["ERR_DEADLINE_EXPIRED"] += 1
+                self.stats.shed_by_source[source] += 1
+                expired.append(item)
+                continue
+            return item
+        return None
+
+    def queue_depths(self) -> Dict[Hashable, int]:
+        with self._cond:
+            return {src: len(q) for src, q in self._queues.items()}
+
+
+class VerificationService:
+
+    def __init__(
+        self,
+        verify_fn: Callable[..., Tuple[bool, str]],
+        ctx: str,
+        workers: int = 4,
+        controller: Optional[AdmissionController] = None,
+        registry=None,
+        **verify_kwargs
+    ):
+        self.verify_fn = verify_fn
+        self.ctx = ctx
+        self.verify_kwargs = verify_kwargs
+        self.controller = controller or AdmissionController(workers=workers)
+        self._workers = workers
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+        if registry is not None:
+            self.register_metrics(registry)
+
+    def register_metrics(self, registry) -> None:
+        c = self.controller
+        registry.gauge("pcvcs_queue_depth", "Packets waiting for verification", lambda: c.depth)
+        registry.gauge("pcvcs_queue_depth_by_source", "Queued packets per (region, rsu)",
+                       lambda: c.queue_depths(), labelnames=("region", "rsu"))
+        registry.gauge("pcvcs_admission_est_cost_seconds", "EWMA per-packet verification cost", lambda: c.est_cost_s)
+        registry.callback_counter("pcvcs_admitted_total", "Packets admitted to the queue", lambda: c.stats.accepted)
+        registry.callback_counter("pcvcs_shed_total", "Packets shed by reason", lambda: dict(c.stats.shed), labelnames=("reason",))
+
+    def submit(self, packet, deadline_s=None, on_result=None) -> AdmissionDecision:
+        return self.controller.submit(packet, deadline_s, on_result)
+
+    def start(self) -> None:
+        self._stop.clear()
+        for i in range(self._workers):
+            t = threading.Thread(target=self._run, name=f"verifier-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads.clear()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            item = self.controller.next(timeout=0.1)
+            if item is None:
+                continue
+            start = time.perf_counter()
+            try:
+                result = self.verify_fn(item.packet, self.ctx, **self.verify_kwargs)
+            except Exception as e:
+                result = (False, f"ERR_INTERNAL ({e})")
+            self.controller.record_completion(time.perf_counter() - start)
+            if item.on_result:
+                item.on_result(item.packet, result)
@@ -0,0 +1,255 @@
+import itertools
+import threading
+import time
+import weakref
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+_Labels = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> _Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(key: _Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(key) + ([extra] if extra else [])
+    if not items:
+        return ""
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in items)
+    return "{" + body + "}"
+
+
+class _CellOwner:
+    __slots__ = ("cell", "__weakref__")
+
+    def __init__(self):
+        self.cell = {}
+
+
+class _PerThread:
+
+    def __init__(self):
+        self._local = threading.local()
+        self._cells: Dict[int, dict] = {}
+        self._retired: dict = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+    def _cell(self) -> dict:
+        owner = getattr(self._local, "owner", None)
+        if owner is None:
+            owner = self._local.owner = _CellOwner()
+            cid = next(self._ids)
+            with self._lock:
+                self._cells[cid] = owner.cell
+            weakref.finalize(owner, self._fold, cid)
+        return owner.cell
+
+    def _fold(self, cid: int) -> None:
+        with self._lock:
+            cell = self._cells.pop(cid, None)
+            if cell:
+                self._merge(self._retired, cell)
+
+    def _merge(self, dst: dict, src: dict) -> None:
+        raise NotImplementedError
+
+    def _snapshot(self) -> List[dict]:
+        with self._lock:
+            return [dict(self._retired)] + [dict(cell) for cell in self._cells.values()]
+
+    def live_cells(self) -> int:
+        with self._lock:
+            return len(self._cells)
+
+
+class Counter(_PerThread):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str):
+        super().__init__()
+        self.name = name
+        self.help = help_text
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        cell = self._cell()
+        key = _label_key(labels)
+        cell[key] = cell.get(key, 0.0) + amount
+
+    def _merge(self, dst: dict, src: dict) -> None:
+        for key, v in src.items():
+            dst[key] = dst.get(key, 0.0) + v
+
+    def value(self, **labels) -> float:
+        key = _label_key(labels)
+        return sum(cell.get(key, 0.0) for cell in self._snapshot())
+
+    def samples(self) -> List[str]:
+        totals: Dict[_Labels, float] = {}
+        for cell in self._snapshot():
+            for key, v in cell.items():
+                totals[key] = totals.get(key, 0.0) + v
+        return [f"{self.name}{_fmt_labels(k)} {v}" for k, v in sorted(totals.items())]
+
+
+class _Timer:
+    __slots__ = ("hist", "labels", "start")
+
+    def __init__(self, hist: "Histogram", labels: Dict[str, str]):
+        self.hist = hist
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class Histogram(_PerThread):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__()
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        cell = self._cell()
+        key = _label_key(labels)
+        row = cell.get(key)
+        if row is None:
+            row = cell[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                row[i] += 1
+                break
+        else:
+            row[len(self.buckets)] += 1
+        row[-1] += value
+
+    def _merge(self, dst: dict, src: dict) -> None:
+        for key, row in src.items():
+            acc = dst.get(key)
+            dst[key] = list(row) if acc is None else [a + b for a, b in zip(acc, row)]
+
+    def time(self, **labels) -> _Timer:
+        return _Timer(self, labels)
+
+    def samples(self) -> List[str]:
+        n = len(self.buckets) + 1
+        totals: Dict[_Labels, list] = {}
+        for cell in self._snapshot():
+            for key, row in cell.items():
+                acc = totals.setdefault(key, [0] * n + [0.0])
+                for i in range(n + 1):
+                    acc[i] += row[i]
+        out = []
+        for key, acc in sorted(totals.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), acc[:n]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                out.append(f"{self.name}_bucket{_fmt_labels(key, ('le', le))} {cumulative}")
+            out.append(f"{self.name}_sum{_fmt_labels(key)} {acc[-1]}")
+            out.append(f"{self.name}_count{_fmt_labels(key)} {cumulative}")
+        return out
+
+
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, fn: Callable[[], Union[float, Dict[Tuple, float]]], labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.fn = fn
+        self.labelnames = tuple(labelnames)
+
+    def samples(self) -> List[str]:
+        value = self.fn()
+        if not isinstance(value, dict):
+            return [f"{self.name} {float(value)}"]
+        out = []
+        for label_values, v in sorted(value.items(), key=lambda kv: str(kv[0])):
+            if not isinstance(label_values, tuple):
+                label_values = (label_values,)
+            key = tuple(zip(self.labelnames, (str(x) for x in label_values)))
+            out.append(f"{self.name}{_fmt_labels(key)} {float(v)}")
+        return out
+
+
+class CallbackCounter(Gauge):
+    kind = "counter"
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self.register(Counter(name, help_text))
+
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help_text, buckets))
+
+    def gauge(self, name: str, help_text: str, fn, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help_text, fn, labelnames))
+
+    def callback_counter(self, name: str, help_text: str, fn, labelnames: Sequence[str] = ()) -> CallbackCounter:
+        return self.register(CallbackCounter(name, help_text, fn, labelnames))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for m in metrics:
+            lines.append(f"# HELP {m.name} {m.help}")
+            lines.append(f"# TYPE {m.name} {m.kind}")
+            try:
+                lines.extend(m.samples())
+            except Exception as e:
+                lines.append(f"# {m.name} 采集失败: {e}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def start_metrics_server(registry: MetricsRegistry = REGISTRY, host: str = "127.0.0.1", port: int = 9108):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
@@ -1,44 +1,84 @@
 
-import json, time, argparse
+import json, time, argparse, threading
 from pathlib import Path
 from common.crypto import merkle_verify, geohash_bbox, haversine
-from common.crypto_adapters import range_proof_verify, lrs_verify
+from common.crypto_adapters import range_proof_verify, range_proof_verify_batch, lrs_verify
 from common.linkable_ring_signature import LinkableRingSignature, PublicKeyRing
+from common.link_tag_table import tag_digest
+from common.concurrent_registry import StripedRegistry
+from common.rsu_registry import RSUKeyRegistry
+from verifier.metrics import REGISTRY, start_metrics_server
+from verifier.admission import VerificationService
 
-USED_NONCES = set()
+USED_NONCES = StripedRegistry()
+RSU_KEYS = RSUKeyRegistry()
                        
 LRS_VERIFIER = LinkableRingSignature()
 
-def verify_token(token: dict, skip_expiry: bool = False) -> tuple[bool, str]:
+PACKETS_TOTAL = REGISTRY.counter("pcvcs_packets_total", "Verified packets by verdict code")
+PACKET_SECONDS = REGISTRY.histogram("pcvcs_verify_seconds", "End-to-end verify_packet latency")
+STAGE_SECONDS = REGISTRY.histogram("pcvcs_verify_stage_seconds", "Per-stage verify_packet latency")
+NONCE_EVICTIONS = REGISTRY.counter("pcvcs_nonce_evictions_total", "Expired token nonces evicted from the replay cache")
+REGISTRY.gauge("pcvcs_nonce_cache_size", "Token nonces held in the replay cache", lambda: len(USED_NONCES))
+REGISTRY.gauge("pcvcs_link_tag_store_size", "Link tags held for duplicate detection", lambda: _link_tag_store_size())
+REGISTRY.gauge("pcvcs_token_batch_roots", "Verified RSU window roots cached for batch tokens", lambda: RSU_KEYS.cached_batch_roots())
+REGISTRY.gauge("pcvcs_active_tasks", "Tasks registered with the verifier", lambda: len(LRS_VERIFIER.task_registry))
+
+def verify_token(token: dict, skip_expiry: bool = False, signature_result=None) -> tuple[bool, str]:
     now = int(time.time())
     if not skip_expiry and token["expiry_ts"] < now:
         return False, "ERR_TOKEN_EXPIRED"
+    if RSU_KEYS.enforced:
+        ok, msg = signature_result or RSU_KEYS.verify_token(token)
+        if not ok:
+            return False, msg
     key = (token["window_id"], token["nonce"])
-    if key in USED_NONCES:
+    inserted, _ = USED_NONCES.check_and_insert(key, token["expiry_ts"])
+    if not inserted:
         return False, "ERR_TOKEN_REPLAY"
-    USED_NONCES.add(key)
     return True, "OK"
 
 def verify_packet(packet_obj: dict, ctx: str, vmax_kmh: float = 50.0, last_report=None, skip_expiry: bool = False):
-                
-    ok, msg = verify_token(packet_obj["token"], skip_expiry=skip_expiry)
+    start = time.perf_counter()
+    return _record_verdict(start, _verify_packet_stages(packet_obj, ctx, vmax_kmh, last_report, skip_expiry))
+
+def _record_verdict(start: float, result: tuple[bool, str]) -> tuple[bool, str]:
+    ok, msg = result
+    PACKET_SECONDS.observe(time.perf_counter() - start)
+    PACKETS_TOTAL.inc(verdict=msg.split(" ", 1)[0])
+    return ok, msg
+
+def _verify_packet_stages(packet_obj: dict, ctx: str, vmax_kmh: float, last_report, skip_expiry: bool, zk_ok=None, token_sig=None):
+    with STAGE_SECONDS.time(stage="token"):
+        ok, msg = verify_token(packet_obj["token"], skip_expiry=skip_expiry, signature_result=token_sig)
     if not ok:
         return False, msg
     
-                               
-    if not range_proof_verify(packet_obj["proofs"]["Pi_time"]):
+    task_id = packet_obj.get("task_id", "unknown")
+    task_ctx = LRS_VERIFIER.task_registry.get(task_id)
+    if task_ctx is None and LRS_VERIFIER.task_registry.is_retired(task_id):
+        return False, "ERR_TASK_EXPIRED"
+    if task_ctx is not None:
+        if "timestamp" in packet_obj and not task_ctx.in_window(packet_obj["timestamp"]):
+            return False, "ERR_TASK_WINDOW"
+        if packet_obj["commitments"]["root"] != task_ctx.whitelist_root:
+            return False, "ERR_GEO_ROOT"
+
+    if zk_ok is None:
+        with STAGE_SECONDS.time(stage="zk_time"):
+            zk_ok = range_proof_verify(packet_obj["proofs"]["Pi_time"])
+    if not zk_ok:
         return False, "ERR_ZK_TIME"
 
-                     
-    root = packet_obj["commitments"]["root"]
-    leaf = packet_obj["geohash7"]
-    proof = packet_obj["proofs"]["Pi_geo"]["proof"]
-    idx = packet_obj["proofs"]["Pi_geo"]["index"]
-    if not merkle_verify(leaf, proof, root, idx):
+    with STAGE_SECONDS.time(stage="geo"):
+        root = packet_obj["commitments"]["root"]
+        leaf = packet_obj["geohash7"]
+        proof = packet_obj["proofs"]["Pi_geo"]["proof"]
+        idx = packet_obj["proofs"]["Pi_geo"]["index"]
+        ok = merkle_verify(leaf, proof, root, idx)
+    if not ok:
         return False, "ERR_GEO_PROOF"
 
-                                         
-    task_id = packet_obj.get("task_id", "unknown")
     message = json.dumps({
         "tid": task_id,
         "payload": packet_obj["payload"],
@@ -47,31 +87,33 @@ def verify_packet(packet_obj: dict, ctx: str, vmax_kmh: float = 50.0, last_repor
         "token": packet_obj["token"]
     }, separators=(",",":")).encode()
 
-                       
-    sigma_lrs = packet_obj.get("sigma_lrs", packet_obj.get("lrs", {}))         
-    
-                 
-    ring_pubkeys_hex = packet_obj.get("ring_pubkeys", sigma_lrs.get("ring", []))
-    ring_bytes = [bytes.fromhex(pk_hex) for pk_hex in ring_pubkeys_hex]
+    sigma_lrs = packet_obj.get("sigma_lrs", packet_obj.get("lrs", {}))
     
-             
-    public_ring = PublicKeyRing(
-        ring_id=sigma_lrs.get("ring_id", "unknown"),
-        task_id=task_id,
-        registered_pubkeys=ring_bytes,
-        creation_time=int(time.time())
-    )
+    if task_ctx is not None:
+        public_ring = task_ctx.ring
+    else:
+        ring_pubkeys_hex = packet_obj.get("ring_pubkeys", sigma_lrs.get("ring", []))
+        ring_bytes = [bytes.fromhex(pk_hex) for pk_hex in ring_pubkeys_hex]
+        public_ring = PublicKeyRing(
+            ring_id=sigma_lrs.get("ring_id", "unknown"),
+            task_id=task_id,
+            registered_pubkeys=ring_bytes,
+            creation_time=int(time.time())
+        )
     
-             
-    if not LRS_VERIFIER.verify_signature(message, sigma_lrs, public_ring):
+    with STAGE_SECONDS.time(stage="lrs"):
+        ok = LRS_VERIFIER.verify_signature(message, sigma_lrs, public_ring)
+    if not ok:
         return False, "ERR_LRS_INVALID"
     
-                           
-    is_duplicate, previous = LRS_VERIFIER.detect_duplicate_submission(sigma_lrs, task_id)
+    if tag_digest(sigma_lrs.get("link_tag")) is None:
+        return False, "ERR_LINK_TAG_MALFORMED"
+    
+    with STAGE_SECONDS.time(stage="duplicate"):
+        is_duplicate, previous = LRS_VERIFIER.detect_duplicate_submission(sigma_lrs, task_id)
     if is_duplicate:
         return False, f"ERR_DUPLICATE_SUBMISSION (link_tag={sigma_lrs['link_tag'][:16]}..., previous={len(previous)} submissions)"
     
-                    
     if last_report is not None:
         vmax = vmax_kmh * 1000.0 / 3600.0
         lat1, lon1 = geohash_bbox(last_report["geohash7"])
@@ -85,17 +127,112 @@ def verify_packet(packet_obj: dict, ctx: str, vmax_kmh: float = 50.0, last_repor
 
     return True, "OK"
 
+def evict_expired_nonces(now: int = None) -> int:
+    now = int(time.time()) if now is None else now
+    evicted = USED_NONCES.evict(lambda key, expiry_ts: expiry_ts < now)
+    RSU_KEYS.evict_batch_roots(now)
+    NONCE_EVICTIONS.inc(evicted)
+    return evicted
+
+def _link_tag_store_size() -> float:
+    size = len(LRS_VERIFIER.link_tag_db)
+    for task_id in LRS_VERIFIER.task_registry.active_tasks():
+        task_ctx = LRS_VERIFIER.task_registry.get(task_id)
+        if task_ctx is not None:
+            size += len(task_ctx.link_tags)
+    return size
+
+def verify_packets_batch(packet_objs: list, ctx: str, vmax_kmh: float = 50.0, last_reports=None, skip_expiry: bool = False) -> list:
+    if last_reports is None:
+        last_reports = [None] * len(packet_objs)
+    elif len(last_reports) != len(packet_objs):
+        raise ValueError("last_reports与packet_objs长度不一致")
+    start = time.perf_counter()
+    token_sigs = [None] * len(packet_objs)
+    if RSU_KEYS.enforced:
+        with STAGE_SECONDS.time(stage="token_batch"):
+            token_sigs = RSU_KEYS.verify_tokens([p["token"] for p in packet_objs])
+    with STAGE_SECONDS.time(stage="zk_time_batch"):
+        zk_results = range_proof_verify_batch([p["proofs"]["Pi_time"] for p in packet_objs])
+    batch_share = (time.perf_counter() - start) / max(1, len(packet_objs))
+    results = []
+    for packet_obj, last_report, zk_ok, token_sig in zip(packet_objs, last_reports, zk_results, token_sigs):
+        start = time.perf_counter() - batch_share
+        results.append(_record_verdict(start, _verify_packet_stages(packet_obj, ctx, vmax_kmh, last_report, skip_expiry, zk_ok, token_sig)))
+    return results
+
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+def _verify_pool(workers: int):
+    with _POOLS_LOCK:
+        pool = _POOLS.get(workers)
+        if pool is None:
+            from concurrent.futures import ThreadPoolExecutor
+            pool = _POOLS[workers] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"verify-{workers}")
+        return pool
+
+def verify_packets_parallel(packet_objs: list, ctx: str, workers: int = 4, skip_expiry: bool = False) -> list:
+    return list(_verify_pool(workers).map(lambda p: verify_packet(p, ctx, skip_expiry=skip_expiry), packet_objs))
+
+def verify_packets_admitted(packet_objs: list, ctx: str, workers: int = 4, skip_expiry: bool = False,
+                            deadline_s=None, controller=None, timeout: float = 60.0) -> list:
+    results = [None] * len(packet_objs)
+    pending = [len(packet_objs)]
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def finish(i, result):
+        with lock:
+            results[i] = result
+            pending[0] -= 1
+            if pending[0] == 0:
+                done.set()
+
+    if not packet_objs:
+        return results
+    service = VerificationService(verify_packet, ctx, workers=workers, controller=controller,
+                                  registry=REGISTRY, skip_expiry=skip_expiry)
+    service.start()
+    try:
+        for i, packet in enumerate(packet_objs):
+            decision = service.submit(packet, deadline_s, lambda _p, r, i=i: finish(i, r))
+            if not decision.accepted:
+                finish(i, (False, decision.reason))
+        if not done.wait(timeout):
+            raise TimeoutError(f"验证服务在 {timeout}s 内未完成全部数据包")
+    finally:
+        service.stop()
+    return results
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--infile", type=str, default=str(Path(__file__).parent.parent / "data" / "packet.json"))
     ap.add_argument("--ctx", type=str, default="window-ctx-001")
     ap.add_argument("--skip-expiry", action="store_true", help="跳过token过期检查（用于测试）")
+    ap.add_argument("--metrics-port", type=int, default=0, help="在该端口提供Prometheus指标（0表示关闭）")
+    ap.add_argument("--rsu-keys", type=str, default=None, help="RSU公钥文件（rsu_events.json格式，只读取pk_hex），提供后校验token签名")
+    ap.add_argument("--require-token-signatures", action="store_true", help="未加载RSU公钥时拒绝所有token（默认不校验token签名）")
+    ap.add_argument("--workers", type=int, default=0, help="经准入控制的验证线程数（0表示直接串行验证）")
     args = ap.parse_args()
 
+    RSU_KEYS.required = args.require_token_signatures
+    if args.rsu_keys:
+        RSU_KEYS.load(json.loads(Path(args.rsu_keys).read_text())["rsus"])
+    if not RSU_KEYS.enforced:
+        print("警告: 未提供--rsu-keys，token签名校验已关闭（默认行为）")
+
+    if args.metrics_port:
+        start_metrics_server(port=args.metrics_port)
+
     obj = json.loads(Path(args.infile).read_text())
-    packet = obj["packet"]
-    ok, msg = verify_packet(packet, ctx=args.ctx, skip_expiry=args.skip_expiry)
-    print(f"Verify: {ok}, {msg}")
+    packets = obj["packets"] if "packets" in obj else [obj["packet"]]
+    if args.workers > 0:
+        results = verify_packets_admitted(packets, args.ctx, workers=args.workers, skip_expiry=args.skip_expiry)
+    else:
+        results = [verify_packet(p, ctx=args.ctx, skip_expiry=args.skip_expiry) for p in packets]
+    for ok, msg in results:
+        print(f"Verify: {ok}, {msg}")
 
 if __name__ == "__main__":
     main()